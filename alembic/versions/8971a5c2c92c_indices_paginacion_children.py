@@ -0,0 +1,43 @@
+"""Índices para la paginación de children
+
+Revision ID: 8971a5c2c92c
+Revises: b41e80b9e006
+Create Date: 2026-10-18 12:05:37.120944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8971a5c2c92c'
+down_revision: Union[str, Sequence[str], None] = 'b41e80b9e006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Solo interesan los niños activos
+ACTIVE = sa.text('eliminated = 0')
+
+
+def upgrade():
+    # Orden de las páginas (keyset sobre last_name, id)
+    op.create_index('ix_children_active_last_name_id', 'children', ['last_name', 'id'],
+                    postgresql_where=ACTIVE)
+    # Filtro por prefijo de nombre/apellido sin distinguir mayúsculas
+    op.create_index('ix_children_active_lower_last_name', 'children',
+                    [sa.text('lower(last_name) text_pattern_ops')], postgresql_where=ACTIVE)
+    op.create_index('ix_children_active_lower_name', 'children',
+                    [sa.text('lower(name) text_pattern_ops')], postgresql_where=ACTIVE)
+    # Rangos de fechas
+    op.create_index('ix_children_active_birth_date', 'children', ['birth_date'], postgresql_where=ACTIVE)
+    op.create_index('ix_children_active_exam_date', 'children', ['exam_date'], postgresql_where=ACTIVE)
+
+
+def downgrade():
+    op.drop_index('ix_children_active_exam_date', table_name='children')
+    op.drop_index('ix_children_active_birth_date', table_name='children')
+    op.drop_index('ix_children_active_lower_name', table_name='children')
+    op.drop_index('ix_children_active_lower_last_name', table_name='children')
+    op.drop_index('ix_children_active_last_name_id', table_name='children')
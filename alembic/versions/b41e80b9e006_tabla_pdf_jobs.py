@@ -0,0 +1,47 @@
+"""Tabla pdf_jobs
+
+Revision ID: b41e80b9e006
+Revises: 5b9bf345bec1
+Create Date: 2026-10-18 11:40:12.418305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41e80b9e006'
+down_revision: Union[str, Sequence[str], None] = '5b9bf345bec1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'pdf_jobs',
+        sa.Column('id', sa.Uuid(), nullable=False),
+        sa.Column('kind', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('target_id', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('exam_ids', sa.JSON(), nullable=True),
+        sa.Column('status', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('requested_by', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('pdf', sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_pdf_jobs_status', 'pdf_jobs', ['status'])
+    # Los workers buscan el pendiente más antiguo
+    op.create_index('ix_pdf_jobs_status_created_at', 'pdf_jobs', ['status', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_pdf_jobs_status_created_at', table_name='pdf_jobs')
+    op.drop_index('ix_pdf_jobs_status', table_name='pdf_jobs')
+    op.drop_table('pdf_jobs')
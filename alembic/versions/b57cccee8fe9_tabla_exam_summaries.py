@@ -0,0 +1,79 @@
+"""Tabla exam_summaries
+
+Revision ID: b57cccee8fe9
+Revises: 8971a5c2c92c
+Create Date: 2026-10-18 12:31:08.553102
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b57cccee8fe9'
+down_revision: Union[str, Sequence[str], None] = '8971a5c2c92c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        'exam_summaries',
+        sa.Column('exam_id', sa.Uuid(), nullable=False),
+        sa.Column('child_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('doctor_id', sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column('exam_date', sa.Date(), nullable=False),
+        sa.Column('total_score', sa.Integer(), nullable=False),
+        sa.Column('max_possible_score', sa.Integer(), nullable=False),
+        sa.Column('total_left_asymmetries', sa.Integer(), nullable=False),
+        sa.Column('total_right_asymmetries', sa.Integer(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('module_scores', sa.JSON(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id']),
+        sa.ForeignKeyConstraint(['child_id'], ['children.id']),
+        sa.ForeignKeyConstraint(['doctor_id'], ['doctors.id']),
+        sa.PrimaryKeyConstraint('exam_id'),
+    )
+    op.create_index('ix_exam_summaries_child_id', 'exam_summaries', ['child_id'])
+
+    # Backfill con las mismas reglas que la lectura: solo las secciones
+    # 'analysis:*' suman puntaje (máximo 3 por ítem) y asimetrías
+    op.execute("""
+        INSERT INTO exam_summaries (
+            exam_id, child_id, doctor_id, exam_date,
+            total_score, max_possible_score,
+            total_left_asymmetries, total_right_asymmetries,
+            item_count, module_scores, updated_at
+        )
+        SELECT e.id, e.child_id, e.doctor_id, e.created_at,
+               COALESCE(SUM(i.score) FILTER (WHERE s.section_name LIKE 'analysis:%'), 0),
+               3 * COUNT(i.id) FILTER (WHERE s.section_name LIKE 'analysis:%'),
+               COALESCE(SUM(i.left_asimetric_count) FILTER (WHERE s.section_name LIKE 'analysis:%'), 0),
+               COALESCE(SUM(i.right_asimetric_count) FILTER (WHERE s.section_name LIKE 'analysis:%'), 0),
+               COUNT(i.id),
+               COALESCE((
+                   SELECT json_object_agg(module_id, module_score)
+                   FROM (
+                       SELECT substr(s2.section_name, 10) AS module_id,
+                              SUM(i2.score) AS module_score
+                       FROM sections s2
+                       JOIN items i2 ON i2.section_id = s2.id
+                       WHERE s2.id_exam = e.id AND s2.section_name LIKE 'analysis:%'
+                       GROUP BY s2.section_name
+                   ) AS modules
+               ), '{}'::json),
+               now()
+        FROM exams e
+        LEFT JOIN sections s ON s.id_exam = e.id
+        LEFT JOIN items i ON i.section_id = s.id
+        GROUP BY e.id, e.child_id, e.doctor_id, e.created_at
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_exam_summaries_child_id', table_name='exam_summaries')
+    op.drop_table('exam_summaries')
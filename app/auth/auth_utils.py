@@ -1,14 +1,18 @@
 import jwt
-from fastapi import HTTPException, status, Depends
+from fastapi import HTTPException, Request, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from app.auth.token_cache import token_cache
 from app.config import SECRET_KEY, ALGORITHM
 
 security = HTTPBearer()
 
 def verify_token(token: str):
+    # Un token ya verificado y sin vencer no se vuelve a decodificar
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -21,8 +25,13 @@ def verify_token(token: str):
             detail="Invalid token",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    token_cache.put(token, payload)
+    return payload
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    payload = verify_token(token)
-    return payload 
\ No newline at end of file
+async def get_current_user(request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)):
+    # El middleware ya verificó el token; HTTPBearer queda para el 403 sin
+    # credenciales y para que OpenAPI documente la seguridad
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return user
+    return verify_token(credentials.credentials)
@@ -0,0 +1,84 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from app.config import JWT_CACHE_MAX_ENTRIES, JWT_CACHE_TTL_SECONDS
+
+
+class TokenCache:
+    """
+    Claims de tokens JWT ya verificados, para no repetir `jwt.decode` en cada
+    request de un mismo cliente. La clave es el sha256 del token (no se
+    guarda el token en memoria) y cada entrada vence en lo que ocurra
+    primero: el `exp` del token o `ttl` segundos. Solo se guardan tokens
+    válidos; los rechazados se vuelven a verificar siempre.
+    """
+
+    def __init__(self,
+                 max_entries: int = JWT_CACHE_MAX_ENTRIES,
+                 ttl: float = JWT_CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # Reloj de pared: `exp` es un timestamp UNIX
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, tuple[float, dict]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str) -> Optional[dict]:
+        if self.max_entries <= 0:
+            return None
+        key = self.digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, payload: dict) -> None:
+        if self.max_entries <= 0:
+            return
+        expires_at = self._clock() + self.ttl
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        key = self.digest(token)
+        with self._lock:
+            self._entries[key] = (expires_at, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 # Cargar variables de entorno desde .env
@@ -6,4 +7,82 @@ load_dotenv()
 
 # Configuración para JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
-ALGORITHM = "HS256" 
\ No newline at end of file
+ALGORITHM = "HS256"
+# Tokens ya verificados (LRU por digest del token, respetando `exp`)
+JWT_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CACHE_MAX_ENTRIES", "1024"))
+JWT_CACHE_TTL_SECONDS = float(os.getenv("JWT_CACHE_TTL_SECONDS", "300"))
+
+# Configuración del render de PDFs
+# Motor: "wkhtmltopdf" (binario externo) o "weasyprint" (en proceso)
+PDF_BACKEND = os.getenv("PDF_BACKEND", "wkhtmltopdf")
+PDF_MAX_CONCURRENT_RENDERS = int(os.getenv("PDF_MAX_CONCURRENT_RENDERS", "2"))
+PDF_MAX_QUEUED_RENDERS = int(os.getenv("PDF_MAX_QUEUED_RENDERS", "20"))
+PDF_QUEUE_TIMEOUT_SECONDS = float(os.getenv("PDF_QUEUE_TIMEOUT_SECONDS", "30"))
+PDF_RENDER_TIMEOUT_SECONDS = float(os.getenv("PDF_RENDER_TIMEOUT_SECONDS", "60"))
+
+# Caché de PDFs (memoria + disco)
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PDF_CACHE_MEMORY_MAX_BYTES = int(os.getenv("PDF_CACHE_MEMORY_MB", "64")) * 1024 * 1024
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", os.path.join(tempfile.gettempdir(), "formshine-pdf-cache"))
+PDF_CACHE_DISK_MAX_BYTES = int(os.getenv("PDF_CACHE_DISK_MB", "512")) * 1024 * 1024
+
+# Trabajos de PDF en segundo plano (tabla pdf_jobs)
+PDF_JOB_WORKERS = int(os.getenv("PDF_JOB_WORKERS", "1"))
+PDF_JOB_POLL_SECONDS = float(os.getenv("PDF_JOB_POLL_SECONDS", "2"))
+PDF_JOB_STALE_SECONDS = float(os.getenv("PDF_JOB_STALE_SECONDS", "600"))
+PDF_JOB_MAX_ATTEMPTS = int(os.getenv("PDF_JOB_MAX_ATTEMPTS", "3"))
+# Exámenes por trabajo "batch" y cuánto se guardan los trabajos terminados
+PDF_JOB_MAX_EXAMS = int(os.getenv("PDF_JOB_MAX_EXAMS", "200"))
+PDF_JOB_TTL_SECONDS = float(os.getenv("PDF_JOB_TTL_SECONDS", str(24 * 3600)))
+PDF_JOB_PURGE_SECONDS = float(os.getenv("PDF_JOB_PURGE_SECONDS", "3600"))
+
+# Paginación del listado de niños
+CHILDREN_PAGE_DEFAULT = int(os.getenv("CHILDREN_PAGE_DEFAULT", "50"))
+CHILDREN_PAGE_MAX = int(os.getenv("CHILDREN_PAGE_MAX", "200"))
+
+# Importación masiva de exámenes en NDJSON (POST /hineExam/import)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "200"))
+IMPORT_MAX_LINE_BYTES = int(os.getenv("IMPORT_MAX_LINE_BYTES", str(1024 * 1024)))
+
+# Los exámenes leídos siempre se validan con pydantic; con true la validación
+# es estricta (sin coerciones de tipos). EXAM_MAPPER_VALIDATE es el nombre viejo
+EXAM_MAPPER_STRICT = os.getenv("EXAM_MAPPER_STRICT", os.getenv("EXAM_MAPPER_VALIDATE", "false")).lower() in ("1", "true", "yes")
+
+# Caché en memoria de lecturas (exámenes, niños) con LRU + TTL
+SERVICE_CACHE_ENABLED = os.getenv("SERVICE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVICE_CACHE_MAX_ENTRIES = int(os.getenv("SERVICE_CACHE_MAX_ENTRIES", "2048"))
+SERVICE_CACHE_TTL_SECONDS = float(os.getenv("SERVICE_CACHE_TTL_SECONDS", "300"))
+
+# Invalidación entre workers por LISTEN/NOTIFY (solo Postgres)
+CACHE_NOTIFY_ENABLED = os.getenv("CACHE_NOTIFY_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_NOTIFY_CHANNEL = os.getenv("CACHE_NOTIFY_CHANNEL", "formshine_cache")
+CACHE_NOTIFY_RECONNECT_SECONDS = float(os.getenv("CACHE_NOTIFY_RECONNECT_SECONDS", "5"))
+
+# Compresión de respuestas (Brotli o gzip según Accept-Encoding)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+COMPRESSION_THREAD_MIN_BYTES = int(os.getenv("COMPRESSION_THREAD_MIN_BYTES", str(64 * 1024)))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+
+# Engines y pool de conexiones (ver app/database/database.py)
+# DB_ECHO: "false", "true" (SQL) o "debug" (SQL y filas)
+DB_ECHO = os.getenv("DB_ECHO", "false").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# 0 = sin límite; solo Postgres
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# Conteo de consultas por request (ver app/database/query_stats.py)
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() in ("1", "true", "yes")
+QUERY_DEBUG_HEADERS = os.getenv("QUERY_DEBUG_HEADERS", "false").lower() in ("1", "true", "yes")
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", "5"))
+
+# /metrics pide el mismo token que /admin. Con METRICS_PUBLIC=true queda
+# abierto para un Prometheus sin token: usarlo solo si el puerto de la app
+# no es accesible desde fuera de la red interna
+METRICS_PUBLIC = os.getenv("METRICS_PUBLIC", "false").lower() in ("1", "true", "yes")
@@ -1,11 +1,98 @@
 from sqlmodel import create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
 from dotenv import load_dotenv
+from app.config import (
+    DB_ECHO, DB_MAX_OVERFLOW, DB_POOL_PRE_PING, DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE, DB_POOL_TIMEOUT_SECONDS, DB_STATEMENT_TIMEOUT_MS
+)
+from app.database.pool_metrics import PoolMetrics, timed_pool_class
+from app.database.query_stats import instrument_queries
+from app.services.metrics import instrument_engine
 load_dotenv()
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL, echo=True)
+# Drivers async equivalentes a los drivers sync que usamos
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Deriva la URL async a partir de DATABASE_URL para no duplicar credenciales.
+    asyncpg no entiende `sslmode`, así que se traduce a su parámetro `ssl`.
+    """
+    parsed = make_url(url)
+    parsed = parsed.set(drivername=ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername))
+    if parsed.drivername == "postgresql+asyncpg" and "sslmode" in parsed.query:
+        query = dict(parsed.query)
+        query["ssl"] = query.pop("sslmode")
+        parsed = parsed.set(query=query)
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+def echo_setting(value: str = DB_ECHO):
+    if value == "debug":
+        return "debug"
+    return value in ("1", "true", "yes")
+
+
+def engine_options(url: str, metrics: PoolMetrics) -> dict:
+    """
+    Opciones comunes de create_engine/create_async_engine según DB_*.
+    El tamaño del pool va por proceso: con N workers de uvicorn la base ve
+    hasta N * (DB_POOL_SIZE + DB_MAX_OVERFLOW) conexiones por engine.
+    """
+    parsed = make_url(url)
+    options = {"echo": echo_setting(), "pool_pre_ping": DB_POOL_PRE_PING}
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # SQLite en memoria usa un pool de una conexión por hilo
+        return options
+
+    base = AsyncAdaptedQueuePool if parsed.get_dialect().is_async else QueuePool
+    options.update(
+        poolclass=timed_pool_class(base, metrics),
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    )
+    if DB_STATEMENT_TIMEOUT_MS > 0 and parsed.get_backend_name() == "postgresql":
+        if parsed.drivername == "postgresql+asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+engine_metrics = PoolMetrics("sync")
+async_engine_metrics = PoolMetrics("async")
+
+# Engine sync: lo siguen usando Alembic y los scripts
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL, engine_metrics))
+engine_metrics.attach(engine)
+instrument_engine(engine, "sync")
+instrument_queries(engine)
+
+# Engine async: lo usan los routers para no bloquear el event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, async_engine_metrics))
+async_engine_metrics.attach(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "async")
+instrument_queries(async_engine.sync_engine)
 
 def get_session():
     with Session(engine) as session:
         yield session
+
+async def get_async_session():
+    async with AsyncSession(async_engine) as session:
+        yield session
@@ -0,0 +1,104 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    """
+    Contadores de un pool de conexiones para dimensionarlo frente a la
+    cantidad de workers de uvicorn: conexiones en uso y libres, espera al
+    pedir una conexión, conexiones abiertas por encima de pool_size y
+    timeouts esperando el pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._pool = None
+
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def attach(self, engine) -> None:
+        self._pool = engine.pool
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "engine_disposed", self._on_disposed)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def stats(self) -> dict:
+        pool = self._pool
+        sized = isinstance(pool, QueuePool)
+        with self._lock:
+            return {
+                "pool": type(pool).__name__ if pool is not None else None,
+                "size": pool.size() if sized else None,
+                "checked_out": pool.checkedout() if sized else None,
+                "idle": pool.checkedin() if sized else None,
+                # QueuePool cuenta negativo mientras no se llena pool_size
+                "overflow": max(pool.overflow(), 0) if sized else None,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "overflow_connects": self.overflow_connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 3),
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        pool = self._pool
+        with self._lock:
+            self.connects += 1
+            # overflow() > 0: la conexión nueva excede pool_size
+            if isinstance(pool, QueuePool) and pool.overflow() > 0:
+                self.overflow_connects += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_disposed(self, engine) -> None:
+        # dispose() recrea el pool
+        self._pool = engine.pool
+
+
+def timed_pool_class(base: type, metrics: PoolMetrics) -> type:
+    """
+    Subclase de `base` (QueuePool o AsyncAdaptedQueuePool) que mide cuánto
+    tarda cada pedido de conexión, incluida la espera cuando el pool está
+    agotado. `recreate()` usa la misma clase, así que la medición sobrevive
+    a un dispose().
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        metrics.record_wait(time.perf_counter() - started)
+        return connection
+
+    return type(f"Timed{base.__name__}", (base,), {"_do_get": _do_get})
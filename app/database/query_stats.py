@@ -0,0 +1,118 @@
+"""
+Conteo de sentencias SQL por request (y por bloque de código en pruebas).
+
+Los eventos del engine suman en el `QueryStats` de la request actual
+(ContextVar que pone QueryStatsMiddleware; lo heredan los hilos de
+`to_thread`/threadpool y los greenlets de asyncpg) y en cualquier
+`capture_queries()` abierto, que es global al proceso para poder contar lo
+que hace la app detrás de un TestClient.
+"""
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+
+class QueryStats:
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements: Counter[str] = Counter()
+        self._sessions: set[int] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def sessions(self) -> int:
+        return len(self._sessions)
+
+    def add_query(self, statement: str, seconds: float) -> None:
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            self.statements[statement] += 1
+
+    def add_session(self, session) -> None:
+        with self._lock:
+            self._sessions.add(id(session))
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Sentencias idénticas ejecutadas `threshold` veces o más (típico N+1)."""
+        with self._lock:
+            return [(sql, count) for sql, count in self.statements.most_common() if count >= threshold]
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+_captures: list[QueryStats] = []
+_captures_lock = threading.Lock()
+
+
+def _targets() -> list[QueryStats]:
+    targets = list(_captures)
+    stats = current_query_stats.get()
+    if stats is not None:
+        targets.append(stats)
+    return targets
+
+
+def instrument_queries(engine) -> None:
+    """Registra los eventos en `engine` (para async, pasar `sync_engine`)."""
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_stats_started"].pop()
+        for stats in _targets():
+            stats.add_query(statement, elapsed)
+
+    def failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_stats_started"):
+            conn.info["query_stats_started"].pop()
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "handle_error", failed)
+
+
+@event.listens_for(Session, "after_begin")
+def _count_session(session, transaction, connection) -> None:
+    # AsyncSession corre sobre una Session sync, así que también pasa por acá
+    for stats in _targets():
+        stats.add_session(session)
+
+
+@contextmanager
+def capture_queries():
+    """
+    Cuenta todas las sentencias del proceso mientras dure el bloque:
+
+        with capture_queries() as stats:
+            client.get("/hineExam/children/kid1")
+        assert stats.queries <= 3
+    """
+    stats = QueryStats()
+    with _captures_lock:
+        _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Helper de pruebas: falla si el bloque ejecuta más de `limit` sentencias."""
+    with capture_queries() as stats:
+        yield stats
+    if stats.queries > limit:
+        detail = "\n".join(f"  {count}x {sql}" for sql, count in stats.statements.most_common())
+        raise AssertionError(f"Se esperaban como mucho {limit} consultas y hubo {stats.queries}:\n{detail}")
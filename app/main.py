@@ -1,24 +1,46 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware 
 from fastapi.security import HTTPBearer
 from app.routers.advisor_router import router as advisor_router
 from app.routers.child_router import router as child_router
 from app.routers.hine_exam import router as hine_exam_router
+from app.routers.admin_router import router as admin_router
+from app.routers.metrics_router import router as metrics_router
 from app.middleware.auth_middleware import verify_jwt_token
+from app.middleware.compression_middleware import CompressionMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.routers.fast_json import FastJSONResponse
 from app.auth.auth_utils import get_current_user
+from app.services.pdf_job_worker import pdf_job_worker
+from app.services.cache_events import cache_events
 
 # Configurar el esquema de seguridad HTTP Bearer
 security_scheme = HTTPBearer()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Workers de trabajos de PDF en segundo plano
+    await pdf_job_worker.start()
+    # Invalidaciones de caché publicadas por los demás workers
+    await cache_events.start()
+    yield
+    await cache_events.stop()
+    await pdf_job_worker.stop()
+
 app = FastAPI(
     root_path="/hine/form",
     title="FormsHine API",
     description="API para gestión de formularios HINE con autenticación JWT",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     openapi_tags=[
         {"name": "Children", "description": "Operaciones relacionadas con niños"},
         {"name": "Hine Exam", "description": "Operaciones relacionadas con exámenes HINE"},
-        {"name": "Advisor", "description": "Operaciones relacionadas con exámenes HINE"}
+        {"name": "Advisor", "description": "Operaciones relacionadas con exámenes HINE"},
+        {"name": "Admin", "description": "Métricas operativas del servicio"}
     ]
 )
 
@@ -33,6 +55,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Consultas SQL por request (headers de debug y presupuesto por ruta)
+app.add_middleware(QueryStatsMiddleware)
+
+# Compresión Brotli/gzip: por fuera de CORS, así también cubre los errores
+app.add_middleware(CompressionMiddleware)
+
+# Latencia por ruta para /metrics: envuelve todo lo anterior
+app.add_middleware(MetricsMiddleware)
+
 # Endpoint de prueba para verificar tokens
 @app.get("/test-token")
 async def test_token(current_user: dict = Depends(get_current_user)):
@@ -45,3 +76,5 @@ async def test_token(current_user: dict = Depends(get_current_user)):
 app.include_router(child_router, prefix="/children", tags=["Children"])
 app.include_router(hine_exam_router, prefix="/hineExam", tags=["Hine Exam"])
 app.include_router(advisor_router, prefix="/advisors", tags=["Advisor"])
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
+app.include_router(metrics_router)
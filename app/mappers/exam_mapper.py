@@ -1,11 +1,29 @@
-from typing import Any, List
+import json
+from typing import Any, List, Tuple
+from uuid import UUID, uuid4
+from datetime import date, datetime
 from collections import defaultdict
+from app.config import EXAM_MAPPER_STRICT
 from app.models.exam import Exams
+from app.models.exam_summary import ExamSummaries
 from app.schemas.exam import (
     HineExam,AnalysisData, BehaviorData, MotorMilestoneData,
-    ModuleResponse, QuestionResponse, BehaviorResponse
+    ModuleResponse, QuestionResponse, BehaviorResponse, ExamSummary, parse_exam_date
 )
 
+# Puntaje máximo de cada ítem de los módulos de análisis
+MAX_ITEM_SCORE = 3
+
+# Separador de los comentarios generales guardados en sections.section_comments
+SEPARATOR_SECTION_COMMENTS = "|||"
+
+# Lectura: el examen se arma como dict en una sola pasada y se valida una vez
+# con HineExam.model_validate (pydantic-core), que en pydantic v2 es más
+# rápido que construir cada QuestionResponse por separado, incluso con
+# model_construct. EXAM_MAPPER_STRICT=true pasa a validación estricta (sin
+# coerciones) para detectar datos de la base con tipos inesperados.
+STRICT = EXAM_MAPPER_STRICT
+
 
 def to_exam_model(hine_exam: HineExam) -> Exams:
     """
@@ -14,7 +32,7 @@ def to_exam_model(hine_exam: HineExam) -> Exams:
     Esta función no incluye la creación de secciones ni ítems asociados.
     """
     return Exams(
-        id= hine_exam.examId,
+        id= hine_exam.examId or uuid4(),
         name="Hine Exam",
         eliminated=False,
         child_id=hine_exam.patientId,
@@ -23,117 +41,213 @@ def to_exam_model(hine_exam: HineExam) -> Exams:
   cronological_age=hine_exam.cronologicalAge,
   corrected_age=hine_exam.correctedAge,
   head_circumference=hine_exam.headCircumference,
-        created_at=hine_exam.examDate
-        # created_at se genera automáticamente si no se especifica
+        # examDate llega como texto (validado en HineExam); asyncpg exige un date real
+        created_at=parse_exam_date(hine_exam.examDate)
     )
 
 
-def to_exam_response_from_rows(rows: list[Any]) -> HineExam:
-    from app.services.hine_exam_service import HineExamService
+def to_section_and_item_rows(
+    exam_id: UUID, hine_exam: HineExam, separator: str
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Aplana un HineExam en filas listas para inserción masiva en las tablas
+    sections e items. Los ids de sección se generan aquí para poder enlazar
+    los ítems sin esperar a que la base de datos los devuelva.
+    """
+    section_rows: List[dict] = []
+    item_rows: List[dict] = []
 
-    if not rows:
-        raise ValueError("No data found for exam")
+    def add_section(section_name: str, comments: List[str]) -> UUID:
+        section_id = uuid4()
+        section_rows.append({
+            "id": section_id,
+            "id_exam": exam_id,
+            "section_name": section_name,
+            "section_comments": separator.join(comments),
+        })
+        return section_id
 
-    first = rows[0]
+    def add_item(section_id: UUID, response, with_asymmetry: bool = True) -> None:
+        item_rows.append({
+            "id": uuid4(),
+            "section_id": section_id,
+            "title": response.questionId,
+            "score": response.selectedValue,
+            "description": response.comment,
+            "left_asimetric_count": int(response.leftAsymmetry) if with_asymmetry else 0,
+            "right_asimetric_count": int(response.rightAsymmetry) if with_asymmetry else 0,
+        })
 
-    analysis_general_comments = []
-    motor_general_comments = []
-    behavior_general_comments = []
+    for module in hine_exam.analysis.modules:
+        section_id = add_section("analysis:" + module.moduleId, hine_exam.analysis.generalComments)
+        for response in module.responses:
+            add_item(section_id, response)
+
+    motor_section_id = add_section("motor_milestones", hine_exam.motorMilestones.generalComments)
+    for response in hine_exam.motorMilestones.responses:
+        add_item(motor_section_id, response)
+
+    behavior_section_id = add_section("behavior", hine_exam.behavior.generalComments)
+    for response in hine_exam.behavior.responses:
+        add_item(behavior_section_id, response, with_asymmetry=False)
+
+    return section_rows, item_rows
 
 
-    # Acumuladores
+def to_exam_summary_row(exam_model: Exams, hine_exam: HineExam) -> dict:
+    """
+    Fila de exam_summaries para un examen nuevo. Usa las mismas reglas que la
+    lectura (solo los módulos de análisis suman puntaje y asimetrías).
+    """
+    module_scores = {}
+    max_score = 0
+    total_left = 0
+    total_right = 0
+    for module in hine_exam.analysis.modules:
+        module_scores[module.moduleId] = sum(r.selectedValue or 0 for r in module.responses)
+        max_score += MAX_ITEM_SCORE * len(module.responses)
+        total_left += sum(int(r.leftAsymmetry) for r in module.responses)
+        total_right += sum(int(r.rightAsymmetry) for r in module.responses)
+
+    item_count = (
+        sum(len(module.responses) for module in hine_exam.analysis.modules)
+        + len(hine_exam.motorMilestones.responses)
+        + len(hine_exam.behavior.responses)
+    )
+    return {
+        "exam_id": exam_model.id,
+        "child_id": exam_model.child_id,
+        "doctor_id": exam_model.doctor_id,
+        "exam_date": exam_model.created_at,
+        "total_score": sum(module_scores.values()),
+        "max_possible_score": max_score,
+        "total_left_asymmetries": total_left,
+        "total_right_asymmetries": total_right,
+        "item_count": item_count,
+        "module_scores": module_scores,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def to_exam_summary(summary: ExamSummaries) -> ExamSummary:
+    return ExamSummary(
+        examId=summary.exam_id,
+        patientId=summary.child_id,
+        userId=summary.doctor_id,
+        examDate=summary.exam_date.strftime("%Y-%m-%d"),
+        totalScore=summary.total_score,
+        maxPossibleScore=summary.max_possible_score,
+        totalLeftAsymmetries=summary.total_left_asymmetries,
+        totalRightAsymmetries=summary.total_right_asymmetries,
+        moduleScores=summary.module_scores,
+    )
+
+
+def _exam_from_sections(exam: Any, sections: Any) -> HineExam:
+    """
+    Núcleo común de los mappers de lectura. `exam` tiene las columnas del
+    examen (exam_id, child_id, ...) y `sections` es un iterable de
+    (section_name, section_comments, items) con items como tuplas
+    (título, puntaje, comentario, asimetría izq., asimetría der.).
+    Los comentarios se separan una sola vez por sección.
+    """
     analysis_modules = []
+    analysis_general_comments = []
     motor_responses = []
+    motor_general_comments = []
     behavior_responses = []
+    behavior_general_comments = []
 
     analysis_score = 0
     max_score = 0
     total_right = 0
     total_left = 0
 
-    # Agrupar filas por section_name
-    sections = defaultdict(list)
-    for row in rows:
-        sections[row.section_name].append(row)
+    for name, comments_raw, items in sections:
+        comments = (comments_raw or "").split(SEPARATOR_SECTION_COMMENTS)
 
-    # Procesar Analysis (buscando secciones con prefijo 'analysis:')
-    for section_key, section_rows in sections.items():
-        if section_key.startswith("analysis:"):
-            module_id = section_key.split(":")[1]
+        if name.startswith("analysis:"):
+            analysis_general_comments = comments
             module_score = 0
             responses = []
+            for title, score, description, left, right in items:
+                responses.append({
+                    "questionId": title,
+                    "selectedValue": score,
+                    "comment": description,
+                    "leftAsymmetry": bool(left),
+                    "rightAsymmetry": bool(right),
+                })
+                module_score += score or 0
+                total_left += left or 0
+                total_right += right or 0
+            max_score += MAX_ITEM_SCORE * len(items)
 
-            for row in section_rows:
-                comments_raw = row.section_comments or ""
-                analysis_general_comments = comments_raw.split(HineExamService.SEPARATOR_SECTION_COMMENTS)
-                print("-------------------")
-                print(analysis_general_comments)
-                responses.append(QuestionResponse(
-                    questionId=row.item_title,
-                    selectedValue=row.item_score,
-                    comment=row.item_description,
-                    leftAsymmetry=bool(row.left_asimetric_count),
-                    rightAsymmetry=bool(row.right_asimetric_count),
-                ))
-
-                module_score += row.item_score or 0
-                max_score += 3
-                total_left += row.left_asimetric_count or 0
-                total_right += row.right_asimetric_count or 0
-
-            analysis_modules.append(ModuleResponse(
-                moduleId=module_id,
-                obtainedScore=module_score,
-                responses=responses
-            ))
+            analysis_modules.append({
+                "moduleId": name.split(":")[1],
+                "obtainedScore": module_score,
+                "responses": responses,
+            })
             analysis_score += module_score
 
-    # Motor milestones
-    for row in sections.get("motor_milestones", []):
-        comments_raw = row.section_comments or ""
-        motor_general_comments = comments_raw.split(HineExamService.SEPARATOR_SECTION_COMMENTS)
-
-        motor_responses.append(QuestionResponse(
-            questionId=row.item_title,
-            selectedValue=row.item_score,
-            comment=row.item_description,
-            leftAsymmetry=bool(row.left_asimetric_count),
-            rightAsymmetry=bool(row.right_asimetric_count),
-        ))
+        elif name == "motor_milestones":
+            motor_general_comments = comments
+            for title, score, description, left, right in items:
+                motor_responses.append({
+                    "questionId": title,
+                    "selectedValue": score,
+                    "comment": description,
+                    "leftAsymmetry": bool(left),
+                    "rightAsymmetry": bool(right),
+                })
 
-    # Behavior
-    for row in sections.get("behavior", []):
-        comments_raw = row.section_comments or ""
-        behavior_general_comments = comments_raw.split(HineExamService.SEPARATOR_SECTION_COMMENTS)
+        elif name == "behavior":
+            behavior_general_comments = comments
+            for title, score, description, _, _ in items:
+                behavior_responses.append({"questionId": title, "selectedValue": score, "comment": description})
 
-        behavior_responses.append(BehaviorResponse(
-            questionId=row.item_title,
-            selectedValue=row.item_score,
-            comment=row.item_description,
-        ))
+    exam_id = exam.exam_id
+    exam_date = exam.exam_created_at
+    return HineExam.model_validate({
+        "examId": exam_id if isinstance(exam_id, UUID) or exam_id is None else UUID(str(exam_id)),
+        "patientId": exam.child_id,
+        "userId": exam.doctor_id,
+        "doctorName": exam.doctor_name,
+        "examDate": exam_date.strftime("%Y-%m-%d") if isinstance(exam_date, date) else str(exam_date)[:10],
+        "analysis": {
+            "modules": analysis_modules,
+            "totalScore": analysis_score,
+            "maxPossibleScore": max_score,
+            "totalRightAsymmetries": total_right,
+            "totalLeftAsymmetries": total_left,
+            "generalComments": analysis_general_comments,
+        },
+        "motorMilestones": {"responses": motor_responses, "generalComments": motor_general_comments},
+        "behavior": {"responses": behavior_responses, "generalComments": behavior_general_comments},
+        "gestationalAge": exam.gestational_age,
+        "cronologicalAge": exam.cronological_age,
+        "correctedAge": exam.corrected_age,
+        "headCircumference": exam.head_circumference,
+    }, strict=STRICT)
 
 
-    return HineExam(
-        examId=first.exam_id,
-        patientId=first.child_id,
-        userId=first.doctor_id,
-        doctorName=first.doctor_name,
-        examDate = first.exam_created_at.strftime("%Y-%m-%d"),
-        analysis=AnalysisData(
-            modules=analysis_modules,
-            totalScore=analysis_score,
-            maxPossibleScore=max_score,
-            totalRightAsymmetries=total_right,
-            totalLeftAsymmetries=total_left,
-            generalComments=analysis_general_comments
-        ),
-        motorMilestones=MotorMilestoneData(responses=motor_responses, generalComments=motor_general_comments),
-        behavior=BehaviorData(responses=behavior_responses, generalComments=behavior_general_comments),
-        gestationalAge=first.gestational_age,
-        cronologicalAge=first.cronological_age,
-        correctedAge=first.corrected_age,
-        headCircumference=first.head_circumference,
-    )
+def to_exam_response_from_rows(rows: list[Any]) -> HineExam:
+    """HineExam a partir de las filas de full_exam_view (una por ítem) de un examen."""
+    if not rows:
+        raise ValueError("No data found for exam")
+
+    # Una sola pasada: se agrupa por sección guardando los comentarios una vez
+    sections: dict = {}
+    for row in rows:
+        section = sections.get(row.section_name)
+        if section is None:
+            section = sections[row.section_name] = (row.section_name, row.section_comments, [])
+        section[2].append((
+            row.item_title, row.item_score, row.item_description,
+            row.left_asimetric_count, row.right_asimetric_count,
+        ))
+
+    return _exam_from_sections(rows[0], sections.values())
 
 
 def build_exams_from_rows(rows: list[Any]) -> List[HineExam]:
@@ -145,12 +259,30 @@ def build_exams_from_rows(rows: list[Any]) -> List[HineExam]:
     for row in rows:
         exams_grouped[row.exam_id].append(row)
 
-    # Convertir cada grupo a un HineExam
-    exams: List[HineExam] = []
-    for exam_rows in exams_grouped.values():
-        exam = to_exam_response_from_rows(exam_rows)
-        exams.append(exam)
-
+    exams = [to_exam_response_from_rows(exam_rows) for exam_rows in exams_grouped.values()]
     exams.sort(key=lambda e: e.examDate, reverse=True)
 
     return exams
+
+
+def to_exam_response_from_json_row(row: Any) -> HineExam:
+    """
+    Arma un HineExam a partir de una fila de EXAM_JSON_SQL: columnas del
+    examen más `sections`, un JSON con [{name, comments, items: [[título,
+    puntaje, comentario, izq, der], ...]}, ...]. Mismo resultado que
+    to_exam_response_from_rows.
+    """
+    # asyncpg entrega el json como texto; psycopg2 ya lo decodifica
+    sections = row.sections
+    if isinstance(sections, (str, bytes)):
+        sections = json.loads(sections)
+
+    return _exam_from_sections(
+        row, ((section["name"], section["comments"], section["items"]) for section in sections)
+    )
+
+
+def build_exams_from_json_rows(rows: list[Any]) -> List[HineExam]:
+    exams = [to_exam_response_from_json_row(row) for row in rows]
+    exams.sort(key=lambda e: e.examDate, reverse=True)
+    return exams
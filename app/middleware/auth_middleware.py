@@ -1,18 +1,35 @@
-import jwt
-from fastapi import Request, HTTPException, status
+import re
+
+from fastapi import Request, HTTPException
 from fastapi.responses import JSONResponse
-from app.config import SECRET_KEY, ALGORITHM
+from app.auth.auth_utils import verify_token
+
+# Rutas que no requieren autenticación (prefijos, compilados una sola vez)
+PUBLIC_PATHS = re.compile(r"^/(?:docs|redoc|openapi\.json|favicon\.ico)")
 
 async def verify_jwt_token(request: Request, call_next):
-    # Lista de rutas que no requieren autenticación
-    public_paths = ["/docs", "/redoc", "/openapi.json", "/favicon.ico"]
-    
-    # Verificar si la ruta actual es pública
-    if any(request.url.path.startswith(path) for path in public_paths):
-        response = await call_next(request)
-        return response
-    
-    # Para rutas con dependencias de seguridad, el middleware no necesita validar
-    # ya que FastAPI manejará la validación automáticamente
-    response = await call_next(request)
-    return response 
\ No newline at end of file
+    """
+    Verifica el token una sola vez por request y deja los claims en
+    `request.state.user`, que es lo que devuelve `get_current_user`.
+    Sin header Authorization se deja pasar: las rutas protegidas responden
+    como siempre a través de HTTPBearer.
+    """
+    if PUBLIC_PATHS.match(_route_path(request)):
+        return await call_next(request)
+
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            request.state.user = verify_token(token.strip())
+        except HTTPException as e:
+            return JSONResponse({"detail": e.detail}, status_code=e.status_code, headers=e.headers)
+
+    return await call_next(request)
+
+def _route_path(request: Request) -> str:
+    # Con root_path ("/hine/form") la ruta puede llegar con el prefijo
+    path = request.scope["path"]
+    root_path = request.scope.get("root_path", "")
+    if root_path and path.startswith(root_path):
+        return path[len(root_path):]
+    return path
@@ -0,0 +1,151 @@
+import gzip
+import re
+
+import anyio
+import brotli
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.config import (
+    COMPRESSION_BROTLI_QUALITY, COMPRESSION_ENABLED, COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_BYTES, COMPRESSION_THREAD_MIN_BYTES
+)
+
+# Solo vale la pena con texto; PDFs, imágenes y zips ya vienen comprimidos
+COMPRESSIBLE_TYPES = re.compile(r"^(?:text/|application/(?:json|javascript|xml|problem\+json)\b)")
+
+# Preferencia del servidor ante q-values iguales
+ENCODINGS = ("br", "gzip")
+
+SKIP_STATE_KEY = "skip_compression"
+
+
+def skip_compression(request: Request) -> None:
+    """Dependencia para que una ruta responda sin comprimir."""
+    setattr(request.state, SKIP_STATE_KEY, True)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Codificación aceptada con mayor q (br antes que gzip si empatan)."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Middleware ASGI que comprime con Brotli o gzip las respuestas de texto
+    (las historias en JSON repiten mucho las mismas claves) según el
+    Accept-Encoding del cliente.
+
+    No toca: respuestas chicas (< min_bytes), tipos no comprimibles (PDF),
+    respuestas que ya traen Content-Encoding, 206/304 ni rutas con
+    `Depends(skip_compression)`. El cuerpo se junta completo antes de
+    comprimir (la API no tiene respuestas en streaming) y los grandes se
+    comprimen en un hilo para no frenar el event loop.
+    Al comprimir, el ETag pasa a débil: el cuerpo ya no es byte a byte el
+    mismo, pero If-None-Match lo sigue reconociendo.
+
+    Toda respuesta comprimible lleva `Vary: Accept-Encoding`, también si
+    sale sin comprimir (chica o sin codificación aceptada): si no, un proxy
+    podría servir esa copia a un cliente que sí acepta br, o la comprimida
+    a uno que no.
+    """
+
+    def __init__(self, app,
+                 min_bytes: int = COMPRESSION_MIN_BYTES,
+                 thread_min_bytes: int = COMPRESSION_THREAD_MIN_BYTES,
+                 enabled: bool = COMPRESSION_ENABLED):
+        self.app = app
+        self.min_bytes = min_bytes
+        self.thread_min_bytes = thread_min_bytes
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            async def send_uncompressed(message):
+                if message["type"] == "http.response.start" and self._compressible(scope, message):
+                    MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                await send(message)
+
+            await self.app(scope, receive, send_uncompressed)
+            return
+
+        start_message = None
+        passthrough = False
+        chunks = []
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start_message = message
+                passthrough = not self._compressible(scope, message)
+                if passthrough:
+                    await send(message)
+                return
+
+            # Los middlewares "http" reenvían el cuerpo en varios fragmentos
+            chunks.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(chunks)
+            if len(body) < self.min_bytes:
+                MutableHeaders(raw=start_message["headers"]).add_vary_header("Accept-Encoding")
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+                return
+
+            if len(body) >= self.thread_min_bytes:
+                body = await anyio.to_thread.run_sync(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(scope, message) -> bool:
+        if message["status"] in (206, 304) or scope.get("state", {}).get(SKIP_STATE_KEY):
+            return False
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return False
+        return bool(COMPRESSIBLE_TYPES.match(headers.get("content-type", "")))
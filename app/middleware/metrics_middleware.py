@@ -0,0 +1,40 @@
+import time
+
+from app.services.metrics import HTTP_LATENCY, HTTP_REQUESTS
+
+# Rutas que no existen se agrupan para no crear una serie por URL
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide cada request y la cuenta por método, plantilla
+    de ruta (`/hineExam/{exam_id}`, no el id concreto) y status. La
+    plantilla la deja FastAPI en `scope["route"]` al resolver la ruta.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", UNMATCHED_ROUTE)
+            method = scope["method"]
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=method, route=path)
+            HTTP_REQUESTS.inc(method=method, route=path, status=status_code)
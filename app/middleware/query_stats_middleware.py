@@ -0,0 +1,81 @@
+import logging
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+
+from app.config import QUERY_BUDGET, QUERY_DEBUG_HEADERS, QUERY_REPEAT_THRESHOLD, QUERY_STATS_ENABLED
+from app.database.query_stats import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def query_budget(limit: Optional[int]):
+    """
+    Dependencia que fija el presupuesto de consultas de una ruta. None
+    desactiva el presupuesto y el aviso de N+1, para rutas que escalan con
+    el tamaño del pedido (importaciones por lotes):
+
+        @router.get("/{exam_id}", dependencies=[Depends(query_budget(3))])
+    """
+
+    def set_budget() -> None:
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return set_budget
+
+
+class QueryStatsMiddleware:
+    """
+    Middleware ASGI que cuenta las consultas, el tiempo en la base y las
+    sesiones de cada request. Con QUERY_DEBUG_HEADERS las devuelve en
+    X-DB-Queries / X-DB-Time-Ms / X-DB-Sessions. Loguea un warning si la
+    ruta supera su presupuesto (QUERY_BUDGET o `query_budget(n)`) o si una
+    misma sentencia se repite QUERY_REPEAT_THRESHOLD veces (posible N+1).
+    """
+
+    def __init__(self, app,
+                 budget: int = QUERY_BUDGET,
+                 repeat_threshold: int = QUERY_REPEAT_THRESHOLD,
+                 debug_headers: bool = QUERY_DEBUG_HEADERS,
+                 enabled: bool = QUERY_STATS_ENABLED):
+        self.app = app
+        self.budget = budget
+        self.repeat_threshold = repeat_threshold
+        self.debug_headers = debug_headers
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(self.budget)
+        token = current_query_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and self.debug_headers:
+                headers = MutableHeaders(raw=message["headers"])
+                headers["X-DB-Queries"] = str(stats.queries)
+                headers["X-DB-Time-Ms"] = f"{stats.db_seconds * 1000:.1f}"
+                headers["X-DB-Sessions"] = str(stats.sessions)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            current_query_stats.reset(token)
+            self._check(scope, stats)
+
+    def _check(self, scope, stats: QueryStats) -> None:
+        if stats.budget is None:
+            return
+        route = getattr(scope.get("route"), "path", scope["path"])
+        if stats.queries > stats.budget:
+            logger.warning("%s %s ejecutó %d consultas (presupuesto %d, %.1f ms en la base, %d sesiones)",
+                           scope["method"], route, stats.queries, stats.budget,
+                           stats.db_seconds * 1000, stats.sessions)
+        for sql, count in stats.repeated(self.repeat_threshold):
+            logger.warning("%s %s repitió %d veces la misma consulta (posible N+1): %s",
+                           scope["method"], route, count, " ".join(sql.split())[:200])
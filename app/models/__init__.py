@@ -1,5 +1,7 @@
 from .child import Children
 from .doctor import Doctors
 from .exam import Exams
+from .exam_summary import ExamSummaries
 from .item import Items
 from .section import Sections
+from .pdf_job import PdfJobs
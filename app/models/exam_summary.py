@@ -0,0 +1,21 @@
+from uuid import UUID
+from sqlmodel import SQLModel, Field, Column, JSON
+from datetime import date, datetime
+from typing import Dict
+
+class ExamSummaries(SQLModel, table=True):
+    """Puntajes y asimetrías de cada examen, calculados una sola vez al crearlo."""
+    __tablename__ = "exam_summaries"
+
+    exam_id: UUID = Field(foreign_key="exams.id", primary_key=True)
+    child_id: str = Field(foreign_key="children.id", index=True)
+    doctor_id: str = Field(foreign_key="doctors.id")
+    exam_date: date
+    total_score: int = Field(default=0)
+    max_possible_score: int = Field(default=0)
+    total_left_asymmetries: int = Field(default=0)
+    total_right_asymmetries: int = Field(default=0)
+    item_count: int = Field(default=0)
+    # moduleId -> puntaje obtenido
+    module_scores: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON, nullable=False))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,25 @@
+from uuid import UUID, uuid4
+from sqlmodel import SQLModel, Field, Column, JSON, LargeBinary
+from datetime import datetime
+from typing import Optional, List
+
+class PdfJobs(SQLModel, table=True):
+    __tablename__ = "pdf_jobs"
+
+    id: UUID = Field(default_factory=uuid4, primary_key=True)
+    # "exam", "child" o "batch"
+    kind: str
+    target_id: Optional[str] = None
+    exam_ids: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    # "pending" -> "running" -> "done" | "failed"
+    status: str = Field(default="pending", index=True)
+    attempts: int = Field(default=0)
+    error: Optional[str] = None
+    requested_by: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    # El PDF queda en la base para sobrevivir reinicios y servirse desde
+    # cualquier worker
+    pdf: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
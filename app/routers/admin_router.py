@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.auth_utils import get_current_user
+from app.auth.token_cache import token_cache
+from app.database.database import async_engine_metrics, engine_metrics
+from app.services.cache_events import cache_events
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_render_queue import render_queue
+from app.services.service_cache import service_cache
+
+
+router = APIRouter()
+
+@router.get("/pdf-renders")
+async def get_pdf_render_stats(current_user: dict = Depends(get_current_user)):
+    """Profundidad de la cola y tiempos de render de PDFs de este worker."""
+    return render_queue.stats()
+
+@router.get("/pdf-cache")
+async def get_pdf_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Aciertos, fallos y ocupación de la caché de PDFs (memoria y disco)."""
+    return pdf_cache.stats()
+
+@router.get("/service-cache")
+async def get_service_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Aciertos, fallos y expulsiones de la caché de lecturas de este worker."""
+    return {**service_cache.stats(), "events": cache_events.stats()}
+
+@router.get("/auth-cache")
+async def get_auth_cache_stats(current_user: dict = Depends(get_current_user)):
+    """Aciertos y ocupación de la caché de tokens verificados de este worker."""
+    return token_cache.stats()
+
+@router.get("/db-pool")
+async def get_db_pool_stats(current_user: dict = Depends(get_current_user)):
+    """Conexiones en uso/libres, esperas y overflow de los pools de este worker."""
+    return {"sync": engine_metrics.stats(), "async": async_engine_metrics.stats()}
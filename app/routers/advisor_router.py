@@ -10,8 +10,8 @@ service = AdvisorService()
 
 @router.post("/", response_model=AdvisorResponse,status_code=status.HTTP_201_CREATED)
 async def create_advisor(advisor:AdvisorCreate, current_user: dict = Depends(get_current_user)):
-	return service.create_advisor(advisor)
+	return await service.create_advisor_async(advisor)
 
 @router.put("/", response_model=AdvisorResponse, status_code=status.HTTP_200_OK)
 async def update_advisor(advisor:AdvisorUpdate, current_user: dict = Depends(get_current_user)):
-	return service.update_advisor(advisor)
\ No newline at end of file
+	return await service.update_advisor_async(advisor)
\ No newline at end of file
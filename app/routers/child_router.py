@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from typing import List
-from app.schemas.child import ChildResponse, ChildCreate, ChildUpdate
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from typing import List, Optional
+from datetime import date
+from app.config import CHILDREN_PAGE_DEFAULT, CHILDREN_PAGE_MAX
+from app.schemas.child import ChildResponse, ChildCreate, ChildUpdate, ChildFilters, ChildPage
 from app.services.child_service import ChildService
 from app.models.child import Children as Child
 from app.services.exam_service import ExamService
@@ -18,29 +20,55 @@ service4= ItemService()
 
 @router.get("/", response_model=List[ChildResponse])
 async def get_children(current_user: dict = Depends(get_current_user)):
-    return service.get_all_children()
+    """Todos los niños activos; para listas grandes usar /children/page."""
+    return await service.get_all_children_async()
+
+@router.get("/page", response_model=ChildPage)
+async def get_children_page(
+    limit: int = Query(CHILDREN_PAGE_DEFAULT, ge=1, le=CHILDREN_PAGE_MAX),
+    cursor: Optional[str] = None,
+    name: Optional[str] = Query(None, min_length=1, description="Prefijo del nombre o apellido"),
+    birth_date_from: Optional[date] = None,
+    birth_date_to: Optional[date] = None,
+    exam_date_from: Optional[date] = None,
+    exam_date_to: Optional[date] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Niños activos ordenados por apellido, paginados por cursor: para la
+    página siguiente se envía el `next_cursor` de la respuesta anterior.
+    Va antes de /{child_id} para que "page" no se tome como id.
+    """
+    filters = ChildFilters(
+        name=name,
+        birth_date_from=birth_date_from,
+        birth_date_to=birth_date_to,
+        exam_date_from=exam_date_from,
+        exam_date_to=exam_date_to,
+    )
+    return await service.get_children_page_async(limit, cursor, filters)
 
 @router.get("/{child_id}", response_model=ChildResponse)
 async def get_child_by_id(child_id: str, current_user: dict = Depends(get_current_user)):
-    child = service.get_child_by_id(child_id)
+    child = await service.get_child_by_id_async(child_id)
     if child is None:
         raise HTTPException(status_code=404, detail="Child not found")
     return child
 
 @router.post("/", response_model=ChildResponse, status_code=status.HTTP_201_CREATED)
 async def create_child(child: ChildCreate, current_user: dict = Depends(get_current_user)):
-    return service.create_child(child)
+    return await service.create_child_async(child)
 
 @router.put("/{child_id}", response_model=ChildResponse)
 async def update_child(child_id: str, child: ChildUpdate, current_user: dict = Depends(get_current_user)):
-    updated_child = service.update_child(child_id, child)
+    updated_child = await service.update_child_async(child_id, child)
     if updated_child is None:
         raise HTTPException(status_code=404, detail="Child not found")
     return updated_child
 
 @router.delete("/{child_id}", response_model=dict)
 async def delete_child(child_id: str, current_user: dict = Depends(get_current_user)):
-    success = service.soft_delete_child(child_id)
+    success = await service.soft_delete_child_async(child_id)
     if not success:
         raise HTTPException(status_code=404, detail="Child not found")
     return {"detail": "Child deleted"}
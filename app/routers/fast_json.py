@@ -0,0 +1,20 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse que serializa con pydantic-core (Rust) en lugar de
+    `jsonable_encoder` + `json.dumps`. Acepta modelos pydantic, listas de
+    modelos y tipos simples (fechas, UUID) directamente, sin pasar antes por
+    dicts de Python, que es lo que encarece las historias de exámenes.
+
+    Es la clase por defecto de la app; las rutas que ya tienen los modelos
+    listos la devuelven directamente para saltear además la revalidación del
+    `response_model`.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
@@ -1,67 +1,139 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List
-from io import BytesIO
 
-from app.schemas.exam import HineExam
+from app.schemas.exam import HineExam, ExamSummary, ExamImportReport
 from app.schemas.section import CreateSection
 from app.schemas.item import CreateItem
 from app.services.hine_exam_service import HineExamService
+from app.services.exam_import_service import ExamImportService
+from app.middleware.compression_middleware import skip_compression
+from app.middleware.query_stats_middleware import query_budget
 from app.auth.auth_utils import get_current_user
 from app.services.hine_pdf_renderer import HINEPdfRenderer
+from app.schemas.pdf_job import PdfJobCreate, PdfJobResponse
+from app.services.pdf_job_service import PdfJobService
+from app.services.pdf_job_worker import pdf_job_worker
+from app.routers.http_cache import (
+    make_etag, content_etag, is_not_modified, not_modified_response, json_response, pdf_response
+)
+from app.routers.fast_json import FastJSONResponse
 
 router = APIRouter()
 service = HineExamService()
+import_service = ExamImportService(service)
 
 @router.post("/", response_model=HineExam, status_code=status.HTTP_201_CREATED)
 async def create_hine_exam(exam: HineExam, current_user: dict = Depends(get_current_user)):
     try:
         print(exam)
-        return service.create_exam(exam)
+        return await service.create_exam_async(exam)
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
 
+@router.post("/import", response_model=ExamImportReport, dependencies=[Depends(query_budget(None)), Depends(skip_compression)])
+async def import_hine_exams(request: Request, current_user: dict = Depends(get_current_user)):
+    """
+    Importa exámenes en NDJSON (un HineExam por línea, Content-Type
+    application/x-ndjson) leyendo el cuerpo a medida que llega. Devuelve el
+    resultado de cada línea; los registros con error no frenan al resto.
+    """
+    return await import_service.import_ndjson_async(request.stream())
+
+@router.post("/pdf-jobs", response_model=PdfJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_pdf_job(job: PdfJobCreate, current_user: dict = Depends(get_current_user)):
+    """
+    Encola la generación de un PDF (un examen, la historia de un niño o una
+    lista de exámenes) y devuelve el id del trabajo para consultar su estado.
+    """
+    created = await PdfJobService.create_job_async(job, current_user.get("sub"))
+    pdf_job_worker.notify()
+    return created
+
+@router.get("/pdf-jobs/{job_id}", response_model=PdfJobResponse)
+async def get_pdf_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    return await PdfJobService.get_job_async(job_id)
+
+@router.get("/pdf-jobs/{job_id}/pdf", dependencies=[Depends(skip_compression)])
+async def download_pdf_job(job_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    # Primero el trabajo (404 si no existe o se purgó, 409 si no terminó);
+    # su resultado no cambia, así que el id alcanza como ETag
+    pdf_bytes = await PdfJobService.get_job_pdf_async(job_id)
+    etag = make_etag("pdf-job", job_id)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    return pdf_response(request, pdf_bytes, f"HINE_{job_id}.pdf", etag)
+
 @router.get("/{exam_id}", response_model=HineExam)
-async def get_hine_exam(exam_id: str, current_user: dict = Depends(get_current_user)):
+async def get_hine_exam(exam_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    version = await service.get_exam_version_async(exam_id)
+    etag = make_etag("exam", exam_id, version) if version else None
+    if etag and is_not_modified(request, etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
     try:
-        return service.get_exam(exam_id)
+        exam = await service.get_exam_async(exam_id)
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return json_response(exam, etag, version.last_modified) if etag else FastJSONResponse(exam)
 
-@router.get("/{exam_id}/pdf", response_model=HineExam)
-async def get_hine_exam(exam_id: str, current_user: dict = Depends(get_current_user)):
+@router.get("/{exam_id}/pdf", response_model=HineExam, dependencies=[Depends(skip_compression)])
+async def get_hine_exam(exam_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    # El render es determinista: versión del examen + huella del renderer
+    # identifican los bytes y el 304 sale sin consultar la vista ni renderizar
+    version = await service.get_exam_version_async(exam_id)
+    etag = make_etag("exam-pdf", exam_id, version, service.pdf_fingerprint()) if version else None
+    if etag and is_not_modified(request, etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
     try:
-        pdf_bytes = service.get_exam_pdf(exam_id)
+        pdf_bytes = await service.get_exam_pdf_async(exam_id)
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     filename = f"HINE_Examen_{exam_id}.pdf"
-    return StreamingResponse(
-        BytesIO(pdf_bytes),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
+    if not etag:
+        return pdf_response(request, pdf_bytes, filename, content_etag(pdf_bytes))
+    return pdf_response(request, pdf_bytes, filename, etag, version.last_modified)
     
 @router.get("/children/{children_id}")
-async def get_hine_exams_by_children(children_id: str, current_user: dict = Depends(get_current_user)):
+async def get_hine_exams_by_children(children_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    version = await service.get_child_version_async(children_id)
+    etag = make_etag("child-exams", children_id, version) if version else None
+    if etag and is_not_modified(request, etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
     try:
-        return service.get_exams_by_children(children_id)
+        exams = await service.get_exams_by_children_async(children_id)
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return json_response(exams, etag, version.last_modified) if etag else FastJSONResponse(exams)
+
+@router.get("/children/{children_id}/summaries", response_model=List[ExamSummary])
+async def get_hine_exam_summaries(children_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """
+    Puntajes y asimetrías de cada examen del niño, del más reciente al más
+    antiguo, leídos de exam_summaries sin tocar secciones ni ítems.
+    """
+    version = await service.get_child_version_async(children_id)
+    etag = make_etag("child-summaries", children_id, version) if version else None
+    if etag and is_not_modified(request, etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
+    summaries = await service.get_exam_summaries_by_children_async(children_id)
+    return json_response(summaries, etag, version.last_modified) if etag else FastJSONResponse(summaries)
 
-@router.get("/children/{children_id}/history/pdf")
-async def get_hine_history_pdf(children_id: str, current_user: dict = Depends(get_current_user)):
+@router.get("/children/{children_id}/history/pdf", dependencies=[Depends(skip_compression)])
+async def get_hine_history_pdf(children_id: str, request: Request, current_user: dict = Depends(get_current_user)):
     """
     Devuelve un PDF con TODOS los exámenes HINE del niño (historia clínica).
+    El ETag sale de la versión de la historia, antes de leer los exámenes.
     """
+    version = await service.get_child_version_async(children_id)
+    etag = make_etag("child-history-pdf", children_id, version, service.pdf_fingerprint()) if version else None
+    if etag and is_not_modified(request, etag, version.last_modified):
+        return not_modified_response(etag, version.last_modified)
     try:
-        pdf_bytes = service.get_child_history_pdf(children_id)
+        pdf_bytes = await service.get_child_history_pdf_async(children_id)
     except HTTPException as e:
         raise HTTPException(status_code=e.status_code, detail=e.detail)
 
     filename = f"HINE_Historia_{children_id}.pdf"
-    return StreamingResponse(
-        BytesIO(pdf_bytes),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
-    )
\ No newline at end of file
+    if not etag:
+        return pdf_response(request, pdf_bytes, filename, content_etag(pdf_bytes))
+    return pdf_response(request, pdf_bytes, filename, etag, version.last_modified)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import re
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from app.routers.fast_json import FastJSONResponse
+
+# Las respuestas se pueden guardar en el cliente pero siempre se revalidan
+CACHE_CONTROL = "private, no-cache"
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def make_etag(*parts) -> str:
+    """ETag fuerte a partir de la versión de los datos (no del cuerpo ya generado)."""
+    raw = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def content_etag(body: bytes) -> str:
+    """
+    ETag fuerte a partir de los bytes. Solo para PDFs sin versión (exámenes
+    sin fila en exam_summaries): el render es determinista, así que coincide
+    entre renders de los mismos datos, pero exige renderizar antes del 304.
+    """
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def cache_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = format_datetime(_as_utc(last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evalúa If-None-Match (comparación débil, como pide RFC 9110) y, solo si
+    no viene, If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # Last-Modified viaja con resolución de segundos
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, last_modified))
+
+
+def json_response(content: Any, etag: str, last_modified: Optional[datetime] = None) -> FastJSONResponse:
+    return FastJSONResponse(content, headers=cache_headers(etag, last_modified))
+
+
+def pdf_response(request: Request, pdf: bytes, filename: str, etag: str,
+                 last_modified: Optional[datetime] = None) -> Response:
+    """
+    Respuesta del PDF con soporte de Range de un solo intervalo (206/416).
+    Si viene If-Range y no coincide con el ETag actual se devuelve el PDF
+    completo. Rangos múltiples se ignoran y también se responde completo.
+    """
+    headers = cache_headers(etag, last_modified)
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (if_range is None or if_range.strip() == etag):
+        match = RANGE_RE.match(range_header.strip())
+        if match:
+            size = len(pdf)
+            start, end = match.groups()
+            if start:
+                first, last = int(start), min(int(end), size - 1) if end else size - 1
+            elif end:
+                first, last = max(size - int(end), 0), size - 1
+            else:
+                first, last = 0, -1
+            if first > last or first >= size:
+                headers["Content-Range"] = f"bytes */{size}"
+                return Response(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, headers=headers)
+            headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+            return Response(pdf[first:last + 1], status_code=status.HTTP_206_PARTIAL_CONTENT,
+                            media_type="application/pdf", headers=headers)
+
+    return Response(pdf, media_type="application/pdf", headers=headers)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Las columnas DateTime guardan UTC sin zona
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
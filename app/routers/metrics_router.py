@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.auth.auth_utils import get_current_user
+from app.auth.token_cache import token_cache
+from app.config import METRICS_PUBLIC
+from app.database.database import async_engine_metrics, engine_metrics
+from app.services.metrics import registry
+from app.services.pdf_cache import pdf_cache
+from app.services.pdf_render_queue import render_queue
+from app.services.service_cache import service_cache
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Misma protección que las rutas de /admin salvo METRICS_PUBLIC (ver config)
+router = APIRouter(dependencies=[] if METRICS_PUBLIC else [Depends(get_current_user)])
+
+
+def _pools(*fields: str) -> dict:
+    values = {}
+    for name, metrics in (("sync", engine_metrics), ("async", async_engine_metrics)):
+        stats = metrics.stats()
+        for field in fields:
+            values[(name, field)] = stats[field]
+    return values
+
+
+def _cache(name: str, stats: dict, *fields: str) -> dict:
+    return {(name, field): stats[field] for field in fields}
+
+
+registry.callback(
+    "hine_db_pool_connections", "Conexiones del pool por estado.", ("engine", "state"),
+    lambda: _pools("checked_out", "idle", "overflow"))
+registry.callback(
+    "hine_db_pool_events_total", "Eventos del pool de conexiones.", ("engine", "event"),
+    lambda: _pools("checkouts", "connects", "overflow_connects", "invalidations", "timeouts"),
+    kind="counter")
+registry.callback(
+    "hine_pdf_render_queue", "Renders de PDF en curso y en espera.", ("state",),
+    lambda: {"in_flight": render_queue.in_flight, "queued": render_queue.waiting})
+registry.callback(
+    "hine_cache_lookups_total", "Consultas a las cachés en proceso por resultado.", ("cache", "result"),
+    lambda: {
+        **_cache("service", service_cache.stats(), "hits", "misses"),
+        **_cache("auth", token_cache.stats(), "hits", "misses"),
+        **{("pdf", field): value for field, value in pdf_cache.stats().items()
+           if field in ("hits_memory", "hits_disk", "misses")},
+    },
+    kind="counter")
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Métricas de este worker en formato de texto de Prometheus. Requiere
+    `Authorization: Bearer <token>` (en Prometheus, `authorization` del
+    scrape config) salvo con METRICS_PUBLIC=true.
+    """
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
@@ -1,5 +1,8 @@
 # schemas/child.py
+import base64
+import json
 from typing import Optional
+from fastapi import HTTPException
 from pydantic import BaseModel,  ConfigDict
 from datetime import date
 from app.models.child import Children as Child
@@ -26,12 +29,41 @@ class ChildUpdate(BaseModel):
     birth_date: Optional[date] = None
     exam_date: Optional[date] = None
 
+class ChildFilters(BaseModel):
+    name: Optional[str] = None
+    birth_date_from: Optional[date] = None
+    birth_date_to: Optional[date] = None
+    exam_date_from: Optional[date] = None
+    exam_date_to: Optional[date] = None
+
+class ChildPage(BaseModel):
+    items: list[ChildResponse]
+    limit: int
+    next_cursor: Optional[str] = None
+
     
+def encode_child_cursor(child) -> str:
+    """Cursor opaco con la clave de orden (last_name, id) del último niño de la página."""
+    raw = json.dumps([child.last_name, child.id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_child_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        last_name, child_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(last_name), str(child_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor de paginación inválido.")
+
 def to_child_response(child: Child) -> ChildResponse:
     return ChildResponse.model_validate(child)
 
 def to_child_response_list(children: list[Child]) -> list[ChildResponse]:
     return [ChildResponse.model_validate(child) for child in children]
 
+def to_child_page(children: list[Child], limit: int) -> ChildPage:
+    # Se piden limit + 1 filas: si sobra una, hay página siguiente
+    next_cursor = encode_child_cursor(children[limit - 1]) if len(children) > limit else None
+    return ChildPage(items=to_child_response_list(children[:limit]), limit=limit, next_cursor=next_cursor)
+
 def to_child_model(child_create: ChildCreate) -> Child:
     return Child(**child_create.model_dump()) 
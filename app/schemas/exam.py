@@ -1,6 +1,19 @@
 from uuid import UUID
-from pydantic import BaseModel, ConfigDict
-from typing import List, Optional
+from datetime import date, datetime
+from pydantic import BaseModel, ConfigDict, field_validator
+from typing import Dict, List, Optional
+
+
+def parse_exam_date(value: str) -> date:
+    """Fecha del examen: YYYY-MM-DD o fecha y hora ISO 8601 (se toma el día)."""
+    try:
+        if len(value) <= 10:
+            return date.fromisoformat(value)
+        return datetime.fromisoformat(value).date()
+    except ValueError:
+        raise ValueError(
+            f"examDate debe tener formato YYYY-MM-DD o fecha y hora ISO 8601, se recibió {value!r}"
+        )
 
 class QuestionResponse(BaseModel):
     questionId: str
@@ -58,3 +71,37 @@ class HineExam(BaseModel):
     headCircumference:str
     model_config = ConfigDict(from_attributes=True)
 
+    @field_validator("examDate")
+    @classmethod
+    def check_exam_date(cls, value: str) -> str:
+        # Error 422 claro acá en lugar de fallar al armar el modelo Exams
+        parse_exam_date(value)
+        return value
+
+
+class ExamSummary(BaseModel):
+    examId: UUID
+    patientId: str
+    userId: str
+    examDate: str
+    totalScore: int
+    maxPossibleScore: int
+    totalLeftAsymmetries: int
+    totalRightAsymmetries: int
+    moduleScores: Dict[str, int]
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ExamImportResult(BaseModel):
+    """Resultado de un registro del NDJSON importado (`line` empieza en 1)."""
+    line: int
+    examId: Optional[UUID] = None
+    status: str  # "created" o "error"
+    detail: Optional[str] = None
+
+
+class ExamImportReport(BaseModel):
+    received: int
+    created: int
+    failed: int
+    results: List[ExamImportResult]
@@ -0,0 +1,49 @@
+# schemas/pdf_job.py
+from uuid import UUID
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+from app.config import PDF_JOB_MAX_EXAMS
+from app.models.pdf_job import PdfJobs as PdfJob
+
+class PdfJobCreate(BaseModel):
+    """Exactamente uno: un examen, la historia de un niño o una lista de exámenes."""
+    exam_id: Optional[str] = None
+    child_id: Optional[str] = None
+    exam_ids: Optional[List[str]] = Field(default=None, max_length=PDF_JOB_MAX_EXAMS)
+
+    @model_validator(mode="after")
+    def check_single_target(self):
+        targets = [t for t in (self.exam_id, self.child_id, self.exam_ids) if t]
+        if len(targets) != 1:
+            raise ValueError("Indica exactamente uno de exam_id, child_id o exam_ids.")
+        return self
+
+class PdfJobResponse(BaseModel):
+    id: UUID
+    kind: str
+    status: str
+    target_id: Optional[str] = None
+    exam_ids: Optional[List[str]] = None
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    download_url: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+def to_pdf_job_model(job_create: PdfJobCreate, requested_by: Optional[str] = None) -> PdfJob:
+    if job_create.exam_id:
+        return PdfJob(kind="exam", target_id=job_create.exam_id, requested_by=requested_by)
+    if job_create.child_id:
+        return PdfJob(kind="child", target_id=job_create.child_id, requested_by=requested_by)
+    return PdfJob(kind="batch", exam_ids=job_create.exam_ids, requested_by=requested_by)
+
+def to_pdf_job_response(job: PdfJob) -> PdfJobResponse:
+    response = PdfJobResponse.model_validate(job)
+    if job.status == "done":
+        response.download_url = f"/hineExam/pdf-jobs/{job.id}/pdf"
+    return response
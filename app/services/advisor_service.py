@@ -1,6 +1,8 @@
 from fastapi import HTTPException
 from sqlmodel import Session, select
-from app.database.database import engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database.database import engine, async_engine
+from app.services.cache_invalidation import child_tags, invalidate_child, publish, publish_async
 
 from app.models.advisor import Advisor
 from app.models.advisor_child import AdvisorChildLink
@@ -39,8 +41,10 @@ class AdvisorService:
             )
             session.add(link)
 
+            publish(session, child_tags(advisor_create.child_id))
             session.commit()
             session.refresh(advisor)
+            invalidate_child(advisor_create.child_id)
             return to_advisor_response(advisor)
 
     @staticmethod
@@ -91,7 +95,96 @@ class AdvisorService:
             )
             session.add(link)
 
+            publish(session, child_tags(advisor_update.child_id))
             session.commit()
             session.refresh(advisor)
+            invalidate_child(advisor_update.child_id)
             return to_advisor_response(advisor)
 
+    # -------------------- VARIANTES ASYNC --------------------
+
+    @staticmethod
+    async def create_advisor_async(advisor_create: AdvisorCreate) -> AdvisorResponse:
+        async with AsyncSession(async_engine) as session:
+            child = await session.get(Children, advisor_create.child_id)
+            if not child:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Child with ID {advisor_create.child_id} not found."
+                )
+
+            advisor = await session.get(Advisor, advisor_create.id)
+
+            if advisor:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Advisor with ID {advisor_create.id} already exists. Use update_advisor instead."
+                )
+
+            advisor = to_advisor_model(advisor_create)
+            session.add(advisor)
+
+            link = AdvisorChildLink(
+                advisor_id=advisor.id,
+                child_id=child.id,
+                relationship=advisor_create.relationship
+            )
+            session.add(link)
+
+            await publish_async(session, child_tags(advisor_create.child_id))
+            await session.commit()
+            await session.refresh(advisor)
+            invalidate_child(advisor_create.child_id)
+            return to_advisor_response(advisor)
+
+    @staticmethod
+    async def update_advisor_async(advisor_update: AdvisorUpdate) -> AdvisorResponse:
+        async with AsyncSession(async_engine) as session:
+            child = await session.get(Children, advisor_update.child_id)
+            if not child:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Child with ID {advisor_update.child_id} not found."
+                )
+
+            advisor = await session.get(Advisor, advisor_update.id)
+
+            if not advisor:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Advisor with ID {advisor_update.id} not found. Use create_advisor instead."
+                )
+
+            if advisor_update.name is not None:
+                advisor.name = advisor_update.name
+            if advisor_update.last_name is not None:
+                advisor.last_name = advisor_update.last_name
+            if advisor_update.phone_number is not None:
+                advisor.phone_number = advisor_update.phone_number
+            if advisor_update.email is not None:
+                advisor.email = advisor_update.email
+
+            statement = select(AdvisorChildLink).where(
+                AdvisorChildLink.advisor_id == advisor.id,
+                AdvisorChildLink.child_id == child.id
+            )
+            link = (await session.exec(statement)).first()
+
+            if link:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Advisor with ID {advisor_update.id} already linked to Child with ID {advisor_update.child_id}."
+                )
+
+            link = AdvisorChildLink(
+                advisor_id=advisor.id,
+                child_id=child.id,
+                relationship=advisor_update.relationship
+            )
+            session.add(link)
+
+            await publish_async(session, child_tags(advisor_update.child_id))
+            await session.commit()
+            await session.refresh(advisor)
+            invalidate_child(advisor_update.child_id)
+            return to_advisor_response(advisor)
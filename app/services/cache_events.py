@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.config import CACHE_NOTIFY_CHANNEL, CACHE_NOTIFY_RECONNECT_SECONDS
+from app.database.database import ASYNC_DATABASE_URL
+from app.services.cache_invalidation import NOTIFY, ORIGIN, decode_event, invalidate_local
+from app.services.service_cache import service_cache
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEventListener:
+    """
+    Tarea asyncio por worker que escucha el canal de NOTIFY y aplica en este
+    proceso las invalidaciones publicadas por los demás.
+
+    Usa una conexión asyncpg propia (LISTEN la ocupa mientras viva, no tiene
+    sentido sacarla del pool). Si la conexión se corta se pudieron perder
+    eventos, así que al reconectar se vacía la caché de lecturas; la de PDFs
+    no hace falta porque sus claves dependen del contenido.
+    """
+
+    # Cada cuánto se comprueba que la conexión siga viva
+    KEEPALIVE_SECONDS = 30
+
+    def __init__(self,
+                 channel: str = CACHE_NOTIFY_CHANNEL,
+                 reconnect_seconds: float = CACHE_NOTIFY_RECONNECT_SECONDS,
+                 enabled: bool = NOTIFY):
+        self.channel = channel
+        self.reconnect_seconds = reconnect_seconds
+        self.enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+
+        self.received = 0
+        self.applied = 0
+        self.reconnects = 0
+
+    async def start(self) -> None:
+        if self._task or not self.enabled:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "channel": self.channel,
+            "connected": self._connected,
+            "received": self.received,
+            "applied": self.applied,
+            "reconnects": self.reconnects,
+        }
+
+    async def _run(self) -> None:
+        first = True
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(**self._connect_args())
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(self.channel, self._on_event)
+                self._connected = True
+                # Mientras no hubo conexión se leyó sin recibir eventos
+                service_cache.clear()
+                if not first:
+                    self.reconnects += 1
+                    logger.info("Escucha de invalidaciones restablecida; caché de lecturas vaciada")
+                first = False
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.KEEPALIVE_SECONDS)
+                    except asyncio.TimeoutError:
+                        await connection.fetchval("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Sin conexión para escuchar invalidaciones de caché")
+            finally:
+                self._connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_seconds)
+
+    def _on_event(self, connection, pid, channel, payload: str) -> None:
+        self.received += 1
+        try:
+            origin, tags = decode_event(payload)
+        except (ValueError, AttributeError):
+            logger.warning("Evento de caché inválido: %r", payload)
+            return
+        # Este worker ya invalidó lo suyo después del commit
+        if origin == ORIGIN:
+            return
+        invalidate_local(*tags)
+        self.applied += 1
+
+    @staticmethod
+    def _connect_args() -> dict:
+        url = make_url(ASYNC_DATABASE_URL)
+        return {
+            "host": url.host,
+            "port": url.port,
+            "user": url.username,
+            "password": url.password,
+            "database": url.database,
+            "ssl": url.query.get("ssl"),
+        }
+
+
+cache_events = CacheEventListener()
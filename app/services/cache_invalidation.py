@@ -0,0 +1,94 @@
+"""
+Punto único para invalidar las cachés en proceso (PDFs y lecturas de
+servicios) cuando se escribe sobre un examen o un niño.
+
+Cada escritura hace dos cosas con las mismas etiquetas:
+  1. `publish`/`publish_async` dentro de la transacción, antes del commit:
+     encola un pg_notify que Postgres entrega a los demás workers recién
+     cuando la transacción confirma (si hay rollback no se envía nada).
+  2. `invalidate_exam`/`invalidate_child` después del commit, en este worker.
+Los demás workers reciben el evento en `cache_events` y llaman a
+`invalidate_local` con las etiquetas.
+"""
+import json
+import os
+import socket
+import uuid
+from typing import Iterable, Optional
+
+from sqlalchemy import text
+
+from app.config import CACHE_NOTIFY_CHANNEL, CACHE_NOTIFY_ENABLED
+from app.database.database import engine
+from app.services.pdf_cache import pdf_cache
+from app.services.service_cache import service_cache
+
+# NOTIFY solo existe en Postgres; en SQLite (pruebas locales) hay un solo proceso
+NOTIFY = CACHE_NOTIFY_ENABLED and engine.dialect.name == "postgresql"
+
+# Identifica los eventos de este proceso para no procesarlos dos veces
+ORIGIN = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+NOTIFY_SQL = text("SELECT pg_notify(:channel, :payload)")
+
+# El payload de NOTIFY tiene un límite de 8000 bytes: las escrituras masivas
+# publican sus etiquetas en varios eventos
+NOTIFY_MAX_TAGS = 100
+
+
+def exam_tags(exam_id: str, child_id: Optional[str] = None) -> list[str]:
+    """Examen nuevo o modificado; la historia del niño cambia con él."""
+    tags = [f"exam:{exam_id}"]
+    if child_id is not None:
+        tags.append(f"child:{child_id}")
+    return tags
+
+
+def child_tags(child_id: str) -> list[str]:
+    """El niño cambió (datos, baja, asesores): su ficha, su historia y sus PDFs."""
+    return [f"child:{child_id}"]
+
+
+def invalidate_local(*tags: str) -> None:
+    service_cache.invalidate(*tags)
+    pdf_cache.invalidate(*tags)
+
+
+def invalidate_child(child_id: str) -> None:
+    invalidate_local(*child_tags(child_id))
+
+
+def invalidate_exam(exam_id: str, child_id: Optional[str] = None) -> None:
+    invalidate_local(*exam_tags(exam_id, child_id))
+
+
+def publish(session, tags: Iterable[str]) -> None:
+    """Encola el evento en la transacción de `session` (Session sync)."""
+    if NOTIFY:
+        for chunk in _chunks(tags):
+            session.exec(NOTIFY_SQL.bindparams(**_notify_params(chunk)))
+
+
+async def publish_async(session, tags: Iterable[str]) -> None:
+    """Igual que `publish` para AsyncSession."""
+    if NOTIFY:
+        for chunk in _chunks(tags):
+            await session.execute(NOTIFY_SQL.bindparams(**_notify_params(chunk)))
+
+
+def encode_event(tags: Iterable[str]) -> str:
+    return json.dumps({"origin": ORIGIN, "tags": [str(tag) for tag in tags]}, separators=(",", ":"))
+
+
+def decode_event(payload: str) -> tuple[str, list[str]]:
+    event = json.loads(payload)
+    return event.get("origin", ""), [str(tag) for tag in event.get("tags", [])]
+
+
+def _notify_params(tags: Iterable[str]) -> dict:
+    return {"channel": CACHE_NOTIFY_CHANNEL, "payload": encode_event(tags)}
+
+
+def _chunks(tags: Iterable[str]) -> list[list[str]]:
+    tags = list(tags)
+    return [tags[i:i + NOTIFY_MAX_TAGS] for i in range(0, len(tags), NOTIFY_MAX_TAGS)]
@@ -1,9 +1,17 @@
+import logging
+
 from fastapi import HTTPException
-from sqlmodel import Session, select
+from sqlmodel import Session, select, or_
+from sqlalchemy import func, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.child import Children as Child
-from app.database.database import engine
+from app.database.database import engine, async_engine
+from app.services.cache_invalidation import child_tags, invalidate_child, publish, publish_async
+from app.services.service_cache import service_cache, MISSING
 from sqlalchemy.exc import IntegrityError
-from app.schemas.child import ChildResponse, ChildCreate, ChildUpdate,to_child_response, to_child_response_list , to_child_model
+from app.schemas.child import ChildResponse, ChildCreate, ChildUpdate, ChildFilters, ChildPage, to_child_response, to_child_response_list , to_child_model, to_child_page, decode_child_cursor
+
+logger = logging.getLogger(__name__)
 
 
 class ChildService:
@@ -29,14 +37,24 @@ class ChildService:
             ).all()
             return to_child_response_list(children)
 
+    @staticmethod
+    def get_children_page(limit: int, cursor: str | None = None, filters: ChildFilters | None = None) -> ChildPage:
+        with Session(engine) as session:
+            children = session.exec(ChildService._page_query(limit, cursor, filters)).all()
+            return to_child_page(children, limit)
+
     @staticmethod
     def get_child_by_id(child_id: str) -> ChildResponse | None:
-        print(child_id)
+        logger.debug("Niño %s", child_id)
+        cached = service_cache.get(("child", str(child_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
         with Session(engine) as session:
             child = session.exec(
                 select(Child).where(Child.id == str(child_id), Child.eliminated == 0)
             ).first()
-            return to_child_response(child) if child else None
+            return ChildService._remember(child_id, to_child_response(child), since) if child else None
 
     @staticmethod
     def update_child(child_id: str, data: ChildUpdate) -> ChildResponse | None:
@@ -57,8 +75,10 @@ class ChildService:
                     print(f"Actualizando {key}: {child_dict[key]} -> {value}")
                     setattr(child, key, value)
 
+            publish(session, child_tags(child_id))
             session.commit()
             session.refresh(child)
+            invalidate_child(child_id)
             return to_child_response(child)
 
 
@@ -71,5 +91,124 @@ class ChildService:
             if not child:
                 return False
             child.eliminated = 1
+            publish(session, child_tags(child_id))
             session.commit()
+            invalidate_child(child_id)
+            return True
+
+    # -------------------- VARIANTES ASYNC --------------------
+
+    @staticmethod
+    async def create_child_async(child: ChildCreate) -> ChildResponse:
+        async with AsyncSession(async_engine) as session:
+            try:
+                child = to_child_model(child)
+                session.add(child)
+                await session.commit()
+                await session.refresh(child)
+                return to_child_response(child)
+            except IntegrityError as e:
+                print(e)
+                await session.rollback()
+                raise HTTPException(status_code=409, detail=f"Child with ID {child.id} already exists.")
+
+    @staticmethod
+    async def get_all_children_async() -> list[ChildResponse]:
+        async with AsyncSession(async_engine) as session:
+            children = (await session.exec(
+                select(Child).where(Child.eliminated == 0)
+            )).all()
+            return to_child_response_list(children)
+
+    @staticmethod
+    async def get_children_page_async(limit: int, cursor: str | None = None, filters: ChildFilters | None = None) -> ChildPage:
+        async with AsyncSession(async_engine) as session:
+            children = (await session.exec(ChildService._page_query(limit, cursor, filters))).all()
+            return to_child_page(children, limit)
+
+    @staticmethod
+    async def get_child_by_id_async(child_id: str) -> ChildResponse | None:
+        cached = service_cache.get(("child", str(child_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        async with AsyncSession(async_engine) as session:
+            child = (await session.exec(
+                select(Child).where(Child.id == str(child_id), Child.eliminated == 0)
+            )).first()
+            return ChildService._remember(child_id, to_child_response(child), since) if child else None
+
+    @staticmethod
+    async def update_child_async(child_id: str, data: ChildUpdate) -> ChildResponse | None:
+        async with AsyncSession(async_engine) as session:
+            child = (await session.exec(
+                select(Child).where(Child.id == str(child_id), Child.eliminated == 0)
+            )).first()
+            if not child:
+                return None
+
+            child_dict = child.model_dump()
+            for key, value in data.model_dump(exclude_unset=True).items():
+                if key in child_dict and child_dict[key] != value:
+                    setattr(child, key, value)
+
+            await publish_async(session, child_tags(child_id))
+            await session.commit()
+            await session.refresh(child)
+            invalidate_child(child_id)
+            return to_child_response(child)
+
+    @staticmethod
+    async def soft_delete_child_async(child_id: str) -> bool:
+        async with AsyncSession(async_engine) as session:
+            child = (await session.exec(
+                select(Child).where(Child.id == child_id, Child.eliminated == 0)
+            )).first()
+            if not child:
+                return False
+            child.eliminated = 1
+            await publish_async(session, child_tags(child_id))
+            await session.commit()
+            invalidate_child(child_id)
             return True
+
+    # -------------------- CACHÉ --------------------
+
+    @staticmethod
+    def _remember(child_id: str, child: ChildResponse, since: int) -> ChildResponse:
+        # Los niños inexistentes no se cachean: se pueden crear después
+        service_cache.put(("child", str(child_id)), child, (f"child:{child_id}",), since)
+        return child
+
+    # -------------------- PAGINACIÓN --------------------
+
+    @staticmethod
+    def _page_query(limit: int, cursor: str | None, filters: ChildFilters | None):
+        """
+        Página ordenada por (last_name, id) con keyset: en vez de OFFSET se
+        continúa desde la clave del cursor, así cada página es un recorrido
+        acotado del índice ix_children_active_last_name_id.
+        """
+        query = select(Child).where(Child.eliminated == 0)
+        if cursor:
+            last_name, child_id = decode_child_cursor(cursor)
+            query = query.where(tuple_(Child.last_name, Child.id) > tuple_(last_name, child_id))
+
+        filters = filters or ChildFilters()
+        if filters.name:
+            # Prefijo sin distinguir mayúsculas, sobre los índices lower(...)
+            prefix = filters.name.strip().lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            query = query.where(or_(
+                func.lower(Child.last_name).like(prefix, escape="\\"),
+                func.lower(Child.name).like(prefix, escape="\\"),
+            ))
+        if filters.birth_date_from:
+            query = query.where(Child.birth_date >= filters.birth_date_from)
+        if filters.birth_date_to:
+            query = query.where(Child.birth_date <= filters.birth_date_to)
+        if filters.exam_date_from:
+            query = query.where(Child.exam_date >= filters.exam_date_from)
+        if filters.exam_date_to:
+            query = query.where(Child.exam_date <= filters.exam_date_to)
+
+        return query.order_by(Child.last_name, Child.id).limit(limit + 1)
@@ -0,0 +1,240 @@
+"""
+Importación masiva de exámenes desde NDJSON (un HineExam por línea), para
+migrar la historia de una clínica sin un POST /hineExam/ por examen.
+
+El cuerpo se lee a medida que llega: cada línea se valida apenas se
+completa y los exámenes válidos se escriben de a IMPORT_BATCH_SIZE en una
+transacción por lote, con un INSERT multi-fila por tabla. En memoria hay a
+lo sumo un lote de exámenes y una línea incompleta; el reporte guarda solo
+número de línea, examId y estado de cada registro.
+"""
+from typing import AsyncIterator, List, NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import IMPORT_BATCH_SIZE, IMPORT_MAX_LINE_BYTES
+from app.database.database import async_engine
+from app.models.child import Children
+from app.models.doctor import Doctors
+from app.models.exam import Exams
+from app.models.exam_summary import ExamSummaries
+from app.models.item import Items
+from app.models.section import Sections
+from app.schemas.exam import ExamImportReport, ExamImportResult, HineExam
+from app.services.cache_invalidation import exam_tags, invalidate_exam, publish_async
+from app.services.hine_exam_service import HineExamService
+from app.services.metrics import timed
+
+# Errores de validación que se copian al reporte por registro
+MAX_VALIDATION_ERRORS = 3
+
+
+class _PendingExam(NamedTuple):
+    line: int
+    hine_exam: HineExam
+    exam_model: Exams
+    section_rows: list
+    item_rows: list
+    summary_row: dict
+
+
+async def iter_ndjson_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[tuple[int, Optional[bytes]]]:
+    """
+    (número de línea, contenido) de cada línea no vacía a medida que llegan
+    los chunks. Una línea de más de `max_line_bytes` se descarta sin
+    acumularla y se informa con contenido None.
+    """
+    buffer = bytearray()
+    line_no = 0
+    too_long = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not too_long:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        too_long = True
+                        buffer.clear()
+                break
+            line_no += 1
+            if too_long:
+                too_long = False
+                yield line_no, None
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    yield line_no, None
+                elif buffer.strip():
+                    yield line_no, bytes(buffer)
+            buffer.clear()
+            start = end + 1
+    if too_long or buffer.strip():
+        line_no += 1
+        yield line_no, None if too_long else bytes(buffer)
+
+
+class ExamImportService:
+    def __init__(
+        self,
+        hine_exam_service: Optional[HineExamService] = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        max_line_bytes: int = IMPORT_MAX_LINE_BYTES
+    ):
+        self.hine_exam_service = hine_exam_service or HineExamService()
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+
+    @timed("service.import_exams")
+    async def import_ndjson_async(self, chunks: AsyncIterator[bytes]) -> ExamImportReport:
+        """
+        Valida e inserta los exámenes del NDJSON. Un registro inválido no
+        frena al resto: queda en el reporte con su error.
+        """
+        results: List[ExamImportResult] = []
+        batch: List[_PendingExam] = []
+        async for line_no, line in iter_ndjson_lines(chunks, self.max_line_bytes):
+            parsed = self._parse(line_no, line)
+            if isinstance(parsed, ExamImportResult):
+                results.append(parsed)
+                continue
+            batch.append(parsed)
+            if len(batch) >= self.batch_size:
+                results.extend(await self._write_batch(batch))
+                batch = []
+        if batch:
+            results.extend(await self._write_batch(batch))
+
+        if not results:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="El archivo no tiene registros para importar"
+            )
+        results.sort(key=lambda result: result.line)
+        created = sum(1 for result in results if result.status == "created")
+        return ExamImportReport(
+            received=len(results), created=created, failed=len(results) - created, results=results
+        )
+
+    def _parse(self, line_no: int, line: Optional[bytes]):
+        """_PendingExam listo para insertar o el ExamImportResult con el error."""
+        if line is None:
+            return self._error(line_no, None, f"La línea supera el máximo de {self.max_line_bytes} bytes")
+        try:
+            hine_exam = HineExam.model_validate_json(line)
+        except ValidationError as e:
+            return self._error(line_no, None, self._validation_detail(e))
+        try:
+            rows = self.hine_exam_service._prepare_exam_rows(hine_exam)
+        except HTTPException as e:
+            return self._error(line_no, hine_exam.examId, e.detail)
+        return _PendingExam(line_no, hine_exam, *rows)
+
+    async def _write_batch(self, batch: List[_PendingExam]) -> List[ExamImportResult]:
+        async with AsyncSession(async_engine) as session:
+            accepted, results = await self._check_batch(session, batch)
+            if not accepted:
+                return results
+            try:
+                await self._insert(session, accepted)
+                await publish_async(session, self._tags(accepted))
+                await session.commit()
+            except IntegrityError:
+                # Otro request insertó o borró algo entre el chequeo y el
+                # INSERT: se reintenta examen por examen para aislar el culpable
+                await session.rollback()
+                accepted, failed = await self._insert_one_by_one(session, accepted)
+                results.extend(failed)
+
+        for pending in accepted:
+            invalidate_exam(str(pending.exam_model.id), pending.hine_exam.patientId)
+            results.append(ExamImportResult(line=pending.line, examId=pending.exam_model.id, status="created"))
+        return results
+
+    async def _check_batch(self, session: AsyncSession, batch: List[_PendingExam]):
+        """
+        Separa los exámenes que no se pueden insertar (ya existen, repetidos
+        en el archivo, niño o médico inexistente) con tres consultas por lote.
+        """
+        exam_ids = {pending.exam_model.id for pending in batch}
+        child_ids = {pending.hine_exam.patientId for pending in batch}
+        doctor_ids = {pending.hine_exam.userId for pending in batch}
+
+        existing = set((await session.exec(select(Exams.id).where(Exams.id.in_(exam_ids)))).all())
+        children = set((await session.exec(
+            select(Children.id).where(Children.id.in_(child_ids), Children.eliminated == 0)
+        )).all())
+        doctors = set((await session.exec(select(Doctors.id).where(Doctors.id.in_(doctor_ids)))).all())
+
+        accepted, results, seen = [], [], set()
+        for pending in batch:
+            exam_id = pending.exam_model.id
+            if exam_id in existing:
+                detail = "El examen ya existe"
+            elif exam_id in seen:
+                detail = "Examen repetido en el archivo"
+            elif pending.hine_exam.patientId not in children:
+                detail = f"Niño con ID {pending.hine_exam.patientId} no encontrado"
+            elif pending.hine_exam.userId not in doctors:
+                detail = f"Médico con ID {pending.hine_exam.userId} no encontrado"
+            else:
+                detail = None
+            seen.add(exam_id)
+            if detail:
+                results.append(self._error(pending.line, exam_id, detail))
+                continue
+            accepted.append(pending)
+        return accepted, results
+
+    @staticmethod
+    async def _insert(session: AsyncSession, pending: List[_PendingExam]) -> None:
+        await session.execute(insert(Exams), [p.exam_model.model_dump() for p in pending])
+        await session.execute(insert(Sections), [row for p in pending for row in p.section_rows])
+        item_rows = [row for p in pending for row in p.item_rows]
+        if item_rows:
+            await session.execute(insert(Items), item_rows)
+        await session.execute(insert(ExamSummaries), [p.summary_row for p in pending])
+
+    async def _insert_one_by_one(self, session: AsyncSession, batch: List[_PendingExam]):
+        accepted, failed = [], []
+        for pending in batch:
+            try:
+                async with session.begin_nested():
+                    await self._insert(session, [pending])
+            except IntegrityError:
+                failed.append(self._error(
+                    pending.line, pending.exam_model.id,
+                    "Integrity error: Possible duplicate or constraint violation"
+                ))
+            else:
+                accepted.append(pending)
+        if accepted:
+            await publish_async(session, self._tags(accepted))
+        await session.commit()
+        return accepted, failed
+
+    @staticmethod
+    def _tags(pending: List[_PendingExam]) -> list[str]:
+        tags = (tag for p in pending for tag in exam_tags(str(p.exam_model.id), p.hine_exam.patientId))
+        return list(dict.fromkeys(tags))
+
+    @staticmethod
+    def _error(line_no: int, exam_id, detail: str) -> ExamImportResult:
+        return ExamImportResult(line=line_no, examId=exam_id, status="error", detail=detail)
+
+    @staticmethod
+    def _validation_detail(error: ValidationError) -> str:
+        errors = error.errors()
+        messages = [
+            f"{'.'.join(str(part) for part in e['loc']) or 'json'}: {e['msg']}"
+            for e in errors[:MAX_VALIDATION_ERRORS]
+        ]
+        if len(errors) > MAX_VALIDATION_ERRORS:
+            messages.append(f"(+{len(errors) - MAX_VALIDATION_ERRORS} errores más)")
+        return "; ".join(messages)
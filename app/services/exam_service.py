@@ -1,9 +1,10 @@
 from fastapi import HTTPException
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from app.models.exam import Exams
 from app.schemas.exam import HineExam
-from app.database.database import engine
+from app.database.database import engine, async_engine
 from app.mappers.exam_mapper import to_exam_model
 
 class ExamService:
@@ -40,3 +41,35 @@ class ExamService:
                 status_code=500, 
                 detail=f"Unexpected error: {str(e)}"
             )
+
+    @staticmethod
+    async def create_exam_async(exam: HineExam) -> Exams:
+        try:
+            exam_model = to_exam_model(exam)
+        except Exception as e:
+            raise HTTPException(
+                status_code=422, 
+                detail=f"Invalid input data: {str(e)}"
+            )
+
+        try:
+            async with AsyncSession(async_engine) as session:
+                session.add(exam_model)
+                await session.commit()
+                await session.refresh(exam_model)
+                return exam_model
+        except IntegrityError as e:
+            if "foreign key" in str(e.orig).lower():
+                raise HTTPException(
+                    status_code=400, 
+                    detail="Foreign key error: The Child or Doctor does not exist"
+                )
+            raise HTTPException(
+                status_code=400, 
+                detail="Integrity error: Possible duplicate or constraint violation"
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, 
+                detail=f"Unexpected error: {str(e)}"
+            )
@@ -1,6 +1,10 @@
 import os
-from typing import Dict, Any, List, Optional
-from sqlmodel import Session, text
+from typing import Dict, Any, List, NamedTuple, Optional
+from uuid import UUID
+from sqlmodel import Session, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import insert, func
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from html import escape as html_escape
 import pdfkit
@@ -8,27 +12,81 @@ from datetime import datetime as _dt
 
 # Importaciones de servicios
 from app.mappers.exam_mapper import *
-from app.schemas.child import ChildUpdate
-from app.services.child_service import ChildService
 from app.services.exam_service import ExamService
 from app.services.hine_pdf_renderer import HINEPdfRenderer
+from app.services.cache_invalidation import exam_tags, invalidate_exam, publish, publish_async
+from app.services.service_cache import service_cache, MISSING
+from app.services.metrics import timed
 from app.services.section_service import SectionService
 from app.services.item_service import ItemService
 
 # Importaciones de esquemas
-from app.schemas.exam import HineExam
-from app.schemas.section import CreateSection, SectionResponse
-from app.schemas.item import CreateItem
+from app.schemas.exam import HineExam, ExamSummary
+
+# Modelos
+from app.models.exam import Exams
+from app.models.exam_summary import ExamSummaries
+from app.models.item import Items
+from app.models.section import Sections
 
 # Database
-from app.database.database import engine
+from app.database.database import engine, async_engine
+
+EXAM_BY_ID_SQL = text("""
+    SELECT * FROM full_exam_view
+    WHERE exam_id = :exam_id
+    ORDER BY section_id, item_id
+""")
+
+EXAMS_BY_CHILD_SQL = text("""
+    SELECT * FROM full_exam_view
+    WHERE child_id = :child_id
+    ORDER BY section_id, item_id
+""")
+
+# Una fila por examen: Postgres agrupa ítems y secciones en un documento JSON
+# y las columnas del examen viajan una sola vez en lugar de repetirse en cada
+# ítem. Los ítems van como arreglos [título, puntaje, comentario, izq, der].
+EXAM_COLUMNS = """exam_id, child_id, doctor_id, doctor_name, exam_created_at,
+           gestational_age, cronological_age, corrected_age, head_circumference"""
+
+EXAM_JSON_SQL = """
+    SELECT {exam_columns},
+           json_agg(json_build_object(
+               'name', section_name,
+               'comments', section_comments,
+               'items', items
+           ) ORDER BY section_id) AS sections
+    FROM (
+        SELECT {exam_columns},
+               section_id, section_name, section_comments,
+               json_agg(json_build_array(
+                   item_title, item_score, item_description,
+                   left_asimetric_count, right_asimetric_count
+               ) ORDER BY item_id) AS items
+        FROM full_exam_view
+        WHERE {where}
+        GROUP BY {exam_columns}, section_id, section_name, section_comments
+    ) AS exam_sections
+    GROUP BY {exam_columns}
+"""
+
+EXAM_JSON_BY_ID_SQL = text(EXAM_JSON_SQL.format(exam_columns=EXAM_COLUMNS, where="exam_id = :exam_id"))
+EXAMS_JSON_BY_CHILD_SQL = text(EXAM_JSON_SQL.format(exam_columns=EXAM_COLUMNS, where="child_id = :child_id"))
 
-childService = ChildService()
+# json_agg/json_build_object solo existen en Postgres; en otros motores se
+# mantiene la consulta fila por ítem
+JSON_AGGREGATION = engine.dialect.name == "postgresql"
 
 
+class ExamVersion(NamedTuple):
+    """Versión de uno o varios exámenes, para ETag/Last-Modified sin leer la vista."""
+    exams: int
+    last_modified: _dt
+
 
 class HineExamService:
-    SEPARATOR_SECTION_COMMENTS = "|||"
+    SEPARATOR_SECTION_COMMENTS = SEPARATOR_SECTION_COMMENTS
     def __init__(
         self,
         exam_service: Optional[ExamService] = None,
@@ -44,42 +102,38 @@ class HineExamService:
         self.item_service = item_service or ItemService()
         self.renderer = HINEPdfRenderer(
         get_exam_by_id=self.get_exam,              # adapta al nombre real
-        get_exams_by_child=self.get_exams_by_children
+        get_exams_by_child=self.get_exams_by_children,
+        get_exam_by_id_async=self.get_exam_async,
+        get_exams_by_child_async=self.get_exams_by_children_async
 )
 
+    @timed("service.get_exam_pdf")
     def get_exam_pdf(self, exam_id: str) -> bytes:
         return self.renderer.render_exam_pdf(exam_id)
 
+    @timed("service.get_child_history_pdf")
     def get_child_history_pdf(self, child_id: str) -> bytes:
         return self.renderer.render_child_history_pdf(child_id)
 
-    def _create_item(
-        self,
-        section_id: int,
-        title: str,
-        score: int,
-        description: str,
-        right_asimetric_count: Optional[int] = None,
-        left_asimetric_count: Optional[int] = None
-    ) -> Any:
-        """
-        Crea un ítem usando el modelo Pydantic ItemCreate.
-        """
-        try:
-            item_data = CreateItem(
-                title=title,
-                score=score,
-                description=description,
-                right_asimetric_count=right_asimetric_count,
-                left_asimetric_count=left_asimetric_count,
-                section_id=section_id
-            )
-            return self.item_service.create_item(item_data)
-        except Exception as e:
-            raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Error creating item '{title}': {str(e)}"
-            )
+    def pdf_fingerprint(self) -> dict:
+        """Configuración del renderer: si cambia, cambian los PDFs (y su ETag)."""
+        return self.renderer.fingerprint()
+
+    @timed("service.get_exams_batch_pdf")
+    def get_exams_batch_pdf(self, exam_ids: List[str]) -> bytes:
+        return self.renderer.render_exams_batch_pdf(exam_ids)
+
+    @timed("service.get_exam_pdf")
+    async def get_exam_pdf_async(self, exam_id: str) -> bytes:
+        return await self.renderer.render_exam_pdf_async(exam_id)
+
+    @timed("service.get_child_history_pdf")
+    async def get_child_history_pdf_async(self, child_id: str) -> bytes:
+        return await self.renderer.render_child_history_pdf_async(child_id)
+
+    @timed("service.get_exams_batch_pdf")
+    async def get_exams_batch_pdf_async(self, exam_ids: List[str]) -> bytes:
+        return await self.renderer.render_exams_batch_pdf_async(exam_ids)
 
     def _validate_required_fields(self, hine_exam: HineExam) -> None:
         """
@@ -96,171 +150,329 @@ class HineExamService:
                 detail="Doctor ID is required"
             )
             
+    @timed("service.get_exam")
     def get_exam(self, exam_id: str) -> HineExam:
+        cached = service_cache.get(("exam", str(exam_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
         with Session(engine) as session:
             try:
-                sql = text("""
-                    SELECT * FROM full_exam_view
-                    WHERE exam_id = :exam_id
-                    ORDER BY section_id, item_id
-                """)
-                result = session.exec(sql.bindparams(exam_id=exam_id))
-                print(exam_id)
+                result = session.exec(self._exam_by_id_sql().bindparams(exam_id=exam_id))
                 rows = result.all()
-                
-                if not rows:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Examen con ID {exam_id} no encontrado"
-                    )
-
-                return to_exam_response_from_rows(rows)
-                
+                exam = self._exam_from_rows(exam_id, rows)
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Error al obtener detalles del examen: {str(e)}"
                 )
+        return self._remember_exam(exam_id, exam, since)
         
+    @timed("service.get_exams_by_children")
     def get_exams_by_children(self, child_id: str) -> List[HineExam]:
+        cached = service_cache.get(("child-exams", str(child_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
         with Session(engine) as session:
             try:
-                sql = text("""
-                    SELECT * FROM full_exam_view
-                    WHERE child_id = :child_id
-                    ORDER BY section_id, item_id
-                """)
-                result = session.exec(sql.bindparams(child_id=child_id))
+                result = session.exec(self._exams_by_child_sql().bindparams(child_id=child_id))
                 rows = result.all()
-                
-                if not rows:
-                    raise HTTPException(
-                        status_code=status.HTTP_404_NOT_FOUND,
-                        detail=f"Niño con ID {child_id} no encontrado"
-                    )
-
-                return build_exams_from_rows(rows)
-                
+                exams = self._exams_from_rows(child_id, rows)
+            except HTTPException:
+                raise
             except Exception as e:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Error al obtener detalles del examen: {str(e)}"
                 )
+        return self._remember_child_exams(child_id, exams, since)
+
+    def get_exam_version(self, exam_id: str) -> Optional[ExamVersion]:
+        key = ("exam-version", str(exam_id))
+        cached = service_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        query = self._version_query(exam_id=exam_id)
+        if query is None:
+            return None
+        with Session(engine) as session:
+            version = self._to_version(session.exec(query).first())
+        return self._remember_version(key, version, f"exam:{exam_id}", since)
+
+    def get_child_version(self, child_id: str) -> Optional[ExamVersion]:
+        key = ("child-version", str(child_id))
+        cached = service_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        with Session(engine) as session:
+            version = self._to_version(session.exec(self._version_query(child_id=child_id)).first())
+        return self._remember_version(key, version, f"child:{child_id}", since)
+
+    @timed("service.get_exam_summaries")
+    def get_exam_summaries_by_children(self, child_id: str) -> List[ExamSummary]:
+        """Puntajes de los exámenes del niño sin leer secciones ni ítems."""
+        with Session(engine) as session:
+            summaries = session.exec(self._summaries_query(child_id)).all()
+            return [to_exam_summary(summary) for summary in summaries]
 
+    @timed("service.create_exam")
     def create_exam(self, hine_exam: HineExam) -> HineExam:
-        self._validate_required_fields(hine_exam)
+        """
+        Persiste el examen, sus secciones y sus ítems en una única
+        transacción con inserciones masivas. Si algo falla a mitad
+        de camino se revierte todo el examen y no quedan secciones huérfanas.
+        """
+        exam_model, section_rows, item_rows, summary_row = self._prepare_exam_rows(hine_exam)
+        exam_id = str(exam_model.id)
 
-        session = None
-        try:
-            session = Session(engine)
-
-            created_exam = self.exam_service.create_exam(hine_exam)
-
-            # Crear secciones y asignar ítems
-            section_ids = {}
-
-            for module in hine_exam.analysis.modules:
-                section = self._create_section(created_exam.id, "analysis:"+module.moduleId, hine_exam.analysis.generalComments)
-
-                section_ids[module.moduleId] = section.id
-
-                for item in module.responses:
-                    self._create_item(
-                        section_id=section.id,
-                        title=item.questionId,
-                        score=item.selectedValue,
-                        description=item.comment,
-                        left_asimetric_count=int(item.leftAsymmetry),
-                        right_asimetric_count=int(item.rightAsymmetry)
-                    )
-
-            # Motor milestones
-            motor_section = self._create_section(created_exam.id, "motor_milestones", section_comments=hine_exam.motorMilestones.generalComments)
-            for item in hine_exam.motorMilestones.responses:
-                self._create_item(
-                    section_id=motor_section.id,
-                    title=item.questionId,
-                    score=item.selectedValue,
-                    description=item.comment,
-                    left_asimetric_count=int(item.leftAsymmetry),
-                    right_asimetric_count=int(item.rightAsymmetry)
+        with Session(engine) as session:
+            try:
+                session.add(exam_model)
+                session.flush()
+
+                session.execute(insert(Sections), section_rows)
+                if item_rows:
+                    session.execute(insert(Items), item_rows)
+                session.execute(insert(ExamSummaries), [summary_row])
+
+                publish(session, exam_tags(exam_id, hine_exam.patientId))
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self._raise_create_error(e)
+
+            invalidate_exam(exam_id, hine_exam.patientId)
+            since = service_cache.generation()
+
+            result = session.exec(self._exam_by_id_sql().bindparams(exam_id=exam_id))
+            return self._remember_exam(exam_id, self._exam_from_rows(exam_id, result.all()), since)
+
+    # -------------------- VARIANTES ASYNC --------------------
+
+    @timed("service.get_exam")
+    async def get_exam_async(self, exam_id: str) -> HineExam:
+        cached = service_cache.get(("exam", str(exam_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        async with AsyncSession(async_engine) as session:
+            try:
+                result = await session.execute(self._exam_by_id_sql().bindparams(exam_id=exam_id))
+                rows = result.all()
+                exam = self._exam_from_rows(exam_id, rows)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error al obtener detalles del examen: {str(e)}"
                 )
+        return self._remember_exam(exam_id, exam, since)
 
-            # Behavior
-            behavior_section = self._create_section(created_exam.id, "behavior", section_comments=hine_exam.behavior.generalComments)
-            for item in hine_exam.behavior.responses:
-                self._create_item(
-                    section_id=behavior_section.id,
-                    title=item.questionId,
-                    score=item.selectedValue,
-                    description=item.comment
+    @timed("service.get_exams_by_children")
+    async def get_exams_by_children_async(self, child_id: str) -> List[HineExam]:
+        cached = service_cache.get(("child-exams", str(child_id)))
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        async with AsyncSession(async_engine) as session:
+            try:
+                result = await session.execute(self._exams_by_child_sql().bindparams(child_id=child_id))
+                rows = result.all()
+                exams = self._exams_from_rows(child_id, rows)
+            except HTTPException:
+                raise
+            except Exception as e:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Error al obtener detalles del examen: {str(e)}"
                 )
+        return self._remember_child_exams(child_id, exams, since)
 
-            self._updateChildrenData(
-                hine_exam.patientId,
-                hine_exam.gestationalAge,
-                hine_exam.cronologicalAge,
-                hine_exam.correctedAge,
-                hine_exam.headCircumference
-            )
+    async def get_exam_version_async(self, exam_id: str) -> Optional[ExamVersion]:
+        key = ("exam-version", str(exam_id))
+        cached = service_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        query = self._version_query(exam_id=exam_id)
+        if query is None:
+            return None
+        async with AsyncSession(async_engine) as session:
+            version = self._to_version((await session.exec(query)).first())
+        return self._remember_version(key, version, f"exam:{exam_id}", since)
 
-            session.commit()
+    async def get_child_version_async(self, child_id: str) -> Optional[ExamVersion]:
+        key = ("child-version", str(child_id))
+        cached = service_cache.get(key)
+        if cached is not MISSING:
+            return cached
+        since = service_cache.generation()
+        async with AsyncSession(async_engine) as session:
+            version = self._to_version((await session.exec(self._version_query(child_id=child_id))).first())
+        return self._remember_version(key, version, f"child:{child_id}", since)
 
-            sql = text("""
-                SELECT * FROM full_exam_view
-                WHERE exam_id = :exam_id
-                ORDER BY section_id, item_id
-            """)
-            result = session.exec(sql.bindparams(exam_id=created_exam.id))
-            rows = result.all()
+    @timed("service.get_exam_summaries")
+    async def get_exam_summaries_by_children_async(self, child_id: str) -> List[ExamSummary]:
+        async with AsyncSession(async_engine) as session:
+            summaries = (await session.exec(self._summaries_query(child_id))).all()
+            return [to_exam_summary(summary) for summary in summaries]
 
-            return to_exam_response_from_rows(rows)
+    @timed("service.create_exam")
+    async def create_exam_async(self, hine_exam: HineExam) -> HineExam:
+        """Variante async de create_exam: misma transacción única."""
+        exam_model, section_rows, item_rows, summary_row = self._prepare_exam_rows(hine_exam)
+        exam_id = str(exam_model.id)
 
-        except HTTPException:
-            if session:
-                session.rollback()
-            raise 
-        except Exception as e:
-            if session:
-                session.rollback()
+        async with AsyncSession(async_engine) as session:
+            try:
+                session.add(exam_model)
+                await session.flush()
+
+                await session.execute(insert(Sections), section_rows)
+                if item_rows:
+                    await session.execute(insert(Items), item_rows)
+                await session.execute(insert(ExamSummaries), [summary_row])
+
+                await publish_async(session, exam_tags(exam_id, hine_exam.patientId))
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                self._raise_create_error(e)
+
+            invalidate_exam(exam_id, hine_exam.patientId)
+            since = service_cache.generation()
+
+            result = await session.execute(self._exam_by_id_sql().bindparams(exam_id=exam_id))
+            return self._remember_exam(exam_id, self._exam_from_rows(exam_id, result.all()), since)
+
+    # -------------------- HELPERS --------------------
+
+    @staticmethod
+    def _exam_by_id_sql():
+        return EXAM_JSON_BY_ID_SQL if JSON_AGGREGATION else EXAM_BY_ID_SQL
+
+    @staticmethod
+    def _exams_by_child_sql():
+        return EXAMS_JSON_BY_CHILD_SQL if JSON_AGGREGATION else EXAMS_BY_CHILD_SQL
+
+    @staticmethod
+    @timed("mapper.exam")
+    def _exam_from_rows(exam_id: str, rows: list) -> HineExam:
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Examen con ID {exam_id} no encontrado"
+            )
+        if JSON_AGGREGATION:
+            return to_exam_response_from_json_row(rows[0])
+        return to_exam_response_from_rows(rows)
+
+    @staticmethod
+    @timed("mapper.exams")
+    def _exams_from_rows(child_id: str, rows: list) -> List[HineExam]:
+        if not rows:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Error al crear el examen: {str(e)}"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Niño con ID {child_id} no encontrado"
             )
-        finally:
-            if session:
-                session.close()
+        if JSON_AGGREGATION:
+            return build_exams_from_json_rows(rows)
+        return build_exams_from_rows(rows)
 
-    def _create_section(self, exam_id: str, section_name: str, section_comments: List[str]) -> SectionResponse:
+    def _prepare_exam_rows(self, hine_exam: HineExam):
         """
-        Método helper para crear una sección con manejo de errores.
+        Valida el examen y construye el modelo Exams, las filas de secciones
+        e ítems y su resumen antes de abrir la transacción.
         """
-        final_section_comments = self.SEPARATOR_SECTION_COMMENTS.join(section_comments)
+        self._validate_required_fields(hine_exam)
 
         try:
-            section_data = CreateSection(
-                section_name=section_name,
-                id_exam=exam_id,
-                section_comments=final_section_comments
-            )
-            return self.section_service.create_section(section_data)
+            exam_model = to_exam_model(hine_exam)
         except Exception as e:
             raise HTTPException(
                 status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Error creating section '{section_name}': {str(e)}"
-            )
-        
-    def _updateChildrenData(self, child_id: str, gestational_age: str, cronological_age: str, corrected_age: str, head_circumference: str):
-        try:
-            update_data = ChildUpdate(
-                gestational_age=gestational_age,
-                cronological_age=cronological_age,
-                corrected_age=corrected_age,
-                head_circumference=head_circumference
+                detail=f"Invalid input data: {str(e)}"
             )
-            childService.update_child(child_id, update_data)
-        except Exception as e:
+
+        section_rows, item_rows = to_section_and_item_rows(
+            exam_model.id, hine_exam, self.SEPARATOR_SECTION_COMMENTS
+        )
+        return exam_model, section_rows, item_rows, to_exam_summary_row(exam_model, hine_exam)
+
+    @staticmethod
+    def _raise_create_error(error: Exception) -> None:
+        """Traduce un fallo dentro de la transacción de create_exam a HTTPException."""
+        if isinstance(error, HTTPException):
+            raise error
+        if isinstance(error, IntegrityError):
+            if "foreign key" in str(error.orig).lower():
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Foreign key error: The Child or Doctor does not exist"
+                )
             raise HTTPException(
-                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                detail=f"Error updating children '{child_id}': {str(e)}"
-            )
\ No newline at end of file
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Integrity error: Possible duplicate or constraint violation"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear el examen: {str(error)}"
+        )
+
+    @staticmethod
+    def _remember_exam(exam_id: str, exam: HineExam, since: int) -> HineExam:
+        service_cache.put(("exam", str(exam_id)), exam, (f"exam:{exam_id}", f"child:{exam.patientId}"), since)
+        return exam
+
+    @staticmethod
+    def _remember_child_exams(child_id: str, exams: List[HineExam], since: int) -> List[HineExam]:
+        tags = [f"child:{child_id}"] + [f"exam:{exam.examId}" for exam in exams]
+        service_cache.put(("child-exams", str(child_id)), exams, tags, since)
+        return exams
+
+    @staticmethod
+    def _version_query(exam_id: str | None = None, child_id: str | None = None):
+        """
+        Cantidad de exámenes activos y su última modificación según
+        exam_summaries (índices por exam_id / child_id). Un examen nuevo cambia
+        el máximo y una baja cambia la cantidad.
+        """
+        query = (
+            select(func.count(ExamSummaries.exam_id), func.max(ExamSummaries.updated_at))
+            .join(Exams, Exams.id == ExamSummaries.exam_id)
+            .where(Exams.eliminated == False)
+        )
+        if exam_id is not None:
+            try:
+                return query.where(ExamSummaries.exam_id == UUID(str(exam_id)))
+            except ValueError:
+                return None
+        return query.where(ExamSummaries.child_id == str(child_id))
+
+    @staticmethod
+    def _remember_version(key: tuple, version: Optional[ExamVersion], tag: str, since: int) -> Optional[ExamVersion]:
+        # Sin exámenes no se cachea: el próximo examen no tendría qué invalidar
+        if version is not None:
+            service_cache.put(key, version, (tag,), since)
+        return version
+
+    @staticmethod
+    def _to_version(row) -> Optional[ExamVersion]:
+        if not row or not row[0]:
+            return None
+        return ExamVersion(exams=row[0], last_modified=row[1])
+
+    @staticmethod
+    def _summaries_query(child_id: str):
+        return (
+            select(ExamSummaries)
+            .join(Exams, Exams.id == ExamSummaries.exam_id)
+            .where(ExamSummaries.child_id == str(child_id), Exams.eliminated == False)
+            .order_by(ExamSummaries.exam_date.desc())
+        )
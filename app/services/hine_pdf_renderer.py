@@ -2,22 +2,203 @@
 from fastapi import HTTPException
 from html import escape as html_escape
 from datetime import datetime as _dt
+import asyncio
+import re
+import time
 import pdfkit, shutil, os
 
+from app.config import PDF_BACKEND
+from app.services import pdf_merge
+from app.services.metrics import PDF_RENDER_LATENCY, PDF_SIZE, timed
+from app.services.pdf_assets import PdfAssets
+from app.services.pdf_cache import PdfCache, pdf_cache as default_pdf_cache
+from app.services.pdf_render_queue import PdfRenderQueue, render_queue as default_render_queue, run_in_thread
+
+
+# -------------------- MOTORES DE PDF --------------------
+
+# Fechas de los metadatos del PDF: /CreationDate (D:20250101120000+01'00')
+PDF_INFO_DATE = re.compile(rb"(/(?:CreationDate|ModDate) ?\(D:)(\d{4,14})([^)]*\))")
+
+
+def pin_pdf_dates(pdf: bytes) -> bytes:
+    """
+    Fija las fechas de los metadatos en el epoch para que el mismo HTML dé
+    siempre los mismos bytes. Se reemplaza in situ sin cambiar el largo, así
+    los offsets del xref siguen siendo válidos.
+    """
+    def pin(match: re.Match) -> bytes:
+        digits = b"19700101000000"[:len(match[2])]
+        return match[1] + digits + re.sub(rb"\d", b"0", match[3])
+    return PDF_INFO_DATE.sub(pin, pdf)
+
+
+class PdfBackend:
+    """
+    Convierte el HTML del reporte en bytes de PDF.
+
+    Cada motor recibe el texto del footer y es responsable de dibujarlo junto
+    con la paginación "Página X de Y" en todas las páginas. Con
+    `footer_text=None` el PDF sale sin footer (partes que se fusionan luego).
+    """
+    name = ""
+
+    def render(self, html: str, footer_text: str | None) -> bytes:
+        raise NotImplementedError
+
+    async def render_async(self, html: str, footer_text: str | None) -> bytes:
+        return await run_in_thread(self.render, html, footer_text)
+
+    def fingerprint(self) -> dict:
+        """Configuración que afecta al PDF generado; entra en la clave de caché."""
+        return {"name": self.name}
+
+
+class WkhtmltopdfBackend(PdfBackend):
+    """wkhtmltopdf como proceso externo, con detección multiplataforma del binario."""
+    name = "wkhtmltopdf"
+
+    def __init__(self):
+        self._wkhtml_cfg = self._ensure_wkhtmltopdf()
+
+    def options(self, footer_text: str | None) -> dict:
+        options = {
+            "quiet": "",
+            "dpi": "96",
+            "page-size": "A4",
+            "margin-top": "18mm",
+            "margin-right": "15mm",
+            "margin-bottom": "18mm",
+            "margin-left": "15mm",
+            "encoding": "UTF-8",
+            "print-media-type": "",
+            "load-error-handling": "ignore",
+            # Footer
+            "footer-center": footer_text,
+            "footer-right": "Página [page] de [toPage]",
+            "footer-font-size": "9",
+            "footer-spacing": "3",
+        }
+        if footer_text is None:
+            options = {k: v for k, v in options.items() if not k.startswith("footer-")}
+        return options
+
+    def fingerprint(self) -> dict:
+        return {"name": self.name, "options": self.options("")}
+
+    def render(self, html: str, footer_text: str | None) -> bytes:
+        # wkhtmltopdf estampa la hora del render en /CreationDate
+        return pin_pdf_dates(pdfkit.from_string(html, False, configuration=self._wkhtml_cfg, options=self.options(footer_text)))
+
+    async def render_async(self, html: str, footer_text: str | None) -> bytes:
+        """Ejecuta wkhtmltopdf como subproceso async (HTML por stdin, PDF por stdout)."""
+        kit = pdfkit.PDFKit(html, "string", options=self.options(footer_text), configuration=self._wkhtml_cfg)
+        proc = await asyncio.create_subprocess_exec(
+            *kit.command(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=kit.environ,
+        )
+        try:
+            stdout, stderr = await proc.communicate(input=html.encode("utf-8"))
+        except asyncio.CancelledError:
+            # Timeout o cliente desconectado: no dejar wkhtmltopdf huérfano
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
+            raise
+
+        kit.handle_error(proc.returncode, (stderr or b"").decode("utf-8", errors="replace"))
+        return pin_pdf_dates(stdout)
+
+    @staticmethod
+    def _ensure_wkhtmltopdf():
+        wkhtml_path = shutil.which("wkhtmltopdf")
+        if not wkhtml_path:
+            for p in [
+                r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
+                r"C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe",
+                "/usr/local/bin/wkhtmltopdf",
+                "/usr/bin/wkhtmltopdf",
+                "/opt/homebrew/bin/wkhtmltopdf",
+            ]:
+                if os.path.exists(p):
+                    wkhtml_path = p
+                    break
+        if not wkhtml_path:
+            raise HTTPException(status_code=500, detail="wkhtmltopdf no encontrado. Instálalo y agrega al PATH o configura la ruta manualmente.")
+        return pdfkit.configuration(wkhtmltopdf=wkhtml_path)
+
+
+class WeasyPrintBackend(PdfBackend):
+    """
+    WeasyPrint dentro del proceso: sin fork/exec por documento y sin depender
+    del binario wkhtmltopdf. El footer se replica con cajas de margen @page.
+    """
+    name = "weasyprint"
+
+    FOOTER_CSS = """
+    @page {
+      @bottom-center { content: "%s"; font-family: Arial, Helvetica, sans-serif; font-size: 9pt; padding-top: 3mm; }
+      @bottom-right { content: "Página " counter(page) " de " counter(pages); font-family: Arial, Helvetica, sans-serif; font-size: 9pt; padding-top: 3mm; }
+    }
+    """
+
+    def __init__(self):
+        try:
+            import weasyprint
+        except (ImportError, OSError) as e:
+            raise HTTPException(status_code=500, detail=f"WeasyPrint no disponible: {e}")
+        self._weasyprint = weasyprint
+
+    def fingerprint(self) -> dict:
+        return {"name": self.name, "version": self._weasyprint.__version__, "footer_css": self.FOOTER_CSS}
+
+    def render(self, html: str, footer_text: str | None) -> bytes:
+        if footer_text is None:
+            return self._weasyprint.HTML(string=html).write_pdf()
+        footer = footer_text.replace("\\", "\\\\").replace('"', '\\"')
+        stylesheet = self._weasyprint.CSS(string=self.FOOTER_CSS % footer)
+        return self._weasyprint.HTML(string=html).write_pdf(stylesheets=[stylesheet])
+
+
+PDF_BACKENDS = {
+    WkhtmltopdfBackend.name: WkhtmltopdfBackend,
+    WeasyPrintBackend.name: WeasyPrintBackend,
+}
+
+
+def make_pdf_backend(name: str) -> PdfBackend:
+    try:
+        return PDF_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Motor de PDF desconocido: {name!r}. Opciones: {', '.join(PDF_BACKENDS)}")
+
+
 class HINEPdfRenderer:
     """
     Renderiza PDFs HINE con un diseño consistente:
-    - Logo online en header
-    - Footer con © dinámico y paginación
+    - Logo, CSS y fuentes locales embebidos (sin red durante el render)
+    - Footer con © y paginación
+    - Salida determinista: mismos datos, mismos bytes (sin hora de generación)
     - Tablas estandarizadas para módulos / hitos / comportamiento
-    - wkhtmltopdf con detección multiplataforma
+    - Motor de PDF intercambiable: wkhtmltopdf o WeasyPrint en proceso
+    - API async con cola acotada de renders concurrentes
+    - Caché de PDFs por hash de contenido (memoria + disco)
+    - Historias armadas fusionando el PDF cacheado de cada examen
 
     Debes inyectar los accesos a datos via callables:
       get_exam_by_id(exam_id: str) -> dict|obj
       get_exams_by_child(child_id: str) -> List[dict|obj]
+    y, para la API async, sus equivalentes awaitables:
+      get_exam_by_id_async(exam_id: str) -> dict|obj
+      get_exams_by_child_async(child_id: str) -> List[dict|obj]
     """
     COMPANY_TITLE = "El Comité"
-    LOGO_URL = "https://elcomite.org.co/wp-content/uploads/2023/12/cropped-logo-02.jpg"
+    # Subirlo al cambiar el HTML o el armado de los PDFs: entra en la huella
+    # (claves de caché y ETag de los PDF)
+    TEMPLATE_VERSION = 2
     COPYRIGHT_TEXT = "Todos los derechos reservados a sus creadores"
 
     MODULE_LABELS_ES = {
@@ -58,101 +239,310 @@ class HINEPdfRenderer:
     def __init__(self, get_exam_by_id, get_exams_by_child=None,
                  company_title: str | None = None,
                  logo_url: str | None = None,
-                 copyright_text: str | None = None):
+                 copyright_text: str | None = None,
+                 get_exam_by_id_async=None,
+                 get_exams_by_child_async=None,
+                 render_queue: PdfRenderQueue | None = None,
+                 cache: PdfCache | None = None,
+                 backend: "PdfBackend | None" = None,
+                 assets: PdfAssets | None = None):
         self.get_exam_by_id = get_exam_by_id
         self.get_exams_by_child = get_exams_by_child
+        self.get_exam_by_id_async = get_exam_by_id_async
+        self.get_exams_by_child_async = get_exams_by_child_async
+        self.render_queue = render_queue or default_render_queue
+        self.cache = cache or default_pdf_cache
         if company_title: self.COMPANY_TITLE = company_title
-        if logo_url: self.LOGO_URL = logo_url
+        # Recursos locales (logo, CSS, fuentes) cargados una vez; logo_url
+        # solo se usa si se quiere forzar otra imagen
+        self.assets = assets or PdfAssets.load()
+        self.logo_url = logo_url
+        self.logo_src = logo_url or self.assets.logo_data_uri
         if copyright_text: self.COPYRIGHT_TEXT = copyright_text
-        self._wkhtml_cfg = self._ensure_wkhtmltopdf()
+        self.backend = backend or make_pdf_backend(PDF_BACKEND)
 
     # -------------------- API PÚBLICA --------------------
 
     def render_exam_pdf(self, exam_id: str) -> bytes:
         """PDF de un único examen (por exam_id)."""
+        cached = self.cache.lookup(self._exam_ref(exam_id))
+        if cached is not None:
+            return cached
         data = self._normalize_exam(self.get_exam_by_id(exam_id))
-        html = self._build_document(
-            title=f"{self.COMPANY_TITLE} - Historia clínica HINE - Examen {self._esc(data.get('examId', exam_id))}",
-            intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
-            sections=[self._exam_section(data, index=1)]
-        )
-        return self._html_to_pdf(html)
+        key, ref, tags = self._exam_cache_entry(data, exam_id)
+        return self._cached_or_render(key, ref, tags, lambda: self._html_to_pdf(self._exam_document(data, exam_id)))
 
     def render_child_history_pdf(self, child_id: str) -> bytes:
-        """PDF con todos los exámenes de un paciente (por child_id)."""
+        """
+        PDF con todos los exámenes de un paciente (por child_id). Se arma
+        fusionando el PDF cacheado de cada examen tras una portada con índice.
+        """
         if not self.get_exams_by_child:
             raise HTTPException(status_code=500, detail="No se configuró get_exams_by_child en HINEPdfRenderer.")
-        exams = self.get_exams_by_child(child_id)
-        if not exams:
-            raise HTTPException(status_code=404, detail="No se encontraron exámenes para este paciente.")
+        exams = self._normalize_exams(self.get_exams_by_child(child_id))
+        key, tags = self._history_cache_entry(exams, child_id)
 
-        sections = []
-        for idx, exam in enumerate(exams, 1):
-            data = self._normalize_exam(exam)
-            sections.append(self._exam_section(data, index=idx, page_break=(idx > 1)))
+        def build() -> bytes:
+            parts = [self._exam_part_pdf(data) for data in exams]
+            return self._merge_history(child_id, exams, parts, self._cover_template_pdf())
 
-        html = self._build_document(
-            title=f"{self.COMPANY_TITLE} - Historia clínica HINE - Paciente {self._esc(child_id)}",
-            intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
-            header_extra=f"<div class='small-muted'>Paciente: {self._esc(child_id)} · Generado: {self._now_str()}</div>",
-            sections=sections
-        )
-        return self._html_to_pdf(html)
+        return self._cached_or_render(key, None, tags, build)
 
     def render_exams_batch_pdf(self, exam_ids: list[str]) -> bytes:
         """PDF con varios exámenes, útil para consultas o auditorías."""
         if not exam_ids:
             raise HTTPException(status_code=400, detail="Se requiere al menos un exam_id.")
+        exams = [self._normalize_exam(self.get_exam_by_id(exid)) for exid in exam_ids]
+        key, tags = self._batch_cache_entry(exams)
+        return self._cached_or_render(key, None, tags, lambda: self._html_to_pdf(self._batch_document(exams)))
+
+    # -------------------- API PÚBLICA ASYNC --------------------
+    # Misma salida que la API sync, pero wkhtmltopdf corre como subproceso
+    # async detrás de la cola acotada, sin congelar el event loop.
+
+    async def render_exam_pdf_async(self, exam_id: str) -> bytes:
+        cached = self.cache.lookup(self._exam_ref(exam_id))
+        if cached is not None:
+            return cached
+        data = self._normalize_exam(await self.get_exam_by_id_async(exam_id))
+        key, ref, tags = self._exam_cache_entry(data, exam_id)
+        return await self._cached_or_render_async(key, ref, tags, lambda: self._html_to_pdf_async(self._exam_document(data, exam_id)))
+
+    async def render_child_history_pdf_async(self, child_id: str) -> bytes:
+        if not self.get_exams_by_child_async:
+            raise HTTPException(status_code=500, detail="No se configuró get_exams_by_child_async en HINEPdfRenderer.")
+        exams = self._normalize_exams(await self.get_exams_by_child_async(child_id))
+        key, tags = self._history_cache_entry(exams, child_id)
+
+        async def build() -> bytes:
+            # Como mucho max_concurrent partes en la cola a la vez, para que una
+            # historia larga no llene la cola compartida con otras peticiones
+            limit = asyncio.Semaphore(self.render_queue.max_concurrent)
+
+            async def part(data: dict) -> bytes:
+                async with limit:
+                    return await self._exam_part_pdf_async(data)
+
+            parts = await asyncio.gather(*(part(data) for data in exams))
+            cover = await self._cover_template_pdf_async()
+            return await run_in_thread(self._merge_history, child_id, exams, parts, cover)
+
+        return await self._cached_or_render_async(key, None, tags, build)
+
+    async def render_exams_batch_pdf_async(self, exam_ids: list[str]) -> bytes:
+        if not exam_ids:
+            raise HTTPException(status_code=400, detail="Se requiere al menos un exam_id.")
+        exams = [self._normalize_exam(await self.get_exam_by_id_async(exid)) for exid in exam_ids]
+        key, tags = self._batch_cache_entry(exams)
+        return await self._cached_or_render_async(key, None, tags, lambda: self._html_to_pdf_async(self._batch_document(exams)))
+
+    # -------------------- CACHÉ --------------------
+    # La clave es un hash de los datos normalizados y de la configuración del
+    # renderer, así que un cambio en cualquiera de los dos produce otro PDF.
+    # Solo los exámenes individuales se indexan por id (`exam:<id>`): son
+    # inmutables y se pueden servir sin consultar la base de datos.
+
+    def fingerprint(self) -> dict:
+        """Huella de la configuración que afecta a los PDFs generados."""
+        return self._settings_fingerprint()
+
+    def _settings_fingerprint(self) -> dict:
+        return {
+            "template_version": self.TEMPLATE_VERSION,
+            "company_title": self.COMPANY_TITLE,
+            "logo_url": self.logo_url,
+            "assets": self.assets.fingerprint,
+            "copyright_text": self.COPYRIGHT_TEXT,
+            "footer_text": self._footer_text(),
+            "backend": self.backend.fingerprint(),
+        }
+
+    @staticmethod
+    def _exam_ref(exam_id) -> str:
+        return f"exam:{exam_id}"
+
+    def _exam_cache_entry(self, data: dict, exam_id: str):
+        key = PdfCache.make_key("exam", data, self._settings_fingerprint())
+        tags = [self._exam_ref(data.get("examId") or exam_id), f"child:{data.get('patientId')}"]
+        return key, self._exam_ref(exam_id), tags
+
+    def _history_cache_entry(self, exams: list[dict], child_id: str):
+        key = PdfCache.make_key("history", child_id, exams, self._settings_fingerprint())
+        tags = [f"child:{child_id}"] + [self._exam_ref(e.get("examId")) for e in exams]
+        return key, tags
+
+    def _batch_cache_entry(self, exams: list[dict]):
+        key = PdfCache.make_key("batch", exams, self._settings_fingerprint())
+        tags = [self._exam_ref(e.get("examId")) for e in exams] + [f"child:{e.get('patientId')}" for e in exams]
+        return key, tags
+
+    def _cached_or_render(self, key: str, ref, tags, render) -> bytes:
+        pdf = self.cache.get(key)
+        if pdf is None:
+            pdf = render()
+            self.cache.put(key, pdf, ref=ref, tags=tags)
+        else:
+            # Acierto: solo se registran ref y etiquetas, sin reescribir el PDF
+            self.cache.index(key, ref=ref, tags=tags)
+        return pdf
+
+    async def _cached_or_render_async(self, key: str, ref, tags, render) -> bytes:
+        pdf = self.cache.get(key)
+        if pdf is None:
+            pdf = await render()
+            self.cache.put(key, pdf, ref=ref, tags=tags)
+        else:
+            # Acierto: solo se registran ref y etiquetas, sin reescribir el PDF
+            self.cache.index(key, ref=ref, tags=tags)
+        return pdf
+
+    # -------------------- HISTORIA POR FUSIÓN --------------------
+    # Cada examen se renderiza una sola vez, sin footer ni numeración, y se
+    # cachea por contenido. La historia se arma fusionando esas partes detrás
+    # de una portada (plantilla cacheada + índice dibujado encima) y
+    # estampando footer y "Página X de Y" sobre el documento final. Un examen
+    # nuevo solo cuesta su propio render más la fusión.
+
+    COVER_FIRST_ROW_MM = 118
+    COVER_ROW_PT = 14
+    COVER_BOTTOM_MM = 25
+
+    def _part_fingerprint(self) -> dict:
+        fingerprint = self._settings_fingerprint()
+        fingerprint.pop("footer_text")
+        return fingerprint
+
+    def _exam_part_entry(self, data: dict):
+        # Sin etiqueta `child:`: la parte solo depende del examen, así que
+        # agregar un examen nuevo no obliga a re-renderizar las demás
+        key = PdfCache.make_key("exam-part", data, self._part_fingerprint())
+        return key, [self._exam_ref(data.get("examId"))]
+
+    def _exam_part_pdf(self, data: dict) -> bytes:
+        key, tags = self._exam_part_entry(data)
+        return self._cached_or_render(key, None, tags, lambda: self._render_html(self._exam_part_document(data), None))
+
+    async def _exam_part_pdf_async(self, data: dict) -> bytes:
+        key, tags = self._exam_part_entry(data)
+        return await self._cached_or_render_async(key, None, tags, lambda: self._render_html_async(self._exam_part_document(data), None))
+
+    def _cover_template_pdf(self) -> bytes:
+        key = PdfCache.make_key("history-cover", self._part_fingerprint())
+        return self._cached_or_render(key, None, (), lambda: self._render_html(self._cover_template_document(), None))
+
+    async def _cover_template_pdf_async(self) -> bytes:
+        key = PdfCache.make_key("history-cover", self._part_fingerprint())
+        return await self._cached_or_render_async(key, None, (), lambda: self._render_html_async(self._cover_template_document(), None))
+
+    @timed("pdf.merge")
+    def _merge_history(self, child_id: str, exams: list[dict], parts: list[bytes], cover: bytes) -> bytes:
+        first_page_rows = self._cover_rows_per_page(self.COVER_FIRST_ROW_MM) - 3
+        more_rows = self._cover_rows_per_page(self.COVER_BOTTOM_MM)
+        extra_cover_pages = max(0, -(-(len(exams) - first_page_rows) // more_rows))
+
+        # Página inicial de cada examen una vez fusionado
+        next_page = pdf_merge.page_count(cover) + extra_cover_pages + 1
+        start_pages = []
+        for part in parts:
+            start_pages.append(next_page)
+            next_page += pdf_merge.page_count(part)
+
+        writer = pdf_merge.merge([cover] + parts)
+        width = float(writer.pages[0].mediabox.width)
+        height = float(writer.pages[0].mediabox.height)
+        for offset in range(extra_cover_pages):
+            writer.insert_blank_page(width, height, index=1 + offset)
+
+        left = 15 * pdf_merge.MM
+        right = width - 15 * pdf_merge.MM
+        y = height - self.COVER_FIRST_ROW_MM * pdf_merge.MM
+        lines = [
+            pdf_merge.TextLine(left, y, 11, f"Paciente: {child_id}"),
+            pdf_merge.TextLine(left, y - self.COVER_ROW_PT, 9, f"{len(exams)} exámenes · último: {self._date_es(self._last_exam_date(exams))}"),
+        ]
+        y -= 3 * self.COVER_ROW_PT
+        page_index = 0
+        for idx, (data, start) in enumerate(zip(exams, start_pages), 1):
+            if y < self.COVER_BOTTOM_MM * pdf_merge.MM:
+                pdf_merge.draw_text(writer.pages[page_index], lines)
+                page_index, lines = page_index + 1, []
+                y = height - self.COVER_BOTTOM_MM * pdf_merge.MM
+            label = f"Examen #{idx} · {self._date_es(data.get('examDate'))} · Médico: {data.get('doctorName') or '—'}"
+            lines.append(pdf_merge.TextLine(left, y, 10, label[:95]))
+            lines.append(pdf_merge.TextLine(right, y, 10, f"pág. {start}", "right"))
+            y -= self.COVER_ROW_PT
+        pdf_merge.draw_text(writer.pages[page_index], lines)
+
+        pdf_merge.stamp_footer(writer, self._footer_text())
+        return pdf_merge.to_bytes(writer)
+
+    def _cover_rows_per_page(self, top_mm: float) -> int:
+        usable = (297 - top_mm - self.COVER_BOTTOM_MM) * pdf_merge.MM
+        return int(usable // self.COVER_ROW_PT)
+
+    # -------------------- DOCUMENTOS --------------------
+
+    def _exam_part_document(self, data: dict) -> str:
+        """Un examen sin portada, sin número ni footer: reutilizable en cualquier historia."""
+        return self._build_document(
+            title=f"{self.COMPANY_TITLE} - Examen {self._esc(data.get('examId', ''))}",
+            intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
+            sections=[self._exam_section(data, heading=f"Examen del {self._date_es(data.get('examDate'))}")],
+            brand=False,
+        )
+
+    def _cover_template_document(self) -> str:
+        """Portada de la historia; el paciente y el índice se dibujan encima al fusionar."""
+        return self._build_document(
+            title=f"{self.COMPANY_TITLE} - Historia clínica HINE",
+            intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
+            header_extra="<h2>Índice de exámenes</h2>",
+            sections=[],
+        )
+
+    def _exam_document(self, data: dict, exam_id: str) -> str:
+        return self._build_document(
+            title=f"{self.COMPANY_TITLE} - Historia clínica HINE - Examen {self._esc(data.get('examId', exam_id))}",
+            intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
+            sections=[self._exam_section(data, index=1)]
+        )
+
+    def _batch_document(self, exams: list[dict]) -> str:
         sections = []
-        for idx, exid in enumerate(exam_ids, 1):
-            data = self._normalize_exam(self.get_exam_by_id(exid))
+        for idx, data in enumerate(exams, 1):
             sections.append(self._exam_section(data, index=idx, page_break=(idx > 1)))
-        html = self._build_document(
-            title=f"{self.COMPANY_TITLE} - Lote de exámenes HINE ({len(exam_ids)})",
+        return self._build_document(
+            title=f"{self.COMPANY_TITLE} - Lote de exámenes HINE ({len(exams)})",
             intro_meta="Historia clínica – Hammersmith Infant Neurological Examination",
             sections=sections
         )
-        return self._html_to_pdf(html)
 
     # -------------------- BLOQUE HTML CORE --------------------
 
-    def _build_document(self, title: str, intro_meta: str, sections: list[str], header_extra: str = "") -> str:
-        css = """
-        @page { size: A4; margin: 18mm 15mm 20mm 15mm; }  /* espacio para footer */
-        body { font-family: Arial, Helvetica, sans-serif; font-size: 12px; color: #111; }
-        h1 { font-size: 18px; margin: 0 0 6px 0; }
-        h2 { font-size: 14px; margin: 12px 0 6px 0; }
-        h3 { font-size: 12.5px; margin: 8px 0 4px 0; }
-        table { width: 100%; border-collapse: collapse; margin: 6px 0 10px; }
-        th, td { border: 1px solid #aaa; padding: 6px; text-align: left; vertical-align: top; }
-        th { background: #f3f3f3; }
-        .brand { text-align:center; margin-bottom: 8px; }
-        .brand img { height: 120px; }
-        .meta { font-size: 11px; color:#555; text-align:center; margin-bottom: 12px; }
-        .small-muted { color:#666; font-size: 11px; }
-        .page-break { page-break-before: always; }
-        """
+    @timed("pdf.html")
+    def _build_document(self, title: str, intro_meta: str, sections: list[str], header_extra: str = "",
+                        brand: bool = True) -> str:
         parts = [f"""<!DOCTYPE html>
 <html lang="es">
 <head>
 <meta charset="utf-8"/>
 <title>{self._esc(title)}</title>
-<style>{css}</style>
+<style>{self.assets.font_css}
+{self.assets.css}</style>
 </head>
-<body>
-<div class="brand" style="text-align: center;">
-  <img src="{self._esc(self.LOGO_URL)}" alt="logo" style="height:200px;"/>
+<body>"""]
+        if brand:
+            parts.append(f"""<div class="brand" style="text-align: center;">
+  <img src="{self._esc(self.logo_src)}" alt="logo" style="height:200px;"/>
 </div>
 
-  <h1>Historia clínica HINE - Hammersmith Infant Neurological Examination</h1>
-  <div class="small-muted">Generado: {self._esc(self._now_str())}</div>
-  {header_extra}
-"""]
+  <h1>Historia clínica HINE - Hammersmith Infant Neurological Examination</h1>""")
+        parts.append(f"  {header_extra}")
         parts.extend(sections)
         parts.append("</body></html>")
         return "\n".join(parts)
 
-    def _exam_section(self, data: dict, index: int, page_break: bool = False) -> str:
+    def _exam_section(self, data: dict, index: int = 1, page_break: bool = False, heading: str | None = None) -> str:
         examId = data.get("examId", "")
         patientId = data.get("patientId", "")
         doctorName = data.get("doctorName", "")
@@ -181,7 +571,7 @@ class HINEPdfRenderer:
             parts.append("<div class='page-break'></div>")
 
         parts.append(f"""
-  <h2>Examen #{index}</h2>
+  <h2>{self._esc(heading) if heading else f"Examen #{index}"}</h2>
   <p><strong>ID Examen:</strong> {self._esc(examId)} &nbsp;·&nbsp; <strong>Fecha:</strong> {self._esc(examDate)}</p>
   <p><strong>Médico:</strong> {self._esc(doctorName)} &nbsp;·&nbsp; <strong>ID Paciente:</strong> {self._esc(patientId)}</p>
   <p><strong>Edad gestacional (sem):</strong> {self._esc(gestationalAge)} &nbsp;·&nbsp; <strong>Edad cronológica (mes):</strong> {self._esc(cronologicalAge)}
@@ -248,46 +638,41 @@ class HINEPdfRenderer:
 
     # -------------------- RENDER PDF --------------------
 
+    def _footer_text(self) -> str:
+        # Sin año actual: el mismo examen tiene que dar los mismos bytes
+        return f"© HINE · {self.COPYRIGHT_TEXT}"
+
     def _html_to_pdf(self, html: str) -> bytes:
-        year = _dt.now().year
-        options = {
-            "quiet": "",
-            "dpi": "96",
-            "page-size": "A4",
-            "margin-top": "18mm",
-            "margin-right": "15mm",
-            "margin-bottom": "18mm",
-            "margin-left": "15mm",
-            "encoding": "UTF-8",
-            "print-media-type": "",
-            "load-error-handling": "ignore",
-            # Footer
-            "footer-center": f"© HINE {year} · {self.COPYRIGHT_TEXT}",
-            "footer-right": "Página [page] de [toPage]",
-            "footer-font-size": "9",
-            "footer-spacing": "3",
-        }
+        return self._render_html(html, self._footer_text())
+
+    async def _html_to_pdf_async(self, html: str) -> bytes:
+        return await self._render_html_async(html, self._footer_text())
+
+    def _render_html(self, html: str, footer_text: str | None) -> bytes:
         try:
-            return pdfkit.from_string(html, False, configuration=self._wkhtml_cfg, options=options)
+            started = time.perf_counter()
+            return self._observe_render(self.backend.render(html, footer_text), started)
+        except HTTPException:
+            raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Error al generar el PDF: {e}")
 
-    def _ensure_wkhtmltopdf(self):
-        wkhtml_path = shutil.which("wkhtmltopdf")
-        if not wkhtml_path:
-            for p in [
-                r"C:\Program Files\wkhtmltopdf\bin\wkhtmltopdf.exe",
-                r"C:\Program Files (x86)\wkhtmltopdf\bin\wkhtmltopdf.exe",
-                "/usr/local/bin/wkhtmltopdf",
-                "/usr/bin/wkhtmltopdf",
-                "/opt/homebrew/bin/wkhtmltopdf",
-            ]:
-                if os.path.exists(p):
-                    wkhtml_path = p
-                    break
-        if not wkhtml_path:
-            raise HTTPException(status_code=500, detail="wkhtmltopdf no encontrado. Instálalo y agrega al PATH o configura la ruta manualmente.")
-        return pdfkit.configuration(wkhtmltopdf=wkhtml_path)
+    async def _render_html_async(self, html: str, footer_text: str | None) -> bytes:
+        return await self.render_queue.submit(lambda: self._render_backend_async(html, footer_text))
+
+    async def _render_backend_async(self, html: str, footer_text: str | None) -> bytes:
+        try:
+            started = time.perf_counter()
+            return self._observe_render(await self.backend.render_async(html, footer_text), started)
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error al generar el PDF: {e}")
+
+    def _observe_render(self, pdf: bytes, started: float) -> bytes:
+        PDF_RENDER_LATENCY.observe(time.perf_counter() - started, backend=self.backend.name)
+        PDF_SIZE.observe(len(pdf), backend=self.backend.name)
+        return pdf
 
     # -------------------- HELPERS REUTILIZABLES --------------------
 
@@ -295,7 +680,8 @@ class HINEPdfRenderer:
     def _esc(s): return html_escape(str(s if s is not None else ""))
 
     @staticmethod
-    def _now_str(): return _dt.now().strftime('%d/%m/%Y %H:%M')
+    def _last_exam_date(exams: list[dict]) -> str | None:
+        return max((str(e["examDate"]) for e in exams if e.get("examDate")), default=None)
 
     @staticmethod
     def _date_es(value: str | None) -> str:
@@ -316,6 +702,11 @@ class HINEPdfRenderer:
     def _label_question(self, qid: str) -> str:
         return self.QUESTION_LABELS_ES.get(qid, qid)
 
+    def _normalize_exams(self, exams) -> list[dict]:
+        if not exams:
+            raise HTTPException(status_code=404, detail="No se encontraron exámenes para este paciente.")
+        return [self._normalize_exam(exam) for exam in exams]
+
     @staticmethod
     def _normalize_exam(exam) -> dict:
         if not exam:
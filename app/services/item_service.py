@@ -1,7 +1,8 @@
 from fastapi import HTTPException
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.item import Items
-from app.database.database import engine
+from app.database.database import engine, async_engine
 from sqlalchemy.exc import IntegrityError
 from app.schemas.item import CreateItem, ItemResponse, to_item_model, to_item_response
 
@@ -24,3 +25,22 @@ class ItemService:
                     else:
                         raise HTTPException(status_code=400, detail="Foreign key constraint failed.")
                 raise HTTPException(status_code=400, detail="Database integrity error.")
+
+    @staticmethod
+    async def create_item_async(item: CreateItem) -> ItemResponse:
+        async with AsyncSession(async_engine) as session:
+            item_model = to_item_model(item)
+            session.add(item_model)
+            try:
+                await session.commit()
+                await session.refresh(item_model)
+                return to_item_response(item_model)
+            except IntegrityError as e:
+                await session.rollback()
+                msg = str(e.orig).lower()
+                if "foreign key" in msg:
+                    if "section_id" in msg:
+                        raise HTTPException(status_code=400, detail="Foreign key error: Section with this ID does not exist.")
+                    else:
+                        raise HTTPException(status_code=400, detail="Foreign key constraint failed.")
+                raise HTTPException(status_code=400, detail="Database integrity error.")
@@ -0,0 +1,215 @@
+"""
+Métricas en formato de texto de Prometheus, sin dependencias externas ni
+colector: contadores e histogramas en memoria de este worker, más gauges
+que se leen al momento del scrape (pools, cachés, cola de PDFs).
+
+Lo expone GET /metrics. Con varios workers de uvicorn cada uno responde
+con sus propios números; Prometheus los distingue por instancia.
+"""
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+
+# Segundos: de 5 ms (lecturas cacheadas) a 30 s (historias largas en PDF)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Bytes: de 16 KB a 16 MB
+SIZE_BUCKETS = tuple(16 * 1024 * 4 ** n for n in range(6))
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # clave -> [conteo por bucket (no acumulado), suma, total]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._values.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(names, key + (_number(bound),))} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+                lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """
+    Métrica calculada en cada scrape a partir de los stats() que ya llevan
+    los pools, las cachés y la cola de PDFs: `read()` devuelve
+    {valores de labels: valor}.
+    """
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str],
+                 read: Callable[[], dict], kind: str = "gauge"):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.read = read
+        self.kind = kind
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.read().items()):
+            if value is None:
+                continue
+            key = key if isinstance(key, tuple) else (key,)
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {_number(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: dict[str, object] = {}
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, labelnames: Iterable[str],
+                 read: Callable[[], dict], kind: str = "gauge") -> CallbackMetric:
+        return self._register(CallbackMetric(name, help_text, labelnames, read, kind))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        # Re-registrar el mismo nombre (p. ej. al recargar un módulo) lo reemplaza
+        self._metrics[metric.name] = metric
+        return metric
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "hine_http_requests_total", "Requests HTTP atendidas.", ("method", "route", "status"))
+HTTP_LATENCY = registry.histogram(
+    "hine_http_request_duration_seconds", "Latencia de requests HTTP por ruta.", ("method", "route"))
+STAGE_LATENCY = registry.histogram(
+    "hine_stage_duration_seconds", "Duración de etapas internas (servicio, mapper, HTML, merge).", ("stage",))
+DB_QUERIES = registry.counter(
+    "hine_db_queries_total", "Sentencias SQL ejecutadas.", ("engine",))
+DB_QUERY_LATENCY = registry.histogram(
+    "hine_db_query_duration_seconds", "Duración de sentencias SQL.", ("engine",))
+PDF_RENDER_LATENCY = registry.histogram(
+    "hine_pdf_render_duration_seconds", "Duración del render HTML -> PDF en el backend.", ("backend",))
+PDF_SIZE = registry.histogram(
+    "hine_pdf_size_bytes", "Tamaño de los PDFs renderizados.", ("backend",), buckets=SIZE_BUCKETS)
+
+
+def timed(stage: str):
+    """Decorador que registra la duración de la función (sync o async) en STAGE_LATENCY."""
+
+    def decorate(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with STAGE_LATENCY.time(stage=stage):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_LATENCY.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def instrument_engine(engine, name: str) -> None:
+    """Cuenta y mide cada sentencia de `engine` (para async, pasar `sync_engine`)."""
+
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["metrics_started"].pop()
+        DB_QUERIES.inc(engine=name)
+        DB_QUERY_LATENCY.observe(time.perf_counter() - started, engine=name)
+
+    def failed(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started"):
+            conn.info["metrics_started"].pop()
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+    event.listen(engine, "handle_error", failed)
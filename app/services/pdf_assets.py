@@ -0,0 +1,87 @@
+import base64
+import hashlib
+import io
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets")
+
+
+class PdfAssets:
+    """
+    Recursos estáticos del reporte HINE, cargados una sola vez desde
+    `app/assets` y embebidos en el HTML como data URIs:
+
+    - logo.jpg: reducido a la resolución de impresión y convertido a RGB.
+    - hine_report.css: hoja de estilos del documento.
+    - fonts/*.ttf|otf|woff|woff2 (opcional): se declaran con @font-face. La
+      familia es el nombre del archivo hasta el primer "-" y el peso/estilo
+      se deduce de "Bold"/"Italic" en el nombre (p. ej. DejaVuSans-Bold.ttf).
+
+    Así ningún render hace peticiones de red y el resultado no depende de
+    que un servidor externo responda a tiempo.
+    """
+    LOGO_FILE = "logo.jpg"
+    CSS_FILE = "hine_report.css"
+    FONTS_DIR = "fonts"
+    # El logo se muestra a 200px de alto; 2x basta para una impresión nítida
+    LOGO_MAX_HEIGHT_PX = 400
+    FONT_TYPES = {".ttf": "font/ttf", ".otf": "font/otf", ".woff": "font/woff", ".woff2": "font/woff2"}
+
+    def __init__(self, logo_data_uri: str, css: str, font_css: str = ""):
+        self.logo_data_uri = logo_data_uri
+        self.css = css
+        self.font_css = font_css
+        digest = hashlib.sha256()
+        for part in (logo_data_uri, css, font_css):
+            digest.update(part.encode("utf-8"))
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def load(cls, assets_dir: str = ASSETS_DIR) -> "PdfAssets":
+        with open(os.path.join(assets_dir, cls.LOGO_FILE), "rb") as f:
+            logo_uri = cls._logo_data_uri(f.read())
+        with open(os.path.join(assets_dir, cls.CSS_FILE), encoding="utf-8") as f:
+            css = f.read()
+        return cls(logo_uri, css, cls._font_css(os.path.join(assets_dir, cls.FONTS_DIR)))
+
+    @classmethod
+    def _logo_data_uri(cls, raw: bytes) -> str:
+        try:
+            from PIL import Image
+
+            image = Image.open(io.BytesIO(raw))
+            if image.height > cls.LOGO_MAX_HEIGHT_PX:
+                width = round(image.width * cls.LOGO_MAX_HEIGHT_PX / image.height)
+                image = image.resize((width, cls.LOGO_MAX_HEIGHT_PX), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, format="JPEG", quality=90, optimize=True)
+            raw = buffer.getvalue()
+        except Exception as e:
+            # Sin Pillow se embebe el archivo original tal cual
+            logger.warning("No se pudo optimizar el logo del reporte: %s", e)
+        return "data:image/jpeg;base64," + base64.b64encode(raw).decode("ascii")
+
+    @classmethod
+    def _font_css(cls, fonts_dir: str) -> str:
+        if not os.path.isdir(fonts_dir):
+            return ""
+        rules = []
+        for name in sorted(os.listdir(fonts_dir)):
+            stem, ext = os.path.splitext(name)
+            mime = cls.FONT_TYPES.get(ext.lower())
+            if not mime:
+                continue
+            with open(os.path.join(fonts_dir, name), "rb") as f:
+                data = base64.b64encode(f.read()).decode("ascii")
+            rules.append(
+                "@font-face { "
+                f"font-family: '{stem.split('-')[0]}'; "
+                f"src: url(data:{mime};base64,{data}); "
+                f"font-weight: {'bold' if 'bold' in stem.lower() else 'normal'}; "
+                f"font-style: {'italic' if 'italic' in stem.lower() else 'normal'}; "
+                "}"
+            )
+        return "\n".join(rules)
@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, defaultdict
+from typing import Iterable, Optional
+
+from app.config import (
+    PDF_CACHE_DIR,
+    PDF_CACHE_DISK_MAX_BYTES,
+    PDF_CACHE_ENABLED,
+    PDF_CACHE_MEMORY_MAX_BYTES,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PdfCache:
+    """
+    Caché de PDFs direccionada por contenido, con dos niveles:
+
+    - memoria: LRU acotada por bytes, propia de cada worker.
+    - disco: un archivo `<clave>.pdf` por documento en `disk_dir`, acotado por
+      bytes y desalojando primero los menos usados (mtime). Al ser la clave un
+      hash del contenido, varios workers pueden compartir el directorio.
+
+    Además mantiene un índice `ref -> clave` (p. ej. `exam:<id>`) para poder
+    servir un documento sin volver a consultar la base de datos, y etiquetas
+    (`exam:<id>`, `child:<id>`) para invalidar todo lo que dependa de un
+    examen o de un niño cuando se escribe sobre ellos. Ambos índices se
+    limpian cuando el documento sale de los dos niveles.
+    """
+
+    def __init__(self,
+                 memory_max_bytes: int = PDF_CACHE_MEMORY_MAX_BYTES,
+                 disk_dir: Optional[str] = PDF_CACHE_DIR,
+                 disk_max_bytes: int = PDF_CACHE_DISK_MAX_BYTES,
+                 enabled: bool = PDF_CACHE_ENABLED):
+        self.enabled = enabled
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._refs: dict[str, str] = {}
+        self._tags: defaultdict[str, set[str]] = defaultdict(set)
+        # Índice inverso clave -> (refs, etiquetas) para limpiar los de arriba
+        self._key_refs: defaultdict[str, set[str]] = defaultdict(set)
+        self._key_tags: defaultdict[str, set[str]] = defaultdict(set)
+
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+        if self.enabled and self.disk_dir:
+            self._load_disk_index()
+
+    # -------------------- CLAVES --------------------
+
+    @staticmethod
+    def make_key(*parts) -> str:
+        """Hash estable (sha256) de los datos normalizados y la configuración."""
+        raw = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # -------------------- LECTURA / ESCRITURA --------------------
+
+    def get(self, key: str) -> Optional[bytes]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            pdf = self._memory.get(key)
+            if pdf is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return pdf
+
+        pdf = self._read_disk(key)
+        if pdf is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits_disk += 1
+            self._store_memory(key, pdf)
+        return pdf
+
+    def lookup(self, ref: str) -> Optional[bytes]:
+        """Documento asociado a `ref` sin calcular la clave de contenido."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            key = self._refs.get(ref)
+        return self.get(key) if key else None
+
+    def put(self, key: str, pdf: bytes, ref: Optional[str] = None, tags: Iterable[str] = ()) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._store_memory(key, pdf)
+            self._index(key, ref, tags)
+        self._write_disk(key, pdf)
+        with self._lock:
+            if key not in self._memory and key not in self._disk:
+                # No entró en ningún nivel (demasiado grande o sin disco)
+                self._forget(key)
+
+    def index(self, key: str, ref: Optional[str] = None, tags: Iterable[str] = ()) -> None:
+        """
+        Registra `ref` y `tags` de un documento ya cacheado (p. ej. tras un
+        acierto en disco después de reiniciar) sin volver a escribirlo.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if key in self._memory or key in self._disk:
+                self._index(key, ref, tags)
+
+    def invalidate(self, *tags: str) -> None:
+        """Olvida todos los documentos etiquetados con alguno de `tags`."""
+        if not self.enabled:
+            return
+        stale_keys = set()
+        with self._lock:
+            for tag in tags:
+                for member in self._tags.get(tag, ()):
+                    stale_keys.add(self._refs.get(member, member))
+            for key in stale_keys:
+                pdf = self._memory.pop(key, None)
+                if pdf is not None:
+                    self._memory_bytes -= len(pdf)
+                self._disk_bytes -= self._disk.pop(key, 0)
+                self._forget(key)
+            for tag in tags:
+                self._tags.pop(tag, None)
+            self.invalidations += len(stale_keys)
+        for key in stale_keys:
+            self._unlink(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "disk_max_bytes": self.disk_max_bytes,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # -------------------- ÍNDICES --------------------
+
+    def _index(self, key: str, ref: Optional[str], tags: Iterable[str]) -> None:
+        # Llamar con self._lock tomado
+        member = ref or key
+        if ref:
+            previous = self._refs.get(ref)
+            if previous is not None and previous != key:
+                # La ref pasa a la clave nueva con las etiquetas que ya tenía
+                self._key_refs[previous].discard(ref)
+                self._key_tags[key] |= self._key_tags.get(previous, set())
+            self._refs[ref] = key
+            self._tags[ref].add(ref)
+            self._key_refs[key].add(ref)
+            self._key_tags[key].add(ref)
+        for tag in tags:
+            self._tags[tag].add(member)
+            self._key_tags[key].add(tag)
+
+    def _forget(self, key: str) -> None:
+        """Quita las refs y etiquetas de `key`, que ya no está en ningún nivel (con self._lock)."""
+        # Una ref que ya apunta a otra clave conserva sus etiquetas
+        members = {key} | {ref for ref in self._key_refs.pop(key, ()) if self._refs.get(ref) == key}
+        for ref in members - {key}:
+            del self._refs[ref]
+        for tag in self._key_tags.pop(key, ()):
+            tagged = self._tags.get(tag)
+            if tagged is None:
+                continue
+            tagged -= members
+            if not tagged:
+                del self._tags[tag]
+
+    # -------------------- NIVEL MEMORIA --------------------
+
+    def _store_memory(self, key: str, pdf: bytes) -> None:
+        # Llamar con self._lock tomado
+        if len(pdf) > self.memory_max_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = pdf
+        self._memory_bytes += len(pdf)
+        while self._memory_bytes > self.memory_max_bytes:
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+            if evicted_key not in self._disk:
+                self._forget(evicted_key)
+
+    # -------------------- NIVEL DISCO --------------------
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def _load_disk_index(self) -> None:
+        try:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.disk_dir):
+                if name.endswith(".pdf"):
+                    stat = os.stat(os.path.join(self.disk_dir, name))
+                    entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        except OSError as e:
+            logger.warning("Caché de PDFs en disco deshabilitada: %s", e)
+            self.disk_dir = None
+            return
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf = f.read()
+            os.utime(path)
+        except OSError:
+            return None
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        return pdf
+
+    def _write_disk(self, key: str, pdf: bytes) -> None:
+        if not self.disk_dir or len(pdf) > self.disk_max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(pdf)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("No se pudo escribir %s en la caché de PDFs: %s", key, e)
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_bytes -= self._disk.pop(key, 0)
+            self._disk[key] = len(pdf)
+            self._disk_bytes += len(pdf)
+            while self._disk_bytes > self.disk_max_bytes and len(self._disk) > 1:
+                old_key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self.evictions += 1
+                evicted.append(old_key)
+                if old_key not in self._memory:
+                    self._forget(old_key)
+        for old_key in evicted:
+            self._unlink(old_key)
+
+    def _unlink(self, key: str) -> None:
+        if not self.disk_dir:
+            return
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.orm import defer
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.config import PDF_JOB_MAX_ATTEMPTS, PDF_JOB_STALE_SECONDS, PDF_JOB_TTL_SECONDS
+from app.database.database import async_engine
+from app.models.pdf_job import PdfJobs as PdfJob
+from app.schemas.pdf_job import PdfJobCreate, PdfJobResponse, to_pdf_job_model, to_pdf_job_response
+
+
+class PdfJobService:
+    """
+    Estado de los trabajos de PDF en la tabla `pdf_jobs`. Los workers toman
+    trabajos con `SELECT ... FOR UPDATE SKIP LOCKED`, así que varios procesos
+    pueden compartir la misma cola sin pisarse.
+    """
+
+    @staticmethod
+    async def create_job_async(job_create: PdfJobCreate, requested_by: Optional[str] = None) -> PdfJobResponse:
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            job = to_pdf_job_model(job_create, requested_by)
+            session.add(job)
+            await session.commit()
+            return to_pdf_job_response(job)
+
+    @staticmethod
+    async def get_job_async(job_id: str) -> PdfJobResponse:
+        async with AsyncSession(async_engine) as session:
+            job = (await session.exec(
+                select(PdfJob).options(defer(PdfJob.pdf)).where(PdfJob.id == PdfJobService._uuid(job_id))
+            )).first()
+            if not job:
+                raise HTTPException(status_code=404, detail=f"No se encontró el trabajo de PDF {job_id}.")
+            return to_pdf_job_response(job)
+
+    @staticmethod
+    async def get_job_pdf_async(job_id: str) -> bytes:
+        async with AsyncSession(async_engine) as session:
+            job = (await session.exec(
+                select(PdfJob).where(PdfJob.id == PdfJobService._uuid(job_id))
+            )).first()
+            if not job:
+                raise HTTPException(status_code=404, detail=f"No se encontró el trabajo de PDF {job_id}.")
+            if job.status == "failed":
+                raise HTTPException(status_code=409, detail=f"El trabajo de PDF falló: {job.error}")
+            if job.status != "done":
+                raise HTTPException(status_code=409, detail="El PDF todavía no está listo.",
+                                    headers={"Retry-After": "2"})
+            return job.pdf
+
+    # -------------------- WORKERS --------------------
+
+    @staticmethod
+    async def claim_next_async() -> Optional[PdfJob]:
+        """Marca como `running` el trabajo pendiente más antiguo y lo devuelve."""
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            job = (await session.exec(
+                select(PdfJob)
+                .options(defer(PdfJob.pdf))
+                .where(PdfJob.status == "pending")
+                .order_by(PdfJob.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )).first()
+            if not job:
+                return None
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            job.attempts += 1
+            await session.commit()
+            return job
+
+    @staticmethod
+    async def complete_job_async(job_id: UUID, pdf: bytes) -> None:
+        async with AsyncSession(async_engine) as session:
+            await session.exec(
+                update(PdfJob)
+                .where(PdfJob.id == job_id, PdfJob.status == "running")
+                .values(status="done", pdf=pdf, error=None, finished_at=datetime.utcnow())
+            )
+            await session.commit()
+
+    @staticmethod
+    async def fail_job_async(job: PdfJob, error: str, retry: bool) -> None:
+        """Vuelve a encolar los errores transitorios hasta PDF_JOB_MAX_ATTEMPTS."""
+        retry = retry and job.attempts < PDF_JOB_MAX_ATTEMPTS
+        values = {"status": "pending", "error": error} if retry else \
+            {"status": "failed", "error": error, "finished_at": datetime.utcnow()}
+        async with AsyncSession(async_engine) as session:
+            await session.exec(
+                update(PdfJob).where(PdfJob.id == job.id, PdfJob.status == "running").values(**values)
+            )
+            await session.commit()
+
+    @staticmethod
+    async def release_jobs_async(job_ids: Iterable[UUID]) -> None:
+        """Devuelve a `pending` los trabajos que este proceso deja a medias al apagarse."""
+        job_ids = list(job_ids)
+        if not job_ids:
+            return
+        async with AsyncSession(async_engine) as session:
+            await session.exec(
+                update(PdfJob)
+                .where(PdfJob.id.in_(job_ids), PdfJob.status == "running")
+                .values(status="pending", attempts=PdfJob.attempts - 1)
+            )
+            await session.commit()
+
+    @staticmethod
+    async def reset_stale_jobs_async(stale_seconds: float = PDF_JOB_STALE_SECONDS,
+                                     exclude: Iterable[UUID] = ()) -> int:
+        """
+        Recupera trabajos que quedaron en `running` por un worker caído: los
+        tomados hace más de `stale_seconds` vuelven a `pending` (o pasan a
+        `failed` si ya agotaron los intentos). `exclude` son los que el
+        proceso que llama sigue procesando.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+        stale = [PdfJob.status == "running", PdfJob.started_at < cutoff]
+        exclude = list(exclude)
+        if exclude:
+            stale.append(PdfJob.id.not_in(exclude))
+        async with AsyncSession(async_engine) as session:
+            failed = await session.exec(
+                update(PdfJob)
+                .where(*stale, PdfJob.attempts >= PDF_JOB_MAX_ATTEMPTS)
+                .values(status="failed", error="El worker se detuvo durante el render.",
+                        finished_at=datetime.utcnow())
+            )
+            reset = await session.exec(
+                update(PdfJob).where(*stale).values(status="pending")
+            )
+            await session.commit()
+            return failed.rowcount + reset.rowcount
+
+    @staticmethod
+    async def purge_finished_jobs_async() -> int:
+        """
+        Borra los trabajos terminados (`done` o `failed`) hace más de
+        PDF_JOB_TTL_SECONDS junto con su PDF; su descarga pasa a dar 404.
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=PDF_JOB_TTL_SECONDS)
+        async with AsyncSession(async_engine) as session:
+            purged = await session.exec(
+                delete(PdfJob).where(PdfJob.status.in_(("done", "failed")), PdfJob.finished_at < cutoff)
+            )
+            await session.commit()
+            return purged.rowcount
+
+    @staticmethod
+    def _uuid(job_id: str) -> UUID:
+        try:
+            return UUID(str(job_id))
+        except ValueError:
+            raise HTTPException(status_code=404, detail=f"No se encontró el trabajo de PDF {job_id}.")
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.config import PDF_JOB_POLL_SECONDS, PDF_JOB_PURGE_SECONDS, PDF_JOB_STALE_SECONDS, PDF_JOB_WORKERS
+from app.models.pdf_job import PdfJobs as PdfJob
+from app.services.hine_exam_service import HineExamService
+from app.services.pdf_job_service import PdfJobService
+
+logger = logging.getLogger(__name__)
+
+
+class PdfJobWorker:
+    """
+    Workers asyncio que procesan la tabla `pdf_jobs` dentro de cada proceso
+    de la API. El render sigue pasando por la cola acotada de PDFs, así que
+    los trabajos compiten por los mismos cupos que las descargas directas.
+    Una tarea aparte de mantenimiento devuelve a la cola los trabajos
+    colgados (tomados hace más de `stale_seconds` por un worker caído) y
+    borra cada `purge_seconds` los trabajos vencidos.
+    """
+
+    def __init__(self,
+                 workers: int = PDF_JOB_WORKERS,
+                 poll_seconds: float = PDF_JOB_POLL_SECONDS,
+                 purge_seconds: float = PDF_JOB_PURGE_SECONDS,
+                 stale_seconds: float = PDF_JOB_STALE_SECONDS,
+                 hine_service: Optional[HineExamService] = None):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.purge_seconds = purge_seconds
+        self.stale_seconds = stale_seconds
+        self.hine_service = hine_service or HineExamService()
+        self._tasks: list[asyncio.Task] = []
+        self._running: dict[int, PdfJob] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self) -> None:
+        if self._tasks or self.workers <= 0:
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._run(n)) for n in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        # Se toma la lista antes de cancelar: cada worker se borra al salir
+        unfinished = [job.id for job in self._running.values()]
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await PdfJobService.release_jobs_async(unfinished)
+
+    def notify(self) -> None:
+        """Despierta a los workers en cuanto se crea un trabajo."""
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _run(self, n: int) -> None:
+        while True:
+            try:
+                job = await PdfJobService.claim_next_async()
+            except Exception:
+                logger.exception("No se pudo tomar un trabajo de PDF")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            self._running[n] = job
+            try:
+                await self._process(job)
+            finally:
+                self._running.pop(n, None)
+
+    async def _maintain(self) -> None:
+        # Los colgados se revisan cada medio umbral (el primero, al arrancar):
+        # un worker caído no deja su trabajo trabado hasta el próximo reinicio
+        interval = min(self.purge_seconds, self.stale_seconds / 2)
+        loop = asyncio.get_running_loop()
+        next_purge = loop.time()
+        while True:
+            await self._reset_stale()
+            if loop.time() >= next_purge:
+                await self._purge()
+                next_purge = loop.time() + self.purge_seconds
+            await asyncio.sleep(interval)
+
+    async def _reset_stale(self) -> None:
+        try:
+            # Los que este proceso sigue renderizando no están colgados
+            running = [job.id for job in self._running.values()]
+            recovered = await PdfJobService.reset_stale_jobs_async(self.stale_seconds, exclude=running)
+        except Exception:
+            logger.exception("No se pudieron recuperar los trabajos de PDF colgados")
+            return
+        if recovered:
+            logger.info("Trabajos de PDF colgados recuperados: %d", recovered)
+            self.notify()
+
+    async def _purge(self) -> None:
+        try:
+            purged = await PdfJobService.purge_finished_jobs_async()
+            if purged:
+                logger.info("Trabajos de PDF vencidos borrados: %d", purged)
+        except Exception:
+            logger.exception("No se pudieron borrar los trabajos de PDF vencidos")
+
+    async def _process(self, job: PdfJob) -> None:
+        try:
+            pdf = await self._render(job)
+        except HTTPException as e:
+            # 4xx (examen inexistente, datos inválidos) no se reintentan
+            await PdfJobService.fail_job_async(job, str(e.detail), retry=e.status_code >= 500)
+        except Exception as e:
+            logger.exception("Error al generar el trabajo de PDF %s", job.id)
+            await PdfJobService.fail_job_async(job, str(e), retry=True)
+        else:
+            await PdfJobService.complete_job_async(job.id, pdf)
+
+    async def _render(self, job: PdfJob) -> bytes:
+        if job.kind == "exam":
+            return await self.hine_service.get_exam_pdf_async(job.target_id)
+        if job.kind == "child":
+            return await self.hine_service.get_child_history_pdf_async(job.target_id)
+        if job.kind == "batch":
+            return await self.hine_service.get_exams_batch_pdf_async(job.exam_ids)
+        raise HTTPException(status_code=400, detail=f"Tipo de trabajo de PDF desconocido: {job.kind}")
+
+
+pdf_job_worker = PdfJobWorker()
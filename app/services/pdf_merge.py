@@ -0,0 +1,98 @@
+import io
+from typing import Iterable, NamedTuple
+
+from pypdf import PageObject, PdfReader, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+# Fuente estándar PDF: no se embebe y cualquier lector la tiene
+FONT_NAME = "/FHine"
+FONT = DictionaryObject({
+    NameObject("/Type"): NameObject("/Font"),
+    NameObject("/Subtype"): NameObject("/Type1"),
+    NameObject("/BaseFont"): NameObject("/Helvetica"),
+    NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+})
+
+MM = 72 / 25.4
+
+
+class TextLine(NamedTuple):
+    x: float
+    y: float
+    size: float
+    text: str
+    align: str = "left"  # left | center | right
+
+
+def page_count(pdf: bytes) -> int:
+    return len(PdfReader(io.BytesIO(pdf)).pages)
+
+
+def merge(documents: Iterable[bytes]) -> PdfWriter:
+    """Concatena PDFs completos en un único documento."""
+    writer = PdfWriter()
+    for pdf in documents:
+        writer.append(PdfReader(io.BytesIO(pdf)))
+    return writer
+
+
+def to_bytes(writer: PdfWriter) -> bytes:
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def text_width(text: str, size: float) -> float:
+    """Ancho aproximado en Helvetica; suficiente para alinear a la derecha o centrar."""
+    units = 0
+    for ch in text:
+        if ch in " .,:;|!'()[]·-":
+            units += 278
+        elif ch.isupper() or ch in "©@%&mwMW":
+            units += 700
+        else:
+            units += 556
+    return units * size / 1000
+
+
+def draw_text(page: PageObject, lines: Iterable[TextLine], gray: float = 0.2) -> None:
+    """Dibuja texto sobre una página existente mediante una capa superpuesta."""
+    ops = [f"{gray:.2f} g".encode()]
+    for line in lines:
+        x = line.x
+        if line.align == "right":
+            x -= text_width(line.text, line.size)
+        elif line.align == "center":
+            x -= text_width(line.text, line.size) / 2
+        ops.append(
+            b"BT " + FONT_NAME.encode() + f" {line.size:g} Tf {x:.2f} {line.y:.2f} Td (".encode()
+            + _pdf_string(line.text) + b") Tj ET"
+        )
+
+    width = float(page.mediabox.width)
+    height = float(page.mediabox.height)
+    overlay = PageObject.create_blank_page(width=width, height=height)
+    overlay[NameObject("/Resources")] = DictionaryObject({
+        NameObject("/Font"): DictionaryObject({NameObject(FONT_NAME): FONT}),
+    })
+    stream = DecodedStreamObject()
+    stream.set_data(b"\n".join(ops))
+    overlay[NameObject("/Contents")] = stream
+    page.merge_page(overlay)
+
+
+def stamp_footer(writer: PdfWriter, footer_text: str, size: float = 9,
+                 bottom: float = 10 * MM, side: float = 15 * MM) -> None:
+    """Footer centrado y "Página X de Y" a la derecha en todas las páginas."""
+    total = len(writer.pages)
+    for number, page in enumerate(writer.pages, 1):
+        width = float(page.mediabox.width)
+        draw_text(page, [
+            TextLine(width / 2, bottom, size, footer_text, "center"),
+            TextLine(width - side, bottom, size, f"Página {number} de {total}", "right"),
+        ])
+
+
+def _pdf_string(text: str) -> bytes:
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, status
+
+from app.config import (
+    PDF_MAX_CONCURRENT_RENDERS,
+    PDF_MAX_QUEUED_RENDERS,
+    PDF_QUEUE_TIMEOUT_SECONDS,
+    PDF_RENDER_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Hilos lanzados por el render en curso (ver `run_in_thread`)
+_render_threads: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("render_threads", default=None)
+
+
+async def run_in_thread(func, *args):
+    """
+    Como asyncio.to_thread, pero dentro de `PdfRenderQueue.submit` el hilo
+    queda registrado: si el render vence o se cancela, el cupo no se libera
+    hasta que el hilo termina (un hilo no se puede interrumpir).
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args)
+    future = loop.run_in_executor(None, call)
+    threads = _render_threads.get()
+    if threads is None:
+        return await future
+    threads.append(future)
+    # shield: cancelar la espera no marca el futuro como terminado
+    return await asyncio.shield(future)
+
+
+class PdfRenderQueue:
+    """
+    Limita cuántos PDFs se renderizan a la vez por worker.
+
+    Las peticiones que superan `max_concurrent` esperan en una cola acotada
+    (`max_queued`) como máximo `queue_timeout` segundos; si la cola está llena
+    o la espera vence se responde 503 en lugar de acumular procesos
+    wkhtmltopdf. Cada render tiene además su propio `render_timeout` (504).
+
+    Un render vencido o cancelado responde enseguida, pero su cupo sigue
+    ocupado hasta que el trabajo termina de verdad: el subproceso de
+    wkhtmltopdf se mata al cancelar y los hilos (`run_in_thread`) se esperan.
+    """
+
+    def __init__(self,
+                 max_concurrent: int = PDF_MAX_CONCURRENT_RENDERS,
+                 max_queued: int = PDF_MAX_QUEUED_RENDERS,
+                 queue_timeout: float = PDF_QUEUE_TIMEOUT_SECONDS,
+                 render_timeout: float = PDF_RENDER_TIMEOUT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.render_timeout = render_timeout
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Tareas que retienen el cupo de un render vencido hasta que termine
+        self._holders: set[asyncio.Task] = set()
+
+        # Métricas
+        self.waiting = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_render_seconds = 0.0
+        self.max_render_seconds = 0.0
+        self.last_render_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Se crea perezosamente para quedar ligado al event loop del worker
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    async def submit(self, render: Callable[[], Awaitable[bytes]]) -> bytes:
+        """Espera turno en la cola y ejecuta `render` respetando los timeouts."""
+        if self.waiting >= self.max_queued:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Demasiados PDFs en cola. Intenta de nuevo en unos segundos.",
+                headers={"Retry-After": str(int(self.queue_timeout))},
+            )
+
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            # asyncio.timeout cancela el acquire dentro del semáforo, que
+            # devuelve el cupo si llegó a tomarlo; wait_for podía perderlo
+            async with asyncio.timeout(self.queue_timeout):
+                await self.semaphore.acquire()
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Tiempo de espera agotado en la cola de PDFs.",
+                headers={"Retry-After": str(int(self.queue_timeout))},
+            )
+        finally:
+            self.waiting -= 1
+        self.total_wait_seconds += time.perf_counter() - queued_at
+
+        self.in_flight += 1
+        started_at = time.perf_counter()
+        threads: list = []
+        context = contextvars.copy_context()
+        context.run(_render_threads.set, threads)
+        task = asyncio.create_task(render(), context=context)
+        try:
+            pdf = await asyncio.wait_for(asyncio.shield(task), timeout=self.render_timeout)
+            self.completed += 1
+            return pdf
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"El PDF tardó más de {self.render_timeout:g}s en generarse.",
+            )
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started_at
+            if not task.done():
+                task.cancel()
+            self._release_when_done([task, *threads])
+            self.last_render_seconds = elapsed
+            self.total_render_seconds += elapsed
+            self.max_render_seconds = max(self.max_render_seconds, elapsed)
+            logger.info("PDF render %.3fs (en curso=%d, en cola=%d)", elapsed, self.in_flight, self.waiting)
+
+    def _release_when_done(self, work: list) -> None:
+        pending = [future for future in work if not future.done()]
+        if not pending:
+            self._release()
+            return
+        holder = asyncio.create_task(self._hold_slot(pending))
+        self._holders.add(holder)
+        holder.add_done_callback(self._holders.discard)
+
+    async def _hold_slot(self, pending: list) -> None:
+        try:
+            await asyncio.gather(*pending, return_exceptions=True)
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    def stats(self) -> dict:
+        finished = self.completed + self.failed + self.timed_out
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timed_out": self.timed_out,
+            "rejected": self.rejected,
+            "last_render_seconds": round(self.last_render_seconds, 4),
+            "max_render_seconds": round(self.max_render_seconds, 4),
+            "avg_render_seconds": round(self.total_render_seconds / finished, 4) if finished else 0.0,
+            "avg_wait_seconds": round(self.total_wait_seconds / finished, 4) if finished else 0.0,
+        }
+
+
+render_queue = PdfRenderQueue()
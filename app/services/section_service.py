@@ -1,7 +1,8 @@
 from fastapi import HTTPException
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.models.exam import Exams
-from app.database.database import engine
+from app.database.database import engine, async_engine
 from sqlalchemy.exc import IntegrityError
 from app.schemas.section import CreateSection, SectionResponse, to_section_model, to_section_response
 
@@ -24,3 +25,22 @@ class SectionService:
                     else:
                         raise HTTPException(status_code=400, detail="Foreign key constraint failed.")
                 raise HTTPException(status_code=400, detail="Database integrity error.")
+
+    @staticmethod
+    async def create_section_async(section: CreateSection) -> SectionResponse:
+        async with AsyncSession(async_engine) as session:
+            section_model = to_section_model(section)
+            session.add(section_model)
+            try:
+                await session.commit()
+                await session.refresh(section_model)
+                return to_section_response(section_model)
+            except IntegrityError as e:
+                await session.rollback()
+                msg = str(e.orig).lower()
+                if "foreign key" in msg:
+                    if "id_exam" in msg:
+                        raise HTTPException(status_code=400, detail="Foreign key error: Exam with this ID does not exist.")
+                    else:
+                        raise HTTPException(status_code=400, detail="Foreign key constraint failed.")
+                raise HTTPException(status_code=400, detail="Database integrity error.")
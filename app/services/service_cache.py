@@ -0,0 +1,164 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Callable, Iterable, Optional
+
+from app.config import SERVICE_CACHE_ENABLED, SERVICE_CACHE_MAX_ENTRIES, SERVICE_CACHE_TTL_SECONDS
+
+# Distingue "no está en caché" de un valor cacheado que sea None
+MISSING = object()
+
+
+class ServiceCache:
+    """
+    Caché read-through en memoria para lecturas de servicios (exámenes,
+    niños). LRU acotada por cantidad de entradas y con TTL por entrada, así
+    que incluso sin invalidación (p. ej. otro worker escribió) un dato viejo
+    vive como mucho `ttl` segundos.
+
+    Igual que PdfCache, cada entrada lleva etiquetas (`exam:<id>`,
+    `child:<id>`) y las escrituras invalidan por etiqueta. Los valores se
+    devuelven tal cual, sin copiar: quien los lee no debe modificarlos.
+
+    Read-through sin carreras: quien lee de la base toma `generation()`
+    antes de la consulta y la pasa a `put(..., since=...)`. Si mientras
+    tanto se invalidó alguna de las etiquetas, el valor leído puede ser
+    anterior a esa escritura y no se guarda.
+    """
+
+    def __init__(self,
+                 max_entries: int = SERVICE_CACHE_MAX_ENTRIES,
+                 ttl: float = SERVICE_CACHE_TTL_SECONDS,
+                 enabled: bool = SERVICE_CACHE_ENABLED,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._clock = clock
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple[float, Any, tuple]]" = OrderedDict()
+        self._tags: defaultdict[str, set[tuple]] = defaultdict(set)
+        # Generación en la que se invalidó cada etiqueta por última vez. Para
+        # acotar el dict se vacía cada tanto y `_floor` pasa a valer por
+        # todas las etiquetas olvidadas
+        self._generation = 0
+        self._floor = 0
+        self._invalidated_at: dict[str, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_puts = 0
+
+    def generation(self) -> int:
+        """Marca a tomar antes de leer de la base; ver `put`."""
+        with self._lock:
+            return self._generation
+
+    def get(self, key: tuple) -> Any:
+        """Valor cacheado o MISSING."""
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            expires_at, value, _ = entry
+            if expires_at <= self._clock():
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: Any, tags: Iterable[str] = (), since: Optional[int] = None) -> None:
+        """
+        Guarda `value`. Con `since` (lo que devolvió `generation()` antes de
+        leer) no se guarda si alguna etiqueta se invalidó después.
+        """
+        if not self.enabled:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if since is not None and self._invalidated_since(tags, since):
+                self.stale_puts += 1
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self._clock() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags[tag].add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        """Olvida todas las entradas etiquetadas con alguno de `tags`."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._generation += 1
+            if len(self._invalidated_at) + len(tags) > self.max_entries:
+                self._forget_generations()
+            for tag in tags:
+                self._invalidated_at[tag] = self._generation
+                for key in self._tags.pop(tag, set()):
+                    if key in self._entries:
+                        self._drop(key)
+                        self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            # Lo que se esté leyendo ahora tampoco se guarda
+            self._generation += 1
+            self._forget_generations()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts,
+            }
+
+    def _invalidated_since(self, tags: tuple, since: int) -> bool:
+        # Llamar con self._lock tomado
+        if self._floor > since:
+            return True
+        return any(self._invalidated_at.get(tag, 0) > since for tag in tags)
+
+    def _forget_generations(self) -> None:
+        # Llamar con self._lock tomado
+        self._invalidated_at.clear()
+        self._floor = self._generation
+
+    def _drop(self, key: tuple) -> None:
+        # Llamar con self._lock tomado
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+service_cache = ServiceCache()
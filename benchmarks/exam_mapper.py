@@ -0,0 +1,169 @@
+"""
+Mide el mapper de lectura de exámenes (filas de full_exam_view -> HineExam).
+
+    python -m benchmarks.exam_mapper
+    python -m benchmarks.exam_mapper --exams 1 10 100 --repeat 50 --json out.json
+
+Compara, para historias de N exámenes y sin base de datos:
+
+- legacy: copia congelada del mapper anterior (agrupa por sección, print por
+  fila de análisis, split de comentarios por fila y un modelo pydantic por
+  ítem). Los print van a /dev/null.
+- rows / json: el mapper actual con la consulta fila por ítem y con la
+  agregada en JSON (EXAM_JSON_SQL).
+- rows-strict: el mapper actual con EXAM_MAPPER_STRICT=true.
+"""
+import argparse
+import contextlib
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+
+from app.mappers import exam_mapper
+from app.schemas.exam import (
+    HineExam, AnalysisData, BehaviorData, MotorMilestoneData,
+    ModuleResponse, QuestionResponse, BehaviorResponse
+)
+from benchmarks.fixtures import json_rows, sample_history, view_rows
+
+
+def legacy_exam_from_rows(rows):
+    first = rows[0]
+    analysis_general_comments, motor_general_comments, behavior_general_comments = [], [], []
+    analysis_modules, motor_responses, behavior_responses = [], [], []
+    analysis_score = max_score = total_right = total_left = 0
+
+    sections = defaultdict(list)
+    for row in rows:
+        sections[row.section_name].append(row)
+
+    for section_key, section_rows in sections.items():
+        if section_key.startswith("analysis:"):
+            module_score = 0
+            responses = []
+            for row in section_rows:
+                analysis_general_comments = (row.section_comments or "").split("|||")
+                print("-------------------")
+                print(analysis_general_comments)
+                responses.append(QuestionResponse(
+                    questionId=row.item_title, selectedValue=row.item_score, comment=row.item_description,
+                    leftAsymmetry=bool(row.left_asimetric_count), rightAsymmetry=bool(row.right_asimetric_count),
+                ))
+                module_score += row.item_score or 0
+                max_score += 3
+                total_left += row.left_asimetric_count or 0
+                total_right += row.right_asimetric_count or 0
+            analysis_modules.append(ModuleResponse(
+                moduleId=section_key.split(":")[1], obtainedScore=module_score, responses=responses
+            ))
+            analysis_score += module_score
+
+    for row in sections.get("motor_milestones", []):
+        motor_general_comments = (row.section_comments or "").split("|||")
+        motor_responses.append(QuestionResponse(
+            questionId=row.item_title, selectedValue=row.item_score, comment=row.item_description,
+            leftAsymmetry=bool(row.left_asimetric_count), rightAsymmetry=bool(row.right_asimetric_count),
+        ))
+
+    for row in sections.get("behavior", []):
+        behavior_general_comments = (row.section_comments or "").split("|||")
+        behavior_responses.append(BehaviorResponse(
+            questionId=row.item_title, selectedValue=row.item_score, comment=row.item_description,
+        ))
+
+    return HineExam(
+        examId=first.exam_id, patientId=first.child_id, userId=first.doctor_id,
+        doctorName=first.doctor_name, examDate=first.exam_created_at.strftime("%Y-%m-%d"),
+        analysis=AnalysisData(
+            modules=analysis_modules, totalScore=analysis_score, maxPossibleScore=max_score,
+            totalRightAsymmetries=total_right, totalLeftAsymmetries=total_left,
+            generalComments=analysis_general_comments,
+        ),
+        motorMilestones=MotorMilestoneData(responses=motor_responses, generalComments=motor_general_comments),
+        behavior=BehaviorData(responses=behavior_responses, generalComments=behavior_general_comments),
+        gestationalAge=first.gestational_age, cronologicalAge=first.cronological_age,
+        correctedAge=first.corrected_age, headCircumference=first.head_circumference,
+    )
+
+
+def legacy_build_exams_from_rows(rows):
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.exam_id].append(row)
+    exams = [legacy_exam_from_rows(exam_rows) for exam_rows in grouped.values()]
+    exams.sort(key=lambda e: e.examDate, reverse=True)
+    return exams
+
+
+def _strict(mapper):
+    def run(rows):
+        exam_mapper.STRICT = True
+        try:
+            return mapper(rows)
+        finally:
+            exam_mapper.STRICT = exam_mapper.EXAM_MAPPER_STRICT
+    return run
+
+
+VARIANTS = {
+    "legacy": ("rows", legacy_build_exams_from_rows),
+    "rows": ("rows", exam_mapper.build_exams_from_rows),
+    "rows-strict": ("rows", _strict(exam_mapper.build_exams_from_rows)),
+    "json": ("json", exam_mapper.build_exams_from_json_rows),
+}
+
+
+def _median_seconds(mapper, rows, repeat: int) -> float:
+    mapper(rows)  # calentamiento
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        mapper(rows)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bench(exam_counts: list[int], repeat: int) -> list[dict]:
+    results = []
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for count in exam_counts:
+            rows = view_rows(sample_history(count))
+            inputs = {"rows": rows, "json": json_rows(rows)}
+            baseline = None
+            for variant, (query, mapper) in VARIANTS.items():
+                seconds = _median_seconds(mapper, inputs[query], repeat)
+                baseline = baseline or seconds
+                results.append({
+                    "exams": count,
+                    "variant": variant,
+                    "input_rows": len(inputs[query]),
+                    "median_ms": round(seconds * 1000, 3),
+                    "speedup": round(baseline / seconds, 2),
+                })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exams", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", help="ruta donde guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = bench(args.exams, args.repeat)
+
+    header = f"{'exámenes':>8} {'variante':<12} {'filas':>6} {'mediana ms':>11} {'vs legacy':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['exams']:>8} {r['variant']:<12} {r['input_rows']:>6} {r['median_ms']:>11} {r['speedup']:>9}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
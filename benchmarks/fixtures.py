@@ -0,0 +1,128 @@
+"""
+Datos sintéticos y deterministas con la forma de un examen HINE real
+(ver cieto.txt): los cinco módulos de análisis, hitos motores y
+comportamiento, con comentarios y asimetrías.
+"""
+import json
+import random
+import uuid
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+ANALYSIS_MODULES = {
+    "cranialNerves": ["facialAppearance", "eyeMovements", "auditoryResponse", "visualResponse", "suckingSwallowing"],
+    "posture": ["head", "trunk", "arms", "hands", "legs", "feet"],
+    "movements": ["amount", "quality"],
+    "tone": ["scarfSign", "passiveShoulderElevation", "pronationPupination", "hipAdductors",
+             "poplitealAngle", "ankleSorsiflexion", "pullToSit", "ventralSuspension"],
+    "reflexesAndReaction": ["tendonReflexes", "armProtection", "verticalSuspension", "lateralSuspension", "parachute"],
+}
+MOTOR_MILESTONES = ["CephalicControl", "Sitting", "VoluntaryGrasp", "LegKicking", "Rolling", "Crawling", "Standing", "Walking"]
+BEHAVIOR_ITEMS = ["StateOfConsciousness", "EmotionalState", "SocialInteraction"]
+COMMENTS = ["Sin hallazgos", "Leve hipotonía", "Respuesta adecuada para la edad",
+            "Control parcial", "Se sugiere control en 3 meses", None]
+
+
+def sample_exam(index: int = 0, patient_id: str = "patient-0001", seed: int = 1234) -> dict:
+    """Examen completo (payload de HineExam) determinista para `index` y `seed`."""
+    rng = random.Random(f"{seed}:{patient_id}:{index}")
+
+    def question(qid: str) -> dict:
+        return {
+            "questionId": qid,
+            "selectedValue": rng.randint(0, 3),
+            "leftAsymmetry": rng.random() < 0.1,
+            "rightAsymmetry": rng.random() < 0.1,
+            "comment": rng.choice(COMMENTS),
+        }
+
+    modules = []
+    for module_id, questions in ANALYSIS_MODULES.items():
+        responses = [question(qid) for qid in questions]
+        modules.append({
+            "moduleId": module_id,
+            "obtainedScore": sum(r["selectedValue"] for r in responses),
+            "responses": responses,
+        })
+    all_responses = [r for m in modules for r in m["responses"]]
+
+    return {
+        "examId": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "patientId": patient_id,
+        "userId": "doctor-0001",
+        "doctorName": "Dra. Ana Ruiz",
+        "examDate": (date(2024, 1, 1) + timedelta(days=30 * index)).isoformat(),
+        "analysis": {
+            "modules": modules,
+            "totalScore": sum(m["obtainedScore"] for m in modules),
+            "maxPossibleScore": 3 * len(all_responses),
+            "generalComments": ["Examen completo", "Paciente colaborador"],
+            "totalRightAsymmetries": sum(r["rightAsymmetry"] for r in all_responses),
+            "totalLeftAsymmetries": sum(r["leftAsymmetry"] for r in all_responses),
+        },
+        "motorMilestones": {
+            "responses": [question(qid) for qid in MOTOR_MILESTONES],
+            "generalComments": ["Hitos acordes a la edad corregida"],
+        },
+        "behavior": {
+            "responses": [
+                {"questionId": qid, "selectedValue": rng.randint(1, 6), "comment": rng.choice(COMMENTS)}
+                for qid in BEHAVIOR_ITEMS
+            ],
+            "generalComments": [],
+        },
+        "gestationalAge": str(rng.randint(28, 41)),
+        "cronologicalAge": str(3 + index),
+        "correctedAge": str(2 + index),
+        "headCircumference": f"{rng.uniform(36, 46):.1f}",
+    }
+
+
+def sample_history(exams: int, patient_id: str = "patient-0001", seed: int = 1234) -> list[dict]:
+    """Historia de `exams` exámenes del mismo paciente, del más reciente al más antiguo."""
+    return [sample_exam(i, patient_id, seed) for i in reversed(range(exams))]
+
+
+def view_rows(exams: list[dict], separator: str = "|||") -> list[SimpleNamespace]:
+    """Filas con la forma de full_exam_view (una por ítem) para los exámenes dados."""
+    from app.mappers.exam_mapper import to_section_and_item_rows
+    from app.schemas.exam import HineExam
+
+    rows = []
+    for payload in exams:
+        hine_exam = HineExam(**payload)
+        section_rows, item_rows = to_section_and_item_rows(hine_exam.examId, hine_exam, separator)
+        sections = {section["id"]: section for section in section_rows}
+        for item in item_rows:
+            section = sections[item["section_id"]]
+            rows.append(SimpleNamespace(
+                exam_id=hine_exam.examId, child_id=hine_exam.patientId, doctor_id=hine_exam.userId,
+                doctor_name=hine_exam.doctorName, exam_created_at=date.fromisoformat(hine_exam.examDate),
+                gestational_age=hine_exam.gestationalAge, cronological_age=hine_exam.cronologicalAge,
+                corrected_age=hine_exam.correctedAge, head_circumference=hine_exam.headCircumference,
+                section_id=section["id"], section_name=section["section_name"],
+                section_comments=section["section_comments"],
+                item_id=item["id"], item_title=item["title"], item_score=item["score"],
+                item_description=item["description"],
+                left_asimetric_count=item["left_asimetric_count"],
+                right_asimetric_count=item["right_asimetric_count"],
+            ))
+    return rows
+
+
+def json_rows(rows: list[SimpleNamespace]) -> list[SimpleNamespace]:
+    """Las mismas filas agrupadas como las devuelve EXAM_JSON_SQL (una por examen, JSON como texto)."""
+    columns = ["exam_id", "child_id", "doctor_id", "doctor_name", "exam_created_at",
+               "gestational_age", "cronological_age", "corrected_age", "head_circumference"]
+    exams = {}
+    for row in rows:
+        exam = exams.setdefault(row.exam_id, ({c: getattr(row, c) for c in columns}, {}))
+        section = exam[1].setdefault(row.section_id, {
+            "name": row.section_name, "comments": row.section_comments, "items": [],
+        })
+        section["items"].append([row.item_title, row.item_score, row.item_description,
+                                 row.left_asimetric_count, row.right_asimetric_count])
+    return [
+        SimpleNamespace(**exam_columns, sections=json.dumps(list(sections.values())))
+        for exam_columns, sections in exams.values()
+    ]
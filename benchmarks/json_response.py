@@ -0,0 +1,88 @@
+"""
+Mide la serialización de historias de exámenes (lista de HineExam -> bytes
+del cuerpo de la respuesta).
+
+    python -m benchmarks.json_response
+    python -m benchmarks.json_response --exams 1 10 100 --repeat 50 --json out.json
+
+Variantes, sin base de datos ni servidor:
+
+- jsonable_encoder: lo que hacía FastAPI con /hineExam/children/{id}
+  (jsonable_encoder + JSONResponse con json.dumps).
+- fast_json: FastJSONResponse (pydantic-core serializa los modelos directo).
+
+Antes de medir se comprueba que ambas producen el mismo JSON.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.routers.fast_json import FastJSONResponse
+from app.schemas.exam import HineExam
+from benchmarks.fixtures import sample_history
+
+VARIANTS = {
+    "jsonable_encoder": lambda exams: JSONResponse(jsonable_encoder(exams)).body,
+    "fast_json": lambda exams: FastJSONResponse(exams).body,
+}
+
+
+def _median_seconds(serialize, exams, repeat: int) -> float:
+    serialize(exams)  # calentamiento
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        serialize(exams)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def bench(exam_counts: list[int], repeat: int) -> list[dict]:
+    results = []
+    for count in exam_counts:
+        exams = [HineExam.model_validate(exam) for exam in sample_history(count)]
+        bodies = {variant: serialize(exams) for variant, serialize in VARIANTS.items()}
+        decoded = [json.loads(body) for body in bodies.values()]
+        if any(other != decoded[0] for other in decoded[1:]):
+            raise SystemExit(f"Las variantes no producen el mismo JSON para {count} exámenes")
+
+        baseline = None
+        for variant, serialize in VARIANTS.items():
+            seconds = _median_seconds(serialize, exams, repeat)
+            baseline = baseline or seconds
+            results.append({
+                "exams": count,
+                "variant": variant,
+                "body_bytes": len(bodies[variant]),
+                "median_ms": round(seconds * 1000, 3),
+                "speedup": round(baseline / seconds, 2),
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--exams", nargs="+", type=int, default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--json", help="ruta donde guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = bench(args.exams, args.repeat)
+
+    header = f"{'exámenes':>8} {'variante':<17} {'bytes':>9} {'mediana ms':>11} {'vs encoder':>11}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['exams']:>8} {r['variant']:<17} {r['body_bytes']:>9} {r['median_ms']:>11} {r['speedup']:>10}x")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
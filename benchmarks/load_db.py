@@ -0,0 +1,82 @@
+"""
+Base de datos local para las pruebas de carga: todas las tablas de los
+modelos más un equivalente de full_exam_view, que en producción no lo crea
+ninguna migración.
+
+En SQLite los UUID se guardan como hex de 32 caracteres, así que la vista
+los devuelve con guiones para que coincidan con el examId de la API.
+"""
+from datetime import date
+
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+
+import app.models  # noqa: F401  registra las tablas en SQLModel.metadata
+import app.models.advisor  # noqa: F401
+import app.models.advisor_child  # noqa: F401
+from app.models.child import Children
+from app.models.doctor import Doctors
+
+DOCTOR_ID = "doctor-0001"
+
+_VIEW_COLUMNS = """
+    e.child_id, e.doctor_id, d.name AS doctor_name, e.created_at AS exam_created_at,
+    e.gestational_age, e.cronological_age, e.corrected_age, e.head_circumference,
+    s.id AS section_id, s.section_name, s.section_comments,
+    i.id AS item_id, i.title AS item_title, i.score AS item_score, i.description AS item_description,
+    i.left_asimetric_count, i.right_asimetric_count
+"""
+_VIEW_JOINS = """
+    FROM exams e
+    LEFT JOIN doctors d ON d.id = e.doctor_id
+    JOIN sections s ON s.id_exam = e.id
+    JOIN items i ON i.section_id = s.id
+"""
+
+VIEW_SQL = {
+    "postgresql": f"""
+        CREATE VIEW full_exam_view AS
+        SELECT e.id AS exam_id, {_VIEW_COLUMNS} {_VIEW_JOINS}
+        WHERE e.eliminated IS NOT TRUE
+    """,
+    "sqlite": f"""
+        CREATE VIEW full_exam_view AS
+        SELECT lower(substr(e.id, 1, 8) || '-' || substr(e.id, 9, 4) || '-' || substr(e.id, 13, 4)
+                     || '-' || substr(e.id, 17, 4) || '-' || substr(e.id, 21)) AS exam_id,
+               {_VIEW_COLUMNS} {_VIEW_JOINS}
+        WHERE coalesce(e.eliminated, 0) = 0
+    """,
+}
+
+
+def create_schema(engine, drop: bool = False) -> None:
+    """Crea las tablas y full_exam_view; con `drop` parte de una base vacía."""
+    dialect = engine.dialect.name
+    if dialect not in VIEW_SQL:
+        raise ValueError(f"Dialecto no soportado para la vista: {dialect}")
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP VIEW IF EXISTS full_exam_view"))
+    if drop:
+        SQLModel.metadata.drop_all(engine)
+    SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(VIEW_SQL[dialect]))
+
+
+def child_ids(count: int) -> list[str]:
+    return [f"load-child-{i:05d}" for i in range(count)]
+
+
+def seed_people(engine, children: int) -> list[str]:
+    """Inserta el médico de los fixtures y `children` pacientes; devuelve sus ids."""
+    ids = child_ids(children)
+    with Session(engine) as session:
+        session.merge(Doctors(id=DOCTOR_ID, name="Ana", last_name="Ruiz", password="x"))
+        for i, child_id in enumerate(ids):
+            session.merge(Children(
+                id=child_id, name=f"Paciente {i}", last_name="Carga",
+                birth_date=date(2023, 1 + i % 12, 1), exam_date=date(2024, 1 + i % 12, 1),
+            ))
+        session.commit()
+    return ids
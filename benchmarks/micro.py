@@ -0,0 +1,246 @@
+"""
+Microbenchmarks de las partes de CPU en Python: mapper de lectura,
+validación de HineExam y armado del HTML del PDF.
+
+    python -m benchmarks.micro
+    python -m benchmarks.micro --check
+    python -m benchmarks.micro --cases mapper.exams html.exam_section --exams 1 10 --json out.json
+    python -m benchmarks.micro --update-baseline
+
+Las entradas son fijas (benchmarks/fixtures.py, 1/10/100/1000 exámenes) y
+no hace falta base de datos ni wkhtmltopdf. Por caso y tamaño se mide:
+
+- ops_per_sec: llamadas por segundo según la mejor de 5 muestras de
+  ~--min-time/5 segundos cada una (la mejor es la menos afectada por el
+  ruido de la máquina); median_ms queda como referencia.
+- peak_kib / retained_kib: pico de memoria Python asignada durante una
+  llamada y lo que queda vivo al terminar (tracemalloc, corrida aparte).
+
+--check compara contra benchmarks/baselines/micro.json y sale con código
+1 si algún caso baja de ops/seg más que --tolerance o sube el pico de
+memoria más que --memory-tolerance. Los ops/seg dependen de la máquina: la
+baseline se regenera con --update-baseline en la misma máquina donde se
+corre --check.
+"""
+import argparse
+import contextlib
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from app.mappers.exam_mapper import build_exams_from_rows, to_exam_response_from_rows
+from app.schemas.exam import HineExam
+from app.services.hine_pdf_renderer import HINEPdfRenderer, PdfBackend
+from benchmarks.fixtures import sample_history, view_rows
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "micro.json"
+
+
+def _rows_by_exam(rows) -> list[list]:
+    grouped = defaultdict(list)
+    for row in rows:
+        grouped[row.exam_id].append(row)
+    return list(grouped.values())
+
+
+def _renderer() -> HINEPdfRenderer:
+    # solo se arma HTML: el backend base no necesita wkhtmltopdf y nunca se llama
+    return HINEPdfRenderer(get_exam_by_id=lambda _: None, backend=PdfBackend())
+
+
+def _section_inputs(payloads: list[dict]) -> tuple[HINEPdfRenderer, list[dict], list[str]]:
+    renderer = _renderer()
+    sections = [renderer._exam_section(data, index=i) for i, data in enumerate(payloads, 1)]
+    return renderer, payloads, sections
+
+
+# caso -> (preparar entrada a partir de los payloads, función medida)
+CASES = {
+    "mapper.exam": (
+        lambda payloads: _rows_by_exam(view_rows(payloads)),
+        lambda groups: [to_exam_response_from_rows(rows) for rows in groups],
+    ),
+    "mapper.exams": (
+        lambda payloads: view_rows(payloads),
+        build_exams_from_rows,
+    ),
+    "schema.validate": (
+        lambda payloads: payloads,
+        lambda payloads: [HineExam.model_validate(payload) for payload in payloads],
+    ),
+    "html.exam_section": (
+        _section_inputs,
+        lambda prepared: [prepared[0]._exam_section(data, index=i) for i, data in enumerate(prepared[1], 1)],
+    ),
+    "html.build_document": (
+        _section_inputs,
+        lambda prepared: prepared[0]._build_document(title="Benchmark", intro_meta="HINE", sections=prepared[2]),
+    ),
+    "html.batch_document": (
+        lambda payloads: (_renderer(), payloads),
+        lambda prepared: prepared[0]._batch_document(prepared[1]),
+    ),
+}
+
+
+def _time_calls(func, arg, min_time: float, samples: int = 5) -> tuple[int, list[float]]:
+    """
+    Segundos por llamada de cada muestra. Cada muestra repite la llamada
+    `loops` veces (calibrado para que dure ~min_time / samples) así los
+    casos de microsegundos no quedan dominados por el ruido del reloj.
+    """
+    func(arg)  # calentamiento
+    loops = 1
+    target = min_time / samples
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        elapsed = time.perf_counter() - started
+        if elapsed >= target:
+            break
+        loops *= 2 if elapsed <= 0 else max(2, min(int(target / elapsed) + 1, 10))
+
+    gc.collect()
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func(arg)
+        timings.append((time.perf_counter() - started) / loops)
+    return loops, timings
+
+
+def _memory(func, arg) -> tuple[int, int]:
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = func(arg)
+        peak = tracemalloc.get_traced_memory()[1]
+        del result
+        retained = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return peak - before, max(retained, 0)
+
+
+def bench(cases: list[str], exam_counts: list[int], min_time: float) -> list[dict]:
+    results = []
+    # los print de la app van a /dev/null para no medir la terminal
+    with open(os.devnull, "w") as sink, contextlib.redirect_stdout(sink):
+        for count in exam_counts:
+            payloads = sample_history(count)
+            for name in cases:
+                prepare, func = CASES[name]
+                arg = prepare(payloads)
+                loops, timings = _time_calls(func, arg, min_time)
+                peak, retained = _memory(func, arg)
+                best, median = min(timings), statistics.median(timings)
+                results.append({
+                    "case": name,
+                    "exams": count,
+                    "calls": loops * len(timings),
+                    "median_ms": round(median * 1000, 4),
+                    "ops_per_sec": round(1 / best, 2),
+                    "peak_kib": round(peak / 1024, 1),
+                    "retained_kib": round(retained / 1024, 1),
+                })
+    return results
+
+
+def _key(result: dict) -> str:
+    return f"{result['case']}:{result['exams']}"
+
+
+def load_baseline(path: Path) -> dict:
+    with open(path) as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path: Path, results: list[dict]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "meta": {"python": platform.python_version(), "platform": sys.platform, "machine": platform.machine()},
+        "results": {_key(r): {"ops_per_sec": r["ops_per_sec"], "peak_kib": r["peak_kib"]} for r in results},
+    }
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float, memory_tolerance: float) -> list[str]:
+    """Mensajes de regresión; anota en cada resultado su cambio contra la baseline."""
+    regressions = []
+    for r in results:
+        base = baseline.get(_key(r))
+        if base is None:
+            continue
+        r["ops_change"] = round(r["ops_per_sec"] / base["ops_per_sec"] - 1, 3)
+        r["peak_change"] = round(r["peak_kib"] / base["peak_kib"] - 1, 3) if base["peak_kib"] else 0.0
+        if r["ops_change"] < -tolerance:
+            regressions.append(f"{_key(r)}: {r['ops_per_sec']} ops/s vs {base['ops_per_sec']} "
+                               f"({r['ops_change']:+.0%}, tolerancia -{tolerance:.0%})")
+        if r["peak_change"] > memory_tolerance:
+            regressions.append(f"{_key(r)}: pico {r['peak_kib']} KiB vs {base['peak_kib']} "
+                               f"({r['peak_change']:+.0%}, tolerancia +{memory_tolerance:.0%})")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--exams", nargs="+", type=int, default=[1, 10, 100, 1000])
+    parser.add_argument("--min-time", type=float, default=0.5, help="segundos aproximados de medición por caso")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--check", action="store_true", help="falla si hay regresiones contra la baseline")
+    parser.add_argument("--tolerance", type=float, default=0.30, help="caída de ops/seg aceptada (0.30 = 30%%)")
+    parser.add_argument("--memory-tolerance", type=float, default=0.10, help="suba del pico de memoria aceptada")
+    parser.add_argument("--update-baseline", action="store_true", help="guarda estos resultados como baseline")
+    parser.add_argument("--json", help="ruta donde guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = bench(args.cases, args.exams, args.min_time)
+
+    regressions = []
+    if args.check:
+        if not args.baseline.exists():
+            parser.error(f"no existe la baseline {args.baseline}; generarla con --update-baseline")
+        regressions = compare(results, load_baseline(args.baseline), args.tolerance, args.memory_tolerance)
+
+    header = f"{'caso':<21} {'exámenes':>8} {'ops/seg':>11} {'mediana ms':>11} {'pico KiB':>10} {'retenido KiB':>13}"
+    if args.check:
+        header += f" {'vs base':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        line = (f"{r['case']:<21} {r['exams']:>8} {r['ops_per_sec']:>11} {r['median_ms']:>11} "
+                f"{r['peak_kib']:>10} {r['retained_kib']:>13}")
+        if "ops_change" in r:
+            line += f" {r['ops_change']:>+8.0%}"
+        print(line)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"\nbaseline guardada en {args.baseline}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print("\nRegresiones:", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
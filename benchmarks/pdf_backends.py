@@ -0,0 +1,95 @@
+"""
+Compara latencia y memoria por documento entre los motores de PDF.
+
+    python -m benchmarks.pdf_backends
+    python -m benchmarks.pdf_backends --backends weasyprint --exams 1 10 --repeat 5 --json out.json
+
+Cada caso renderiza la historia de N exámenes sin base de datos ni caché.
+Para wkhtmltopdf la memoria es el pico de RSS de los procesos hijos; para
+los motores en proceso, el pico de memoria Python (tracemalloc) y el
+crecimiento del RSS del propio proceso.
+"""
+import argparse
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+from fastapi import HTTPException
+
+from app.services.hine_pdf_renderer import HINEPdfRenderer, PDF_BACKENDS, make_pdf_backend
+from benchmarks.fixtures import sample_history
+
+
+def _maxrss_mb(who) -> float:
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def bench_backend(name: str, exam_counts: list[int], repeat: int) -> list[dict]:
+    try:
+        backend = make_pdf_backend(name)
+    except HTTPException as e:
+        print(f"[{name}] omitido: {e.detail}", file=sys.stderr)
+        return []
+
+    renderer = HINEPdfRenderer(get_exam_by_id=lambda _: None, backend=backend)
+    footer = renderer._footer_text()
+    results = []
+    for count in exam_counts:
+        html = renderer._batch_document(sample_history(count))
+        backend.render(html, footer)  # calentamiento (fuentes, imports, caché de disco del SO)
+
+        timings = []
+        peak_traced = 0
+        rss_before = _maxrss_mb(resource.RUSAGE_SELF)
+        for _ in range(repeat):
+            tracemalloc.start()
+            started = time.perf_counter()
+            pdf = backend.render(html, footer)
+            timings.append(time.perf_counter() - started)
+            peak_traced = max(peak_traced, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        results.append({
+            "backend": name,
+            "exams": count,
+            "pdf_bytes": len(pdf),
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "max_ms": round(max(timings) * 1000, 1),
+            "python_peak_mb": round(peak_traced / (1024 * 1024), 2),
+            "self_rss_growth_mb": round(_maxrss_mb(resource.RUSAGE_SELF) - rss_before, 2),
+            "children_peak_rss_mb": round(_maxrss_mb(resource.RUSAGE_CHILDREN), 2),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=list(PDF_BACKENDS), choices=list(PDF_BACKENDS))
+    parser.add_argument("--exams", nargs="+", type=int, default=[1, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="ruta donde guardar los resultados en JSON")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.backends:
+        results.extend(bench_backend(name, args.exams, args.repeat))
+
+    header = f"{'motor':<12} {'exámenes':>8} {'mediana ms':>11} {'máx ms':>9} {'PDF KB':>8} {'py MB':>7} {'RSS+ MB':>8} {'hijos MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['backend']:<12} {r['exams']:>8} {r['median_ms']:>11} {r['max_ms']:>9} "
+              f"{r['pdf_bytes'] / 1024:>8.1f} {r['python_peak_mb']:>7} {r['self_rss_growth_mb']:>8} {r['children_peak_rss_mb']:>9}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
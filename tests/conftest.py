@@ -0,0 +1,71 @@
+"""
+Base común de las pruebas: una base SQLite temporal con las tablas de los
+modelos y full_exam_view (benchmarks/load_db.py), el médico y unos pacientes
+sembrados y un TestClient autenticado.
+
+    python -m pytest -q tests
+
+Como la app, necesitan wkhtmltopdf en el PATH (el renderer se arma al
+importar los routers).
+
+Con TEST_DATABASE_URL=postgresql://... corren contra Postgres (la base se
+borra y se vuelve a crear: no apuntar nunca a una base real); las pruebas de
+NOTIFY solo corren en ese caso.
+"""
+import itertools
+import os
+import shutil
+import tempfile
+import time
+
+_workdir = tempfile.mkdtemp(prefix="hine-tests-")
+# La app lee la configuración al importarse: hay que fijarla antes
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_workdir, 'hine.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["PDF_CACHE_DIR"] = os.path.join(_workdir, "pdf-cache")
+os.environ["DB_ECHO"] = "false"
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import ALGORITHM, SECRET_KEY
+from app.database.database import engine
+from app.main import app
+from app.services.service_cache import service_cache
+from benchmarks.load_db import DOCTOR_ID, create_schema, seed_people
+from benchmarks.load_test import exam_payload
+
+CHILDREN = 12
+
+_exam_index = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def children() -> list[str]:
+    create_schema(engine, drop=True)
+    yield seed_people(engine, CHILDREN)
+    shutil.rmtree(_workdir, ignore_errors=True)
+
+
+@pytest.fixture
+def client(children) -> TestClient:
+    # Sin `with`: no arranca el lifespan, así el worker de PDFs no consulta
+    # la base en segundo plano y no ensucia los conteos de consultas
+    token = jwt.encode({"sub": DOCTOR_ID, "exp": int(time.time()) + 3600}, SECRET_KEY, algorithm=ALGORITHM)
+    service_cache.clear()
+    return TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.fixture
+def make_exam():
+    """Payload de HineExam nuevo (examId distinto en cada llamada)."""
+    return lambda child_id: exam_payload(next(_exam_index), child_id, seed=4321)
+
+
+@pytest.fixture
+def created_exam(client, children, make_exam) -> dict:
+    payload = make_exam(children[0])
+    response = client.post("/hineExam/", json=payload)
+    assert response.status_code == 201, response.text
+    return payload
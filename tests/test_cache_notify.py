@@ -0,0 +1,67 @@
+"""
+Invalidación entre workers por LISTEN/NOTIFY: otro engine (como si fuera
+otro proceso) publica etiquetas en su transacción y este proceso las aplica
+recién al confirmarse. Necesita Postgres (TEST_DATABASE_URL).
+"""
+import asyncio
+import json
+import time
+
+import pytest
+from sqlalchemy import create_engine
+
+from app.database.database import engine
+from app.services.cache_events import CacheEventListener
+from app.services.cache_invalidation import NOTIFY_SQL
+from app.services.service_cache import MISSING, service_cache
+
+pytestmark = pytest.mark.skipif(engine.dialect.name != "postgresql", reason="NOTIFY requiere Postgres (TEST_DATABASE_URL)")
+
+CHANNEL = "formshine_cache_test"
+
+
+def _notify(other_engine, tags: list[str], commit: bool) -> None:
+    payload = json.dumps({"origin": "otro-worker", "tags": tags})
+    with other_engine.connect() as conn:
+        conn.execute(NOTIFY_SQL.bindparams(channel=CHANNEL, payload=payload))
+        if commit:
+            conn.commit()
+        else:
+            conn.rollback()
+
+
+async def _wait_until(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        await asyncio.sleep(0.05)
+    return condition()
+
+
+def test_notify_from_other_engine_invalidates_local_cache(children):
+    other_engine = create_engine(engine.url)
+    listener = CacheEventListener(channel=CHANNEL, reconnect_seconds=0.1, enabled=True)
+
+    async def scenario():
+        await listener.start()
+        try:
+            assert await _wait_until(lambda: listener.stats()["connected"])
+            key = ("child", "notify-test")
+            service_cache.put(key, "viejo", ("child:notify-test",))
+
+            # Con rollback Postgres no entrega nada
+            await asyncio.to_thread(_notify, other_engine, ["child:notify-test"], False)
+            await asyncio.sleep(0.3)
+            assert service_cache.get(key) == "viejo"
+
+            await asyncio.to_thread(_notify, other_engine, ["child:notify-test"], True)
+            assert await _wait_until(lambda: service_cache.get(key) is MISSING)
+            assert listener.stats()["applied"] == 1
+        finally:
+            await listener.stop()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        other_engine.dispose()
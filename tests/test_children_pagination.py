@@ -0,0 +1,48 @@
+"""Paginación por cursor de /children/page y forma de /children/."""
+
+
+def _all_pages(client, **params) -> tuple[list[str], int]:
+    ids, pages, cursor = [], 0, None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = client.get("/children/page", params=query)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        ids.extend(child["id"] for child in page["items"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def test_children_list_keeps_plain_list(client, children):
+    response = client.get("/children/")
+    assert response.status_code == 200
+    assert {child["id"] for child in response.json()} >= set(children)
+
+
+def test_cursor_walks_every_child_once(client, children):
+    ids, pages = _all_pages(client, limit=5)
+    assert sorted(ids) == sorted(children)
+    assert len(ids) == len(set(ids))
+    assert pages == 3
+
+
+def test_exact_last_page_has_no_cursor(client, children):
+    page = client.get("/children/page", params={"limit": len(children)}).json()
+    assert len(page["items"]) == len(children)
+    assert page["next_cursor"] is None
+
+
+def test_filters_combine_with_cursor(client, children):
+    # seed_people: "Paciente {i}", nacido el 1 del mes 1 + i % 12 de 2023
+    ids, _ = _all_pages(client, limit=1, name="paciente 1")
+    assert sorted(ids) == sorted(children[i] for i in (1, 10, 11))
+
+    ids, _ = _all_pages(client, limit=2, birth_date_from="2023-10-01")
+    assert sorted(ids) == sorted(children[i] for i in (9, 10, 11))
+
+
+def test_invalid_cursor_and_limit(client, children):
+    assert client.get("/children/page", params={"cursor": "no-es-un-cursor"}).status_code == 400
+    assert client.get("/children/page", params={"limit": 0}).status_code == 422
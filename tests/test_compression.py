@@ -0,0 +1,35 @@
+"""Compresión de respuestas y Vary: Accept-Encoding."""
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("accept_encoding", ["br", "gzip", "identity"])
+def test_json_varies_on_accept_encoding(client, created_exam, children, accept_encoding):
+    # Examen (grande, se comprime si se acepta) y ficha del niño (chica, nunca)
+    for url in (f"/hineExam/{created_exam['examId']}", f"/children/{children[0]}"):
+        response = client.get(url, headers={"Accept-Encoding": accept_encoding})
+        assert response.status_code == 200
+        assert "accept-encoding" in response.headers.get("vary", "").lower()
+
+
+def test_compressed_exam_has_weak_etag(client, created_exam):
+    response = client.get(f"/hineExam/{created_exam['examId']}", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"].startswith("W/")
+
+
+def test_pdf_is_not_compressed(client, created_exam):
+    response = client.get(f"/hineExam/{created_exam['examId']}/pdf", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+
+
+def test_skip_compression_routes(client, children, make_exam):
+    # Import NDJSON: el reporte (un resultado por línea) sale sin comprimir
+    body = b"\n".join(json.dumps(make_exam(children[4])).encode() for _ in range(30)) + b"\n"
+    response = client.post("/hineExam/import", content=body,
+                           headers={"Content-Type": "application/x-ndjson", "Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
@@ -0,0 +1,60 @@
+"""Reporte de POST /hineExam/import (NDJSON)."""
+import json
+
+from app.config import IMPORT_MAX_LINE_BYTES
+
+
+def _ndjson(*records) -> bytes:
+    return b"\n".join(r if isinstance(r, bytes) else json.dumps(r).encode() for r in records) + b"\n"
+
+
+def _import(client, body: bytes):
+    return client.post("/hineExam/import", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+
+def test_import_report_per_line(client, children, make_exam):
+    first, second = make_exam(children[3]), make_exam(children[3])
+    missing_field = {k: v for k, v in make_exam(children[3]).items() if k != "analysis"}
+    bad_date = dict(make_exam(children[3]), examDate="01/02/2024")
+    unknown_child = make_exam("no-existe")
+
+    body = _ndjson(first, b"{no es json", missing_field, second, first, bad_date, unknown_child)
+    # líneas en blanco: no cuentan como registros pero sí en la numeración
+    body = body.replace(b"\n", b"\n\n", 1)
+    response = _import(client, body)
+    assert response.status_code == 200, response.text
+    report = response.json()
+
+    assert report["received"] == 7
+    assert report["created"] == 2
+    assert report["failed"] == 5
+    by_line = {result["line"]: result for result in report["results"]}
+    assert sorted(by_line) == [1, 3, 4, 5, 6, 7, 8]
+
+    assert by_line[1]["status"] == "created"
+    assert by_line[1]["examId"] == first["examId"]
+    assert by_line[5]["status"] == "created"
+    assert by_line[3]["status"] == "error" and by_line[3]["examId"] is None
+    assert "analysis" in by_line[4]["detail"]
+    assert by_line[6]["detail"] == "Examen repetido en el archivo"
+    assert "examDate" in by_line[7]["detail"]
+    assert "no-existe" in by_line[8]["detail"]
+
+    history = client.get(f"/hineExam/children/{children[3]}").json()
+    assert {exam["examId"] for exam in history} == {first["examId"], second["examId"]}
+
+
+def test_import_existing_exam_and_oversized_line(client, created_exam, children, make_exam):
+    fresh = make_exam(children[4])
+    huge = b'{"pad": "' + b"x" * IMPORT_MAX_LINE_BYTES + b'"}'
+    report = _import(client, _ndjson(created_exam, huge, fresh)).json()
+
+    results = {result["line"]: result for result in report["results"]}
+    assert results[1]["detail"] == "El examen ya existe"
+    assert "supera el máximo" in results[2]["detail"]
+    assert results[3]["status"] == "created"
+
+
+def test_import_empty_body(client):
+    response = _import(client, b"\n  \n")
+    assert response.status_code == 400
@@ -0,0 +1,98 @@
+"""ETag, 304 y Range de las lecturas de exámenes y de los PDFs."""
+from app.database.query_stats import assert_max_queries
+from app.services.service_cache import service_cache
+
+
+def test_exam_etag_and_not_modified(client, created_exam):
+    url = f"/hineExam/{created_exam['examId']}"
+    first = client.get(url)
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert "last-modified" in first.headers
+
+    cached = client.get(url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    # La compresión debilita el ETag del 200 (W/); el 304 no lleva cuerpo
+    assert cached.headers["etag"] == etag.removeprefix("W/")
+    assert cached.content == b""
+
+    # Comparación débil: con o sin W/ vale
+    assert client.get(url, headers={"If-None-Match": f'"otro", {etag.removeprefix("W/")}'}).status_code == 304
+    assert client.get(url, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+
+def test_child_history_etag_changes_with_new_exam(client, children, make_exam):
+    child_id = children[2]
+    assert client.post("/hineExam/", json=make_exam(child_id)).status_code == 201
+    url = f"/hineExam/children/{child_id}"
+    etag = client.get(url).headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/hineExam/", json=make_exam(child_id)).status_code == 201
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert len(response.json()) == 2
+
+
+def _fail_render(*args, **kwargs):
+    raise AssertionError("el 304 no debería renderizar")
+
+
+def test_pdf_not_modified_without_render(client, children, created_exam, monkeypatch):
+    from app.routers import hine_exam
+
+    for url in (f"/hineExam/{created_exam['examId']}/pdf", f"/hineExam/children/{children[0]}/history/pdf"):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["accept-ranges"] == "bytes"
+        assert "last-modified" in response.headers
+        etag = response.headers["etag"]
+
+        # Sin caché de lecturas: solo la consulta de versión, ni vista ni render
+        service_cache.clear()
+        with monkeypatch.context() as patch:
+            patch.setattr(hine_exam.service, "get_exam_pdf_async", _fail_render)
+            patch.setattr(hine_exam.service, "get_child_history_pdf_async", _fail_render)
+            with assert_max_queries(1):
+                cached = client.get(url, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+
+        # La misma versión da los mismos bytes y el mismo ETag
+        again = client.get(url)
+        assert again.headers["etag"] == etag
+        assert again.content == response.content
+
+
+def test_pdf_range_requests(client, created_exam):
+    url = f"/hineExam/{created_exam['examId']}/pdf"
+    full = client.get(url)
+    pdf, etag, size = full.content, full.headers["etag"], len(full.content)
+
+    partial = client.get(url, headers={"Range": "bytes=0-9"})
+    assert partial.status_code == 206
+    assert partial.headers["content-range"] == f"bytes 0-9/{size}"
+    assert partial.content == pdf[:10]
+
+    suffix = client.get(url, headers={"Range": "bytes=-5", "If-Range": etag})
+    assert suffix.status_code == 206
+    assert suffix.content == pdf[-5:]
+
+    # If-Range de otra versión: se devuelve el PDF completo
+    stale = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"otra-version"'})
+    assert stale.status_code == 200
+    assert stale.content == pdf
+
+    unsatisfiable = client.get(url, headers={"Range": f"bytes={size}-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == f"bytes */{size}"
+
+
+def test_pdf_job_download_checks_job_before_etag(client):
+    from app.routers.http_cache import make_etag
+
+    job_id = "00000000-0000-0000-0000-000000000000"
+    response = client.get(f"/hineExam/pdf-jobs/{job_id}/pdf",
+                          headers={"If-None-Match": make_etag("pdf-job", job_id)})
+    assert response.status_code == 404
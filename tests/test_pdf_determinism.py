@@ -0,0 +1,26 @@
+"""Mismo examen, mismos bytes: sin hora de generación en el PDF ni en sus metadatos."""
+from app.services.hine_pdf_renderer import HINEPdfRenderer, pin_pdf_dates
+from app.services.pdf_cache import PdfCache
+from benchmarks.load_test import exam_payload
+
+
+def _renderer(exams: list[dict]) -> HINEPdfRenderer:
+    by_id = {exam["examId"]: exam for exam in exams}
+    # Caché apagada: cada llamada vuelve a renderizar
+    return HINEPdfRenderer(get_exam_by_id=by_id.get, get_exams_by_child=lambda _: exams,
+                           cache=PdfCache(enabled=False))
+
+
+def test_same_exam_renders_same_bytes():
+    exams = [exam_payload(index, "child-det", seed=99) for index in range(3)]
+    renderer = _renderer(exams)
+    exam_id = exams[0]["examId"]
+    assert renderer.render_exam_pdf(exam_id) == _renderer(exams).render_exam_pdf(exam_id)
+    assert renderer.render_child_history_pdf("child-det") == _renderer(exams).render_child_history_pdf("child-det")
+
+
+def test_pin_pdf_dates_keeps_length():
+    pdf = b"<< /Producer (Qt 4.8.7) /CreationDate (D:20251018134501+02'00') >>"
+    pinned = pin_pdf_dates(pdf)
+    assert pinned == b"<< /Producer (Qt 4.8.7) /CreationDate (D:19700101000000+00'00') >>"
+    assert len(pinned) == len(pdf)
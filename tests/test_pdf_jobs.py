@@ -0,0 +1,34 @@
+"""Mantenimiento de la cola de PDFs: trabajos colgados de un worker caído."""
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from app.database.database import async_engine, engine
+from app.models.pdf_job import PdfJobs as PdfJob
+from app.services.pdf_job_worker import PdfJobWorker
+
+
+def test_maintenance_resets_stale_jobs_but_not_own(children):
+    claimed = datetime.utcnow() - timedelta(hours=1)
+    orphan = PdfJob(kind="exam", target_id="x", status="running", attempts=1, started_at=claimed)
+    own = PdfJob(kind="exam", target_id="y", status="running", attempts=1, started_at=claimed)
+    recent = PdfJob(kind="exam", target_id="z", status="running", attempts=1, started_at=datetime.utcnow())
+    with Session(engine, expire_on_commit=False) as session:
+        session.add_all([orphan, own, recent])
+        session.commit()
+
+    worker = PdfJobWorker(workers=0, stale_seconds=60)
+    worker._running[0] = own
+
+    async def scenario():
+        try:
+            await worker._reset_stale()
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(scenario())
+    with Session(engine) as session:
+        assert session.get(PdfJob, orphan.id).status == "pending"
+        assert session.get(PdfJob, own.id).status == "running"
+        assert session.get(PdfJob, recent.id).status == "running"
@@ -0,0 +1,78 @@
+"""
+Consultas SQL por request en las rutas más usadas. Si una prueba falla, el
+mensaje lista las sentencias: un número mayor suele ser un N+1 o una caché
+que dejó de usarse.
+"""
+import pytest
+from sqlalchemy import text
+
+from app.database.database import engine
+from app.database.query_stats import assert_max_queries, capture_queries
+from app.services.service_cache import service_cache
+
+
+def test_capture_queries_counts_statements(children):
+    with capture_queries() as stats:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            conn.execute(text("SELECT 1"))
+    assert stats.queries == 2
+    assert stats.repeated(2) == [("SELECT 1", 2)]
+
+
+def test_assert_max_queries_lists_statements(children):
+    with pytest.raises(AssertionError, match=r"como mucho 1 consultas y hubo 2:\n  2x SELECT 1"):
+        with assert_max_queries(1):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+                conn.execute(text("SELECT 1"))
+
+
+def test_create_exam(client, children, make_exam):
+    # examen + secciones + ítems + resumen, y la relectura desde la vista
+    with assert_max_queries(5):
+        response = client.post("/hineExam/", json=make_exam(children[1]))
+    assert response.status_code == 201
+
+
+def test_get_exam(client, created_exam):
+    url = f"/hineExam/{created_exam['examId']}"
+    service_cache.clear()
+    with assert_max_queries(2):
+        assert client.get(url).status_code == 200
+    # Versión y examen quedan en la caché de lecturas
+    with assert_max_queries(0):
+        assert client.get(url).status_code == 200
+
+
+def test_get_child_history(client, children, created_exam):
+    url = f"/hineExam/children/{children[0]}"
+    service_cache.clear()
+    with assert_max_queries(2):
+        assert client.get(url).status_code == 200
+    with assert_max_queries(0):
+        assert client.get(url).status_code == 200
+
+
+def test_get_child_summaries(client, children, created_exam):
+    url = f"/hineExam/children/{children[0]}/summaries"
+    service_cache.clear()
+    with assert_max_queries(2):
+        assert client.get(url).status_code == 200
+    # Los resúmenes no se cachean: solo se ahorra la versión
+    with assert_max_queries(1):
+        assert client.get(url).status_code == 200
+
+
+def test_children_list_and_page(client, children):
+    with assert_max_queries(1):
+        assert client.get("/children/").status_code == 200
+    with assert_max_queries(1):
+        assert client.get("/children/page", params={"limit": 5}).status_code == 200
+
+
+def test_get_child(client, children):
+    with assert_max_queries(1):
+        assert client.get(f"/children/{children[0]}").status_code == 200
+    with assert_max_queries(0):
+        assert client.get(f"/children/{children[0]}").status_code == 200